@@ -3,14 +3,27 @@ ASGI config for it_solutions project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve the project through this module (e.g. ``uvicorn it_solutions.asgi:application``)
+for the admin live event stream at /admin-panel/events/, which holds one idle
+connection per open dashboard. Events are published in-process, so run a
+single worker process; under WSGI the stream endpoint answers 204 and the
+dashboard simply falls back to showing counts as of page load.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'it_solutions.settings')
 
 application = get_asgi_application()
+
+# Load the URLconf, views and templates now rather than on the first requests.
+# See website/startup.py.
+if settings.STARTUP_WARM:
+    from website.startup import warm
+    warm()
@@ -41,13 +41,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'website.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'website.middleware.ReplicaPinningMiddleware',
+    'website.middleware.PathSessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'website.middleware.RequestProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'it_solutions.urls'
@@ -56,8 +59,15 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Compiled templates are kept in memory; runserver's autoreloader
+            # resets the cache when a template file changes.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -72,16 +82,161 @@ TEMPLATES = [
 WSGI_APPLICATION = 'it_solutions.wsgi.application'
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'worklink',
+    },
+    # Seen by every worker process: the single-flight locks, invalidation
+    # generations and cached data of the public views (website/single_flight.py),
+    # so an admin save is picked up, and recomputed once, site-wide. The table
+    # is created by migration 0017 (or `manage.py createcachetable`); point this
+    # at Redis or Memcached if one is available.
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'website_shared_cache',
+    },
+}
+
+# Header/footer/sidebar fragments ({% sitefragment %}), keyed by SiteSetting.version
+SITE_FRAGMENT_CACHE = True
+SITE_FRAGMENT_CACHE_TIMEOUT = 86400
+
+
+# Sessions & messages
+# Only the admin areas use the database session store; public pages get a
+# throwaway session so anonymous traffic never writes to django_session.
+SESSIONLESS_PUBLIC_PAGES = True
+SESSION_PATH_PREFIXES = ['/admin-panel/', '/wlc/private/admin/']
+
+# Flash messages live in a signed cookie instead of the session.
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+
+# Edge caching of public pages (website/edge_cache.py)
+# Public HTML is sent with Cache-Control: public, s-maxage and Surrogate-Key /
+# Cache-Tag headers. Form posts redirect to ?notice=1 URLs, which are never
+# cached, so their flash message is shown; the proxy should also bypass its
+# cache for requests carrying a `messages` cookie (nginx:
+# proxy_cache_bypass $cookie_messages; proxy_no_cache $cookie_messages;).
+# Purge requests for changed models are POSTed as
+# {"keys": [...]} to EDGE_CACHE_PURGE_URL when it is set.
+EDGE_CACHE_PUBLIC_PAGES = True
+EDGE_CACHE_S_MAXAGE = 300
+EDGE_CACHE_MAX_AGE = 0
+EDGE_CACHE_PURGE_URL = ''
+
+# Public form submissions are processed once per idempotency key within this
+# many seconds (website/idempotency.py); run clear_idempotency_keys daily.
+IDEMPOTENCY_KEY_TTL = 86400
+
+# Jobs per careers page / infinite-scroll batch (keyset paginated, website/cursors.py)
+CAREERS_PAGE_SIZE = 12
+
+# Public jobs API (website/api.py): browsers and proxies may reuse responses
+# for API_CACHE_MAX_AGE seconds, then revalidate with the ETag. Serialized jobs
+# are cached per updated_at, so old entries simply expire after the timeout.
+API_CACHE_MAX_AGE = 60
+API_SERIALIZER_CACHE_TIMEOUT = 86400
+
+# Request profiler (website/profiling.py): staff add ?_profile=1 or send
+# X-Profile: 1 to profile one request; PROFILING_SAMPLE_RATE (0-1) profiles a
+# random fraction of all requests. Stacks are sampled every PROFILING_INTERVAL
+# seconds and the newest PROFILING_KEEP profiles are kept.
+PROFILING_QUERY_PARAM = '_profile'
+PROFILING_HEADER = 'X-Profile'
+PROFILING_SAMPLE_RATE = 0.0
+PROFILING_INTERVAL = 0.005
+PROFILING_KEEP = 500
+PROFILING_EXCLUDE_PREFIXES = ['/static/', '/media/', '/admin-panel/events/', '/admin-panel/profiles/']
+
+# Prometheus metrics at /metrics (website/metrics.py). Under gunicorn with
+# several workers set METRICS_DIR to a directory emptied at service start;
+# each worker writes its totals there every METRICS_FLUSH_INTERVAL seconds
+# and when it exits.
+# Scrapes need "Authorization: Bearer <METRICS_TOKEN>"; with no token set the
+# endpoint answers 403 unless DEBUG is on.
+METRICS_ENABLED = True
+METRICS_DIR = ''
+METRICS_FLUSH_INTERVAL = 5
+METRICS_TOKEN = ''
+
+# Cold start (website/startup.py): with STARTUP_WARM on, wsgi.py/asgi.py load
+# the URLconf, views and templates at import, before gunicorn --preload forks.
+# `manage.py bench_startup` fails when importing it_solutions.wsgi takes longer
+# than STARTUP_BUDGET_MS, as does the startup test.
+STARTUP_WARM = False
+STARTUP_BUDGET_MS = 1500
+
+# Data behind the public views (website/single_flight.py) is cached for
+# PUBLIC_CACHE_TTL seconds and may be served stale for PUBLIC_CACHE_STALE_TTL
+# more while one request recomputes it. Concurrent misses wait up to
+# SINGLE_FLIGHT_WAIT seconds for that request; its lock expires after
+# SINGLE_FLIGHT_LOCK_TIMEOUT. Higher PUBLIC_CACHE_EARLY_REFRESH_BETA refreshes
+# earlier (0 disables early refresh).
+PUBLIC_VIEW_CACHE = True
+PUBLIC_CACHE_TTL = 60
+PUBLIC_CACHE_STALE_TTL = 300
+PUBLIC_CACHE_EARLY_REFRESH_BETA = 1.0
+SINGLE_FLIGHT_LOCK_TIMEOUT = 10
+SINGLE_FLIGHT_WAIT = 2.0
+SINGLE_FLIGHT_CACHE = 'shared'  # a CACHES alias shared by all workers
+
+# Careers search suggestions (website/autocomplete.py) come from a per-process
+# index of the active jobs. Other workers notice a Job change within
+# AUTOCOMPLETE_GENERATION_CHECK seconds (through the SINGLE_FLIGHT_CACHE
+# generations); the index is rebuilt at least every AUTOCOMPLETE_INDEX_TTL seconds.
+AUTOCOMPLETE_INDEX_TTL = 300
+AUTOCOMPLETE_GENERATION_CHECK = 1.0
+
+# Admin live event stream (website/events.py, served under ASGI): a keepalive
+# comment every ADMIN_EVENTS_KEEPALIVE seconds, and the connection is closed
+# after ADMIN_EVENTS_LIFETIME seconds for the browser to reopen.
+ADMIN_EVENTS_KEEPALIVE = 15
+ADMIN_EVENTS_LIFETIME = 300
+
+
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # Django's sqlite3 backend plus WAL, tuned pragmas, BEGIN IMMEDIATE
+        # and a bounded retry on lock contention (see website/db_backends/sqlite3).
+        'ENGINE': 'website.db_backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'OPTIONS': {
+            'pragmas': {
+                'journal_mode': 'WAL',
+                'synchronous': 'NORMAL',
+                'mmap_size': 134217728,
+                'cache_size': -32000,
+                'busy_timeout': 5000,
+            },
+            'transaction_mode': 'IMMEDIATE',
+            'lock_retries': 5,
+            'lock_retry_delay': 0.05,
+        },
+    },
+    # A read replica is just another alias, e.g. a second SQLite file kept in
+    # sync by litestream/rsync (run `migrate --database=replica` once):
+    # 'replica': {
+    #     'ENGINE': 'website.db_backends.sqlite3',
+    #     'NAME': BASE_DIR / 'db.replica.sqlite3',
+    #     'TEST': {'MIRROR': 'default'},
+    # },
 }
 
+# Read replica routing (website/routers.py)
+DATABASE_ROUTERS = ['website.routers.ReplicaRouter']
+DATABASE_REPLICAS = []  # e.g. ['replica']
+DATABASE_REPLICA_SELECTION = 'round_robin'  # or 'health' to skip replicas failing a SELECT 1
+DATABASE_REPLICA_HEALTH_TTL = 30  # seconds between replica health checks
+DATABASE_REPLICA_PIN_SECONDS = 15  # read from the primary this long after a write
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -127,6 +282,26 @@ STATICFILES_DIRS = [
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Resumes are downloaded through the admin panel, never from MEDIA_URL (block
+# /media/resumes/ in the web server). Set PROTECTED_MEDIA_HEADER to
+# 'X-Accel-Redirect' (nginx, with an internal location at
+# PROTECTED_MEDIA_ACCEL_PREFIX aliasing MEDIA_ROOT) or 'X-Sendfile' (Apache
+# mod_xsendfile) to let the server send the file; see website/downloads.py.
+PROTECTED_MEDIA_HEADER = ''
+PROTECTED_MEDIA_ACCEL_PREFIX = '/protected-media/'
+
+# Resumable chunked uploads (website/uploads.py) are assembled here; keep it on
+# the same filesystem as MEDIA_ROOT so finished files are moved, not copied.
+# Run clear_upload_sessions daily to drop uploads idle for UPLOAD_SESSION_TTL.
+UPLOAD_SESSION_DIR = BASE_DIR / 'upload_sessions'
+UPLOAD_SESSION_TTL = 86400
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # largest PATCH body accepted
+
+# export_static writes public pages under STATIC_EXPORT_ROOT/releases/ and
+# points STATIC_EXPORT_ROOT/current at the newest one; serve that with nginx
+# (see website/static_export.py) and run export_static from cron.
+STATIC_EXPORT_ROOT = BASE_DIR / 'static_export'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -18,7 +18,7 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from website.views import custom_404
+from website.views import custom_404, serve_public_media
 admin.site.site_header = "Worklink Coders"
 admin.site.site_title = "Worklink Coders"
 admin.site.index_title = "Welcome to Worklink Coders"
@@ -32,5 +32,5 @@ urlpatterns = [
 handler404 = custom_404
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    urlpatterns += static(settings.MEDIA_URL, view=serve_public_media, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'it_solutions.settings')
 
 application = get_wsgi_application()
+
+# Load the URLconf, views and templates now rather than on the first requests
+# (with gunicorn --preload: once, before the workers fork). See website/startup.py.
+if settings.STARTUP_WARM:
+    from website.startup import warm
+    warm()
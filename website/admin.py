@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import Service, Project, TeamMember, Testimonial, ProjectRequest, SiteSetting, Job, JobApplication
+from .models import (
+    Service, Project, TeamMember, Testimonial, ProjectRequest, SiteSetting, Job, JobApplication,
+    ArchivedJobApplication, ArchivedProjectRequest,
+)
 
 
 @admin.register(Service)
@@ -136,3 +139,28 @@ class JobApplicationAdmin(admin.ModelAdmin):
             'fields': ('status', 'notes', 'submitted_at', 'updated_at')
         }),
     )
+
+
+class ReadOnlyArchiveAdmin(admin.ModelAdmin):
+    """Archived rows are restored through the admin panel, never edited in place"""
+    readonly_fields = ['data', 'archived_at']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedJobApplication)
+class ArchivedJobApplicationAdmin(ReadOnlyArchiveAdmin):
+    list_display = ['full_name', 'job_title', 'email', 'status', 'submitted_at', 'archived_at']
+    list_filter = ['status', 'submitted_at']
+    search_fields = ['full_name', 'email', 'phone', 'job_title']
+
+
+@admin.register(ArchivedProjectRequest)
+class ArchivedProjectRequestAdmin(ReadOnlyArchiveAdmin):
+    list_display = ['name', 'email', 'project_type', 'status', 'submitted_at', 'archived_at']
+    list_filter = ['status', 'submitted_at']
+    search_fields = ['name', 'email', 'company_name', 'project_type']
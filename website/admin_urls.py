@@ -8,6 +8,9 @@ urlpatterns = [
     
     # Dashboard
     path('', admin_views.admin_dashboard, name='admin_dashboard'),
+    path('events/', admin_views.admin_events, name='admin_events'),
+    path('uploads/', admin_views.admin_upload_create, name='admin_upload_create'),
+    path('uploads/<uuid:upload_id>/', admin_views.admin_upload_detail, name='admin_upload_detail'),
     
     # Services
     path('services/', admin_views.admin_services, name='admin_services'),
@@ -45,7 +48,20 @@ urlpatterns = [
     
     # Job Applications
     path('job-applications/', admin_views.admin_job_applications, name='admin_job_applications'),
+    path('job-applications/resumes.zip', admin_views.admin_job_application_resumes, name='admin_job_application_resumes'),
     path('job-applications/<int:id>/', admin_views.admin_job_application_detail, name='admin_job_application_detail'),
+    path('job-applications/<int:id>/resume/', admin_views.admin_job_application_resume, name='admin_job_application_resume'),
+    
+    # Analytics
+    path('analytics/funnel/', admin_views.admin_funnel, name='admin_funnel'),
+    
+    # Archive
+    path('archive/', admin_views.admin_archive, name='admin_archive'),
+    path('archive/<str:kind>/<int:id>/restore/', admin_views.admin_archive_restore, name='admin_archive_restore'),
+    
+    # Request Profiles
+    path('profiles/', admin_views.admin_profiles, name='admin_profiles'),
+    path('profiles/<int:id>/', admin_views.admin_profile_detail, name='admin_profile_detail'),
     
     # Settings
     path('settings/', admin_views.admin_settings, name='admin_settings'),
@@ -1,14 +1,20 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
+from django.utils.text import slugify
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
 from django.db.models import Count, Q
 from django.core.paginator import Paginator
-from django.http import JsonResponse
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_http_methods, require_POST
 from .models import (
     Service, Project, TeamMember, Testimonial, 
-    ProjectRequest, SiteSetting, Job, JobApplication
+    ProjectRequest, SiteSetting, Job, JobApplication, RequestProfile
 )
+from . import archive, downloads, events, funnel, profiling, uploads
 
 
 def is_staff(user):
@@ -39,15 +45,13 @@ def admin_dashboard(request):
     }
     
     # Recent Activity
-    recent_projects = Project.objects.all().order_by('-created_at')[:5]
-    recent_requests = ProjectRequest.objects.all().order_by('-submitted_at')[:5]
-    recent_applications = JobApplication.objects.all().order_by('-submitted_at')[:5]
+    recent_projects = Project.objects.projection('dashboard').order_by('-created_at')[:5]
+    recent_requests = ProjectRequest.objects.projection('dashboard').order_by('-submitted_at')[:5]
     
     context = {
         'stats': stats,
         'recent_projects': recent_projects,
         'recent_requests': recent_requests,
-        'recent_applications': recent_applications,
     }
     return render(request, 'admin_panel/dashboard.html', context)
 
@@ -147,7 +151,7 @@ def admin_service_delete(request, id):
 @user_passes_test(is_staff)
 def admin_projects(request):
     """List all projects"""
-    projects = Project.objects.all().order_by('-created_at')
+    projects = Project.objects.projection('admin_list').order_by('-created_at')
     
     # Search
     search = request.GET.get('search', '')
@@ -198,8 +202,9 @@ def admin_project_create(request):
             featured=request.POST.get('featured') == 'on',
             order=int(request.POST.get('order', 0)),
         )
-        if 'image' in request.FILES:
-            project.image = request.FILES['image']
+        image = uploads.posted_file(request, 'image', 'image')
+        if image:
+            project.image = image
             project.save()
         messages.success(request, f'Project "{project.title}" created successfully!')
         return redirect('admin_projects')
@@ -220,8 +225,9 @@ def admin_project_edit(request, id):
         project.project_url = request.POST.get('project_url', '')
         project.featured = request.POST.get('featured') == 'on'
         project.order = int(request.POST.get('order', 0))
-        if 'image' in request.FILES:
-            project.image = request.FILES['image']
+        image = uploads.posted_file(request, 'image', 'image')
+        if image:
+            project.image = image
         project.save()
         messages.success(request, f'Project "{project.title}" updated successfully!')
         return redirect('admin_projects')
@@ -248,7 +254,7 @@ def admin_project_delete(request, id):
 @user_passes_test(is_staff)
 def admin_team(request):
     """List all team members"""
-    team_members = TeamMember.objects.all().order_by('order', 'name')
+    team_members = TeamMember.objects.projection('admin_list').order_by('order', 'name')
     context = {'team_members': team_members}
     return render(request, 'admin_panel/team/list.html', context)
 
@@ -269,8 +275,9 @@ def admin_team_create(request):
             order=int(request.POST.get('order', 0)),
             is_active=request.POST.get('is_active') == 'on'
         )
-        if 'photo' in request.FILES:
-            member.photo = request.FILES['photo']
+        photo = uploads.posted_file(request, 'photo', 'image')
+        if photo:
+            member.photo = photo
             member.save()
         messages.success(request, f'Team member "{member.name}" added successfully!')
         return redirect('admin_team')
@@ -292,8 +299,9 @@ def admin_team_edit(request, id):
         member.github = request.POST.get('github', '')
         member.order = int(request.POST.get('order', 0))
         member.is_active = request.POST.get('is_active') == 'on'
-        if 'photo' in request.FILES:
-            member.photo = request.FILES['photo']
+        photo = uploads.posted_file(request, 'photo', 'image')
+        if photo:
+            member.photo = photo
         member.save()
         messages.success(request, f'Team member "{member.name}" updated successfully!')
         return redirect('admin_team')
@@ -320,7 +328,7 @@ def admin_team_delete(request, id):
 @user_passes_test(is_staff)
 def admin_testimonials(request):
     """List all testimonials"""
-    testimonials = Testimonial.objects.all().order_by('-created_at')
+    testimonials = Testimonial.objects.projection('admin_list').order_by('-created_at')
     context = {'testimonials': testimonials}
     return render(request, 'admin_panel/testimonials/list.html', context)
 
@@ -338,8 +346,9 @@ def admin_testimonial_create(request):
             featured=request.POST.get('featured') == 'on',
             order=int(request.POST.get('order', 0)),
         )
-        if 'client_photo' in request.FILES:
-            testimonial.client_photo = request.FILES['client_photo']
+        client_photo = uploads.posted_file(request, 'client_photo', 'image')
+        if client_photo:
+            testimonial.client_photo = client_photo
             testimonial.save()
         messages.success(request, f'Testimonial from "{testimonial.client_name}" added successfully!')
         return redirect('admin_testimonials')
@@ -358,8 +367,9 @@ def admin_testimonial_edit(request, id):
         testimonial.rating = int(request.POST.get('rating', 5))
         testimonial.featured = request.POST.get('featured') == 'on'
         testimonial.order = int(request.POST.get('order', 0))
-        if 'client_photo' in request.FILES:
-            testimonial.client_photo = request.FILES['client_photo']
+        client_photo = uploads.posted_file(request, 'client_photo', 'image')
+        if client_photo:
+            testimonial.client_photo = client_photo
         testimonial.save()
         messages.success(request, f'Testimonial from "{testimonial.client_name}" updated successfully!')
         return redirect('admin_testimonials')
@@ -386,7 +396,7 @@ def admin_testimonial_delete(request, id):
 @user_passes_test(is_staff)
 def admin_project_requests(request):
     """List all project requests"""
-    requests = ProjectRequest.objects.all().order_by('-submitted_at')
+    requests = ProjectRequest.objects.projection('admin_list').order_by('-submitted_at')
     
     # Filter by status
     status_filter = request.GET.get('status', '')
@@ -421,8 +431,13 @@ def admin_project_request_detail(request, id):
     """View project request details"""
     req = get_object_or_404(ProjectRequest, id=id)
     if request.method == 'POST':
-        req.status = request.POST.get('status')
+        status = request.POST.get('status')
+        if status not in dict(ProjectRequest.STATUS_CHOICES):
+            messages.error(request, 'Please choose a valid status.')
+            return redirect('admin_project_request_detail', id=req.id)
+        req.status = status
         req.notes = request.POST.get('notes', '')
+        req._changed_by = request.user
         req.save()
         messages.success(request, 'Project request updated successfully!')
         return redirect('admin_project_requests')
@@ -436,7 +451,7 @@ def admin_project_request_detail(request, id):
 @user_passes_test(is_staff)
 def admin_jobs(request):
     """List all jobs"""
-    jobs = Job.objects.all().order_by('-created_at')
+    jobs = Job.objects.projection('admin_list').order_by('-created_at')
     
     # Filter
     is_active = request.GET.get('is_active', '')
@@ -451,6 +466,13 @@ def admin_jobs(request):
     elif featured == 'no':
         jobs = jobs.filter(featured=False)
     
+    # Sort (counters are denormalized on Job, so no join on applications)
+    sort = request.GET.get('sort', '')
+    if sort == 'pending':
+        jobs = jobs.order_by('-applications_pending', '-created_at')
+    elif sort == 'applications':
+        jobs = jobs.order_by('-applications_total', '-created_at')
+    
     # Pagination
     paginator = Paginator(jobs, 20)
     page = request.GET.get('page', 1)
@@ -460,6 +482,7 @@ def admin_jobs(request):
         'jobs': jobs,
         'is_active': is_active,
         'featured': featured,
+        'sort': sort,
     }
     return render(request, 'admin_panel/jobs/list.html', context)
 
@@ -538,12 +561,8 @@ def admin_job_delete(request, id):
 # ============================================
 # JOB APPLICATIONS MANAGEMENT
 # ============================================
-@login_required
-@user_passes_test(is_staff)
-def admin_job_applications(request):
-    """List all job applications"""
-    applications = JobApplication.objects.all().order_by('-submitted_at')
-    
+def filter_applications(request, applications):
+    """Apply the job applications list filters; returns (applications, status, job, search)"""
     # Filter by status
     status_filter = request.GET.get('status', '')
     if status_filter:
@@ -554,21 +573,26 @@ def admin_job_applications(request):
     if job_filter:
         applications = applications.filter(job_id=job_filter)
     
-    # Search
+    # Search (indexed lookup for emails/phone numbers, substring otherwise)
     search = request.GET.get('search', '')
     if search:
-        applications = applications.filter(
-            Q(full_name__icontains=search) |
-            Q(email__icontains=search) |
-            Q(phone__icontains=search)
-        )
+        applications = applications.search(search)
+    return applications, status_filter, job_filter, search
+
+
+@login_required
+@user_passes_test(is_staff)
+def admin_job_applications(request):
+    """List all job applications"""
+    applications = JobApplication.objects.select_related('job').projection('admin_list').order_by('-submitted_at')
+    applications, status_filter, job_filter, search = filter_applications(request, applications)
     
     # Pagination
     paginator = Paginator(applications, 20)
     page = request.GET.get('page', 1)
     applications = paginator.get_page(page)
     
-    jobs = Job.objects.all()
+    jobs = Job.objects.projection('choice')
     
     context = {
         'applications': applications,
@@ -586,14 +610,238 @@ def admin_job_application_detail(request, id):
     """View job application details"""
     application = get_object_or_404(JobApplication, id=id)
     if request.method == 'POST':
-        application.status = request.POST.get('status')
+        status = request.POST.get('status')
+        if status not in dict(JobApplication.STATUS_CHOICES):
+            messages.error(request, 'Please choose a valid status.')
+            return redirect('admin_job_application_detail', id=application.id)
+        application.status = status
         application.notes = request.POST.get('notes', '')
+        application._changed_by = request.user
         application.save()
         messages.success(request, 'Job application updated successfully!')
         return redirect('admin_job_applications')
     return render(request, 'admin_panel/job_applications/detail.html', {'application': application})
 
 
+@login_required
+@user_passes_test(is_staff)
+def admin_job_application_resume(request, id):
+    """Download a job application's resume (resumes have no public URL)"""
+    application = get_object_or_404(JobApplication.objects.only('resume'), id=id)
+    return downloads.serve(request, application.resume)
+
+
+@login_required
+@user_passes_test(is_staff)
+def admin_job_application_resumes(request):
+    """Download the resumes of the filtered applications as one ZIP with a CSV index"""
+    applications = JobApplication.objects.select_related('job').projection('resume_index').order_by('job__title', 'submitted_at')
+    applications, status_filter, job_filter, search = filter_applications(request, applications)
+    filename = 'resumes.zip'
+    if job_filter:
+        job = get_object_or_404(Job.objects.projection('choice'), id=job_filter)
+        filename = f'resumes-{slugify(job.title) or job.id}.zip'
+    return downloads.resume_zip(applications.iterator(chunk_size=200), filename)
+
+
+# ============================================
+# FUNNEL ANALYTICS
+# ============================================
+@login_required
+@user_passes_test(is_staff)
+def admin_funnel(request):
+    """Hiring funnel and project request pipeline, read from precomputed rollups"""
+    try:
+        days = max(1, min(int(request.GET.get('days', 30)), 365))
+    except ValueError:
+        days = 30
+    
+    application_stages = [status for status, _ in JobApplication.STATUS_CHOICES]
+    
+    totals = funnel.stage_counts('application', days)
+    medians = funnel.median_days_by_job('application')
+    per_job_counts = funnel.stage_counts_by_job('application', days)
+    
+    job_rows = []
+    for job in Job.objects.filter(id__in=set(per_job_counts) | set(medians)).projection('choice').order_by('title'):
+        counts = per_job_counts.get(job.id, {})
+        job_rows.append({
+            'job': job,
+            'counts': [counts.get(stage, 0) for stage in application_stages],
+            'median_shortlisted': medians.get(job.id, {}).get('shortlisted'),
+            'median_interview': medians.get(job.id, {}).get('interview'),
+        })
+    
+    request_totals = funnel.stage_counts('request', days)
+    daily = [
+        (day, [counts.get(stage, 0) for stage in application_stages])
+        for day, counts in funnel.daily_counts('application', days)
+    ]
+    
+    context = {
+        'days': days,
+        'application_stages': [(status, label, totals.get(status, 0)) for status, label in JobApplication.STATUS_CHOICES],
+        'request_stages': [(status, label, request_totals.get(status, 0)) for status, label in ProjectRequest.STATUS_CHOICES],
+        'overall_medians': funnel.overall_median_days('application'),
+        'request_medians': funnel.overall_median_days('request'),
+        'stage_labels': [label for _, label in JobApplication.STATUS_CHOICES],
+        'job_rows': job_rows,
+        'daily': daily,
+    }
+    return render(request, 'admin_panel/analytics/funnel.html', context)
+
+
+# ============================================
+# UPLOADS
+# ============================================
+@login_required
+@user_passes_test(is_staff)
+@require_POST
+def admin_upload_create(request):
+    """Start a resumable image upload"""
+    return uploads.create(request, purposes=('image',))
+
+
+@login_required
+@user_passes_test(is_staff)
+@require_http_methods(["HEAD", "GET", "PATCH", "DELETE"])
+def admin_upload_detail(request, upload_id):
+    """Offset, chunk and cancel requests for a resumable image upload"""
+    return uploads.detail(request, upload_id, purposes=('image',))
+
+
+# ============================================
+# LIVE EVENTS
+# ============================================
+async def admin_events(request):
+    """Server-Sent Events stream of new submissions and status changes"""
+    if not await sync_to_async(lambda: is_staff(request.user))():
+        return HttpResponse(status=403)
+    if not isinstance(request, ASGIRequest):
+        # Under WSGI the stream would tie up a worker thread; 204 tells EventSource not to retry.
+        return HttpResponse(status=204)
+    response = StreamingHttpResponse(events.stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+# ============================================
+# ARCHIVE
+# ============================================
+@login_required
+@user_passes_test(is_staff)
+def admin_archive(request):
+    """Search archived job applications and project requests (read-only)"""
+    kind = request.GET.get('kind', 'applications')
+    if kind not in archive.ARCHIVES:
+        kind = 'applications'
+    _, archive_model, statuses = archive.ARCHIVES[kind]
+    records = archive_model.objects.projection('admin_list')
+    
+    # Filter by status
+    status_filter = request.GET.get('status', '')
+    if status_filter:
+        records = records.filter(status=status_filter)
+    
+    # Search
+    search = request.GET.get('search', '')
+    if search:
+        if kind == 'applications':
+            records = records.filter(
+                Q(full_name__icontains=search) |
+                Q(email__icontains=search) |
+                Q(job_title__icontains=search)
+            )
+        else:
+            records = records.filter(
+                Q(name__icontains=search) |
+                Q(email__icontains=search) |
+                Q(project_type__icontains=search)
+            )
+    
+    # Pagination
+    paginator = Paginator(records, 20)
+    page = request.GET.get('page', 1)
+    records = paginator.get_page(page)
+    
+    context = {
+        'records': records,
+        'kind': kind,
+        'statuses': statuses,
+        'status_filter': status_filter,
+        'search': search,
+    }
+    return render(request, 'admin_panel/archive/list.html', context)
+
+
+@login_required
+@user_passes_test(is_staff)
+@require_POST
+def admin_archive_restore(request, kind, id):
+    """Move an archived record back into the active list"""
+    if kind not in archive.ARCHIVES:
+        return redirect('admin_archive')
+    _, archive_model, _ = archive.ARCHIVES[kind]
+    record = get_object_or_404(archive_model, id=id)
+    try:
+        archive.restore(kind, record)
+    except archive.RestoreError as e:
+        messages.error(request, f'Could not restore "{record}": {e}')
+    else:
+        messages.success(request, f'"{record}" restored successfully!')
+    return redirect(f"{reverse('admin_archive')}?kind={kind}")
+
+
+# ============================================
+# REQUEST PROFILES
+# ============================================
+@login_required
+@user_passes_test(is_staff)
+def admin_profiles(request):
+    """Stored request profiles, newest first"""
+    profiles = RequestProfile.objects.select_related('user').defer('stacks')
+    
+    view_filter = request.GET.get('view', '')
+    if view_filter:
+        profiles = profiles.filter(view_name=view_filter)
+    
+    # Pagination
+    paginator = Paginator(profiles, 20)
+    page = request.GET.get('page', 1)
+    profiles = paginator.get_page(page)
+    
+    context = {
+        'profiles': profiles,
+        'view_filter': view_filter,
+        'view_names': RequestProfile.objects.order_by('view_name').values_list('view_name', flat=True).distinct(),
+        'query_param': profiling.query_param(),
+        'header_name': profiling.header_name(),
+    }
+    return render(request, 'admin_panel/profiles/list.html', context)
+
+
+@login_required
+@user_passes_test(is_staff)
+def admin_profile_detail(request, id):
+    """Flame graph of one request profile"""
+    profile = get_object_or_404(RequestProfile.objects.select_related('user'), id=id)
+    
+    if request.GET.get('format') == 'collapsed':
+        response = HttpResponse(profile.stacks, content_type='text/plain; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="profile-{profile.id}.txt"'
+        return response
+    
+    boxes, height = profiling.flame_graph(profile.stacks)
+    context = {
+        'profile': profile,
+        'boxes': boxes,
+        'height': height,
+        'top_frames': profiling.top_frames(profile.stacks),
+    }
+    return render(request, 'admin_panel/profiles/detail.html', context)
+
+
 # ============================================
 # SITE SETTINGS
 # ============================================
@@ -620,9 +868,13 @@ def admin_settings(request):
         settings_obj.smtp_username = request.POST.get('smtp_username', '')
         settings_obj.smtp_password = request.POST.get('smtp_password', '')
         settings_obj.use_tls = request.POST.get('use_tls') == 'on'
+        notification_mode = request.POST.get('notification_mode', 'immediate')
+        if notification_mode in dict(SiteSetting.NOTIFICATION_MODE_CHOICES):
+            settings_obj.notification_mode = notification_mode
         
-        if 'logo' in request.FILES:
-            settings_obj.logo = request.FILES['logo']
+        logo = uploads.posted_file(request, 'logo', 'image')
+        if logo:
+            settings_obj.logo = logo
         
         settings_obj.save()
         messages.success(request, 'Site settings updated successfully!')
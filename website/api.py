@@ -0,0 +1,193 @@
+"""
+Read-only public JSON API for jobs (version 1, mounted at /api/v1/).
+
+``GET /api/v1/jobs/`` lists active jobs with the careers page filters
+(department, job_type, experience, location, search), keyset pagination
+(``cursor``, ``limit``) and ``fields=`` sparse selection; list responses
+default to SUMMARY_FIELDS so the large text fields are neither loaded nor
+sent. ``GET /api/v1/jobs/<id>/`` returns one job with every field.
+
+Each job's serialized output is cached per (version, job, updated_at,
+fields), so unchanged jobs are never re-serialized, and responses carry an
+ETag for cheap revalidation.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import require_GET
+
+from . import cursors, metrics
+from .models import Job
+from .views import CAREERS_ORDERING, filter_jobs
+
+
+VERSION = 'v1'
+
+# API field -> model fields it needs
+FIELDS = {
+    'id': ['id'],
+    'url': ['id'],
+    'title': ['title'],
+    'department': ['department'],
+    'job_type': ['job_type'],
+    'experience_level': ['experience_level'],
+    'location': ['location'],
+    'salary_range': ['salary_range'],
+    'short_description': ['short_description'],
+    'full_description': ['full_description'],
+    'requirements': ['requirements'],
+    'responsibilities': ['responsibilities'],
+    'preferred_qualifications': ['preferred_qualifications'],
+    'technologies': ['technologies'],
+    'benefits': ['benefits'],
+    'application_deadline': ['application_deadline'],
+    'featured': ['featured'],
+    'created_at': ['created_at'],
+    'updated_at': ['updated_at'],
+}
+
+SUMMARY_FIELDS = (
+    'id', 'url', 'title', 'department', 'job_type', 'experience_level', 'location', 'salary_range',
+    'short_description', 'technologies', 'application_deadline', 'featured', 'updated_at',
+)
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def api_error(message, status=400):
+    return JsonResponse({'error': message}, status=status)
+
+
+def selected_fields(request, default):
+    """The ``fields=`` selection in FIELDS order; raises BadRequest for unknown names"""
+    requested = [name.strip() for name in request.GET.get('fields', '').split(',') if name.strip()]
+    if not requested:
+        return tuple(default)
+    unknown = sorted(set(requested) - set(FIELDS))
+    if unknown:
+        raise BadRequest(f'Unknown field(s): {", ".join(unknown)}. Available: {", ".join(FIELDS)}.')
+    return tuple(name for name in FIELDS if name in requested)
+
+
+def model_fields(fields):
+    needed = {'id', 'updated_at'}  # updated_at keys the serializer cache
+    for name in fields:
+        needed.update(FIELDS[name])
+    # The listing order is also needed for the next-page cursor.
+    needed.update(name.lstrip('-') for name in CAREERS_ORDERING)
+    return sorted(needed)
+
+
+def serialize(job, fields):
+    data = {}
+    for name in fields:
+        if name == 'url':
+            data[name] = reverse('api_job_detail', args=[job.pk])
+        elif name in ('job_type', 'experience_level'):
+            data[name] = getattr(job, name)
+            data[f'{name}_display'] = getattr(job, f'get_{name}_display')()
+        else:
+            data[name] = getattr(job, name)
+    return data
+
+
+def cache_key(job_id, updated_at, fields):
+    digest = hashlib.md5(','.join(fields).encode()).hexdigest()
+    return f'api:{VERSION}:job:{job_id}:{updated_at.timestamp()}:{digest}'
+
+
+def serialize_cached(jobs, fields):
+    """Serialize ``jobs``, reusing cached output for unchanged jobs (one cache round trip each way)"""
+    keys = [cache_key(job.pk, job.updated_at, fields) for job in jobs]
+    cached = cache.get_many(keys)
+    missing = {}
+    results = []
+    for key, job in zip(keys, jobs):
+        if key not in cached:
+            cached[key] = missing[key] = serialize(job, fields)
+        results.append(cached[key])
+    metrics.cache_lookup('api_job', len(keys) - len(missing), len(missing))
+    if missing:
+        cache.set_many(missing, getattr(settings, 'API_SERIALIZER_CACHE_TIMEOUT', 86400))
+    return results
+
+
+def etag_for(*parts):
+    return '"%s"' % hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def api_response(request, data, etag):
+    """JSON response with cache headers, or 304 if the client's copy is current"""
+    not_modified = get_conditional_response(request, etag=etag)
+    response = not_modified or JsonResponse(data, encoder=DjangoJSONEncoder)
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=getattr(settings, 'API_CACHE_MAX_AGE', 60))
+    return response
+
+
+def json_errors(view_func):
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view_func(request, *args, **kwargs)
+        except (BadRequest, cursors.InvalidCursor) as e:
+            return api_error(str(e))
+    return wrapper
+
+
+@require_GET
+@json_errors
+def job_list(request):
+    """Active jobs, filtered and cursor-paginated"""
+    fields = selected_fields(request, SUMMARY_FIELDS)
+    try:
+        limit = min(max(int(request.GET.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+    except ValueError:
+        raise BadRequest('limit must be a number.')
+
+    jobs = filter_jobs(request.GET).only(*model_fields(fields))
+    page = cursors.paginate(jobs, CAREERS_ORDERING, limit, request.GET.get('cursor', ''))
+
+    next_url = None
+    if page.has_next:
+        params = request.GET.copy()
+        params['cursor'] = page.next_cursor
+        next_url = f"{reverse('api_job_list')}?{params.urlencode()}"
+
+    etag = etag_for(VERSION, fields, [(job.pk, job.updated_at) for job in page], next_url)
+    return api_response(request, {'results': serialize_cached(page.items, fields), 'next': next_url}, etag)
+
+
+@require_GET
+@json_errors
+def job_detail(request, job_id):
+    """One active job"""
+    fields = selected_fields(request, FIELDS)
+    updated_at = Job.objects.filter(pk=job_id, is_active=True).values_list('updated_at', flat=True).first()
+    if updated_at is None:
+        return api_error('Job not found.', status=404)
+
+    etag = etag_for(VERSION, fields, job_id, updated_at)
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified:
+        return api_response(request, None, etag)
+
+    key = cache_key(job_id, updated_at, fields)
+    data = cache.get(key)
+    if data is not None:
+        metrics.cache_lookup('api_job', 1, 0)
+    else:
+        job = Job.objects.only(*model_fields(fields)).get(pk=job_id)
+        data = serialize_cached([job], fields)[0]
+    return api_response(request, data, etag)
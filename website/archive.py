@@ -0,0 +1,104 @@
+"""
+Archive tier for closed job applications and project requests.
+
+Rows in a terminal status are moved in batches from the hot tables into the
+compact Archived* tables, and can be moved back one at a time.
+"""
+from django.db import models, transaction
+
+from .models import (
+    JobApplication, ProjectRequest, ArchivedJobApplication, ArchivedProjectRequest
+)
+
+
+# kind -> (source model, archive model, terminal statuses)
+ARCHIVES = {
+    'applications': (JobApplication, ArchivedJobApplication, ('rejected', 'accepted')),
+    'requests': (ProjectRequest, ArchivedProjectRequest, ('completed', 'closed')),
+}
+
+
+class RestoreError(Exception):
+    pass
+
+
+def payload_fields(model, archive_model):
+    """Fields of ``model`` kept in the archive's JSON payload rather than in columns"""
+    copied = set(archive_model.COPIED_FIELDS)
+    return [
+        field for field in model._meta.concrete_fields
+        if not field.primary_key and field.attname not in copied
+    ]
+
+
+def to_archive(obj, archive_model):
+    """Build an unsaved archive row from a source model instance"""
+    data = {}
+    for field in payload_fields(type(obj), archive_model):
+        value = field.value_from_object(obj)
+        if isinstance(field, models.FileField):
+            value = value.name if value else ''
+        data[field.attname] = value
+    columns = {name: getattr(obj, name) for name in archive_model.COPIED_FIELDS}
+    return archive_model(
+        original_id=obj.pk,
+        data=data,
+        **columns,
+        **archive_model.extra_columns(obj),
+    )
+
+
+def archivable(kind, cutoff):
+    """Queryset of rows of ``kind`` in a terminal status submitted before ``cutoff``"""
+    model, _, statuses = ARCHIVES[kind]
+    return model.objects.filter(status__in=statuses, submitted_at__lt=cutoff).order_by('pk')
+
+
+def archive_batch(kind, cutoff, batch_size=500):
+    """Move one batch into the archive. Returns the number of rows moved."""
+    model, archive_model, _ = ARCHIVES[kind]
+    queryset = archivable(kind, cutoff)
+    if model is JobApplication:
+        queryset = queryset.select_related('job')
+    with transaction.atomic():
+        batch = list(queryset[:batch_size])
+        if not batch:
+            return 0
+        archive_model.objects.bulk_create([to_archive(obj, archive_model) for obj in batch])
+        # Uploaded files are left in place so a restored row still points at them.
+        model.objects.filter(pk__in=[obj.pk for obj in batch]).delete()
+    return len(batch)
+
+
+def restore(kind, archived):
+    """Move an archived row back into its hot table and return the restored instance"""
+    model, _, _ = ARCHIVES[kind]
+    if model.objects.filter(pk=archived.original_id).exists():
+        raise RestoreError(f'{model._meta.verbose_name} #{archived.original_id} already exists.')
+
+    values = {name: getattr(archived, name) for name in archived.COPIED_FIELDS}
+    for field in payload_fields(model, type(archived)):
+        if field.attname in archived.data:
+            values[field.attname] = field.to_python(archived.data[field.attname])
+
+    for field in model._meta.concrete_fields:
+        if field.is_relation and values.get(field.attname) is not None:
+            if not field.related_model.objects.filter(pk=values[field.attname]).exists():
+                raise RestoreError(
+                    f'The related {field.related_model._meta.verbose_name} no longer exists.'
+                )
+
+    with transaction.atomic():
+        obj = model(pk=archived.original_id, **values)
+        # A restore is not a new submission for the funnel analytics.
+        obj._skip_status_history = True
+        obj.save(force_insert=True)
+        # auto_now/auto_now_add overwrite timestamps on save; put the originals back.
+        timestamps = {
+            field.attname: values[field.attname]
+            for field in model._meta.concrete_fields
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+        }
+        model.objects.filter(pk=obj.pk).update(**timestamps)
+        archived.delete()
+    return obj
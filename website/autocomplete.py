@@ -0,0 +1,132 @@
+"""
+Careers search suggestions from an in-memory prefix index.
+
+The index holds the titles, departments, locations and technologies of the
+active jobs as one sorted list of normalized keys. Every word of a term
+starts a key, so "dev" finds "Senior Python Developer". A lookup is two
+``bisect`` calls plus a scan of the matching slice, so suggestions cost no
+SQL; at most one cache read per AUTOCOMPLETE_GENERATION_CHECK seconds.
+
+Each process builds the index on first use. A Job save or delete drops the
+index of the process that made it, and bumps the ``'job'`` generation that
+``single_flight`` keeps in the cache shared by all workers; the other
+workers compare against that generation at most every
+AUTOCOMPLETE_GENERATION_CHECK seconds (so most lookups read nothing shared)
+and rebuild when it changed. AUTOCOMPLETE_INDEX_TTL bounds the index's age
+in any case.
+"""
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+from django.conf import settings
+
+from . import single_flight
+from .models import Job
+
+
+# Kinds in the order their suggestions are listed when ranked equally, with the careers filter each one sets.
+KINDS = {'title': 'search', 'department': 'department', 'location': 'location', 'technology': 'search'}
+
+Suggestion = namedtuple('Suggestion', 'value kind count')
+
+_index = None
+_lock = threading.Lock()
+
+
+def normalize(text):
+    """Lowercase, accent-free, single-spaced form used for keys and queries"""
+    text = unicodedata.normalize('NFKD', text.casefold())
+    return ' '.join(''.join(char for char in text if not unicodedata.combining(char)).split())
+
+
+class PrefixIndex:
+    """Sorted (key, word position, kind, value, count) entries searched by key prefix"""
+
+    def __init__(self, terms, generation=None):
+        entries = []
+        for (kind, _), (value, count) in terms.items():
+            words = normalize(value).split()
+            for position in range(len(words)):
+                entries.append((' '.join(words[position:]), position, kind, value, count))
+        entries.sort()
+        self.keys = [entry[0] for entry in entries]
+        self.entries = entries
+        self.generation = generation
+        self.built_at = self.checked_at = time.monotonic()
+
+    def search(self, query, limit=8):
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        start = bisect_left(self.keys, prefix)
+        end = bisect_right(self.keys, prefix + '\U0010ffff', start)
+        kinds = list(KINDS)
+        best = {}
+        for key, position, kind, value, count in self.entries[start:end]:
+            # Exact matches, then terms starting with the query, then the most common, then alphabetically.
+            rank = (key != prefix or position > 0, position > 0, -count, kinds.index(kind), value.casefold())
+            if (kind, value) not in best or rank < best[kind, value]:
+                best[kind, value] = rank
+        ranked = sorted(best.items(), key=lambda item: item[1])[:limit]
+        return [Suggestion(value, kind, -rank[2]) for (kind, value), rank in ranked]
+
+
+def job_terms():
+    """{(kind, normalized value): [display value, active jobs]} for the active jobs"""
+    terms = {}
+
+    def add(kind, value):
+        value = ' '.join(value.split())
+        if value:
+            term = terms.setdefault((kind, normalize(value)), [value, 0])
+            term[1] += 1
+
+    rows = Job.objects.filter(is_active=True).values_list('title', 'department', 'location', 'technologies')
+    for title, department, location, technologies in rows:
+        add('title', title)
+        add('department', department)
+        add('location', location)
+        for technology in {technology.strip() for technology in technologies.split(',')}:
+            add('technology', technology)
+    return terms
+
+
+def build(generation=None):
+    return PrefixIndex(job_terms(), generation)
+
+
+def is_current(index, now):
+    """False if ``index`` is too old or jobs changed since it was built (checked at most every few seconds)"""
+    if index is None or now - index.built_at > getattr(settings, 'AUTOCOMPLETE_INDEX_TTL', 300):
+        return False
+    if now - index.checked_at < getattr(settings, 'AUTOCOMPLETE_GENERATION_CHECK', 1.0):
+        return True
+    index.checked_at = now
+    return index.generation == single_flight.shared_cache().get(single_flight.generation_key('job'))
+
+
+def current():
+    """This process's index, rebuilt if jobs changed since it was built"""
+    global _index
+    index = _index
+    if not is_current(index, time.monotonic()):
+        with _lock:
+            if _index is index:  # not rebuilt by another thread meanwhile
+                # Read before building, so a change made during the build is caught by the next check.
+                generation = single_flight.shared_cache().get(single_flight.generation_key('job'))
+                _index = build(generation)
+            index = _index
+    return index
+
+
+def suggest(query, limit=8):
+    return current().search(query, limit)
+
+
+def reset():
+    """Drop the index; the next lookup rebuilds it"""
+    global _index
+    _index = None
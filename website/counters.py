@@ -0,0 +1,85 @@
+"""
+Denormalized application counters on Job.
+
+``Job.applications_total`` and one ``applications_<status>`` column per
+JobApplication status are adjusted with F() updates from the signals when
+an application is created, deleted, changes status or moves to another
+job, so job lists can show and sort by them without joining
+JobApplication. Changes made with QuerySet.update() or raw SQL are not
+seen; ``manage.py reconcile_job_counters`` recounts and repairs drift.
+"""
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from .models import Job, JobApplication
+
+
+STATUSES = [status for status, _ in JobApplication.STATUS_CHOICES]
+
+
+def counter_field(status):
+    return f'applications_{status}'
+
+
+COUNTER_FIELDS = ['applications_total'] + [counter_field(status) for status in STATUSES]
+
+
+def adjust(job_id, deltas):
+    """Apply {field: delta} to one job's counters in a single UPDATE"""
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if job_id is None or not deltas:
+        return
+    # Decrements stop at zero: a counter that has already drifted low must not
+    # break the CHECK constraint of the PositiveIntegerField and fail the save.
+    Job.objects.filter(pk=job_id).update(**{
+        field: F(field) + delta if delta > 0 else Greatest(F(field) + delta, 0) for field, delta in deltas.items()
+    })
+
+
+def application_added(job_id, status):
+    adjust(job_id, {'applications_total': 1, counter_field(status): 1})
+
+
+def application_removed(job_id, status):
+    adjust(job_id, {'applications_total': -1, counter_field(status): -1})
+
+
+def status_changed(job_id, from_status, to_status):
+    adjust(job_id, {counter_field(from_status): -1, counter_field(to_status): 1})
+
+
+def actual_counts():
+    """{job_id: {field: count}} recounted from JobApplication in one grouped query"""
+    counts = {}
+    rows = JobApplication.objects.values_list('job_id', 'status').annotate(total=Count('id')).order_by()
+    for job_id, status, total in rows:
+        job_counts = counts.setdefault(job_id, dict.fromkeys(COUNTER_FIELDS, 0))
+        job_counts['applications_total'] += total
+        if status in STATUSES:
+            job_counts[counter_field(status)] = total
+    return counts
+
+
+def drifted(batch_size=500):
+    """Yield (job, {field: correct value}) for jobs whose stored counters are wrong"""
+    counts = actual_counts()
+    empty = dict.fromkeys(COUNTER_FIELDS, 0)
+    for job in Job.objects.only('id', 'title', *COUNTER_FIELDS).order_by('pk').iterator(chunk_size=batch_size):
+        expected = counts.get(job.pk, empty)
+        wrong = {field: value for field, value in expected.items() if getattr(job, field) != value}
+        if wrong:
+            yield job, wrong
+
+
+def recount(job_id):
+    """Reset one job's counters from a fresh count of its applications"""
+    with transaction.atomic():
+        values = dict.fromkeys(COUNTER_FIELDS, 0)
+        rows = JobApplication.objects.filter(job_id=job_id).values_list('status').annotate(total=Count('id')).order_by()
+        for status, total in rows:
+            values['applications_total'] += total
+            if status in STATUSES:
+                values[counter_field(status)] = total
+        Job.objects.filter(pk=job_id).update(**values)
+    return values
@@ -0,0 +1,92 @@
+"""
+Keyset ("cursor") pagination.
+
+A cursor is the ordering values of the last row on a page, encoded as
+opaque URL-safe base64 JSON. The next page is read with a WHERE clause
+that continues after that row, so every page costs the same no matter how
+deep it is, and rows added or removed meanwhile never shift items between
+pages the way OFFSET does. The ordering must end in a unique field
+(usually ``-id``) so the position is unambiguous.
+"""
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode(values):
+    raw = json.dumps(values, separators=(',', ':'), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise InvalidCursor('Malformed cursor.')
+    if not isinstance(values, list):
+        raise InvalidCursor('Malformed cursor.')
+    return values
+
+
+def after(model, ordering, values):
+    """Q selecting the rows that come after ``values`` in ``ordering``"""
+    if len(values) != len(ordering):
+        raise InvalidCursor('Cursor does not match the ordering.')
+    parsed = []
+    for name, value in zip(ordering, values):
+        field = model._meta.get_field(name.lstrip('-'))
+        try:
+            parsed.append(field.to_python(value))
+        except ValidationError:
+            raise InvalidCursor('Malformed cursor.')
+
+    # (a, b, c) after (x, y, z)  ==  a > x  OR  (a = x AND b > y)  OR  (a = x AND b = y AND c > z)
+    query = Q()
+    equal = Q()
+    for name, value in zip(ordering, parsed):
+        field_name = name.lstrip('-')
+        lookup = 'lt' if name.startswith('-') else 'gt'
+        query |= equal & Q(**{f'{field_name}__{lookup}': value})
+        equal &= Q(**{field_name: value})
+    return query
+
+
+class CursorPage:
+    """One page of results plus the cursor for the next page (None on the last page)"""
+
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def paginate(queryset, ordering, page_size, cursor=None):
+    """Return the CursorPage after ``cursor``; raises InvalidCursor for a bad cursor"""
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        queryset = queryset.filter(after(queryset.model, ordering, decode(cursor)))
+    # One extra row tells whether there is a next page without a COUNT.
+    items = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        last = items[-1]
+        next_cursor = encode([getattr(last, name.lstrip('-')) for name in ordering])
+    return CursorPage(items, next_cursor)
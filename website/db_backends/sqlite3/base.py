@@ -0,0 +1,141 @@
+"""
+SQLite backend tuned for concurrent web traffic on a single host.
+
+Builds on Django's sqlite3 backend and adds:
+
+* WAL journaling and tuned pragmas applied on every new connection, so
+  readers never block the writer and the writer never blocks readers.
+* ``BEGIN IMMEDIATE`` for ``transaction.atomic()`` blocks, so the write lock
+  is taken up front instead of failing on a read-to-write lock upgrade.
+* A bounded, jittered retry for "database is locked" errors raised outside
+  of a transaction (autocommit statements and ``BEGIN`` itself).
+
+Configure it in settings.DATABASES::
+
+    'ENGINE': 'website.db_backends.sqlite3',
+    'OPTIONS': {
+        'pragmas': {'busy_timeout': 5000},
+        'transaction_mode': 'IMMEDIATE',
+        'lock_retries': 5,
+        'lock_retry_delay': 0.05,
+    }
+"""
+import random
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+from django.db.backends.sqlite3.base import Database, SQLiteCursorWrapper
+
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 128 * 1024 * 1024,   # 128 MB of the database file memory-mapped
+    'cache_size': -32000,             # negative = KiB, i.e. ~32 MB page cache
+    'busy_timeout': 5000,             # ms to wait on a lock before SQLITE_BUSY
+    'temp_store': 'MEMORY',
+}
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+# Keys consumed by this backend; everything else in OPTIONS goes to sqlite3.connect().
+BACKEND_OPTIONS = ('pragmas', 'transaction_mode', 'lock_retries', 'lock_retry_delay', 'lock_retry_max_delay')
+
+
+def is_lock_error(exc):
+    """Return True if a sqlite3 error is caused by lock contention"""
+    message = str(exc).lower()
+    return 'database is locked' in message or 'database table is locked' in message
+
+
+class LockRetryPolicy:
+    """Retry a callable on lock contention with capped exponential backoff"""
+
+    def __init__(self, attempts=5, base_delay=0.05, max_delay=1.0):
+        self.attempts = max(1, int(attempts))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt):
+        # Full jitter keeps competing workers from retrying in lock-step.
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def run(self, func, *args, **kwargs):
+        for attempt in range(self.attempts):
+            try:
+                return func(*args, **kwargs)
+            except Database.OperationalError as e:
+                if not is_lock_error(e) or attempt == self.attempts - 1:
+                    raise
+                time.sleep(self.delay(attempt))
+
+
+class RetryingCursorWrapper(SQLiteCursorWrapper):
+    """
+    Cursor that retries statements on lock contention.
+
+    ``retry_policy`` is only set for cursors created outside a transaction:
+    a failed statement inside a transaction cannot simply be replayed.
+    """
+    retry_policy = None
+
+    def execute(self, query, params=None):
+        if self.retry_policy is None:
+            return super().execute(query, params)
+        return self.retry_policy.run(super().execute, query, params)
+
+    def executemany(self, query, param_list):
+        if self.retry_policy is None:
+            return super().executemany(query, param_list)
+        # param_list may be a one-shot iterator; materialize it so a retry replays every row.
+        param_list = list(param_list)
+        return self.retry_policy.run(super().executemany, query, param_list)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        options = self.settings_dict.get('OPTIONS', {})
+        self.pragmas = {**DEFAULT_PRAGMAS, **options.get('pragmas', {})}
+        self.transaction_mode = options.get('transaction_mode', 'IMMEDIATE').upper()
+        if self.transaction_mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                "settings.DATABASES['%s']['OPTIONS']['transaction_mode'] must be one of %s."
+                % (self.alias, ', '.join(TRANSACTION_MODES))
+            )
+        self.retry_policy = LockRetryPolicy(
+            attempts=options.get('lock_retries', 5),
+            base_delay=options.get('lock_retry_delay', 0.05),
+            max_delay=options.get('lock_retry_max_delay', 1.0),
+        )
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        for key in BACKEND_OPTIONS:
+            kwargs.pop(key, None)
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        # journal_mode=WAL is persistent in the database file, the rest are per connection.
+        for pragma, value in self.pragmas.items():
+            conn.execute('PRAGMA %s = %s' % (pragma, value))
+        return conn
+
+    def create_cursor(self, name=None):
+        cursor = self.connection.cursor(factory=RetryingCursorWrapper)
+        if self.autocommit and not self.in_atomic_block:
+            cursor.retry_policy = self.retry_policy
+        return cursor
+
+    def _start_transaction_under_autocommit(self):
+        """
+        Start a transaction explicitly in autocommit mode.
+
+        Uses ``BEGIN IMMEDIATE`` by default so the write lock is acquired (and
+        retried) here, rather than a deferred transaction failing midway when
+        it tries to upgrade its read lock.
+        """
+        self.cursor().execute('BEGIN %s' % self.transaction_mode)
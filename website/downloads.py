@@ -0,0 +1,239 @@
+"""
+Serving private media (resumes) to staff without a public URL.
+
+The admin view checks permissions and then hands the transfer to the web
+server when PROTECTED_MEDIA_HEADER is set:
+
+* ``'X-Accel-Redirect'`` (nginx): the response carries the file's path
+  under PROTECTED_MEDIA_ACCEL_PREFIX, which nginx maps to MEDIA_ROOT with
+  an ``internal`` location, so it cannot be requested directly::
+
+      location /protected-media/ {
+          internal;
+          alias /srv/worklink/media/;
+      }
+      location /media/resumes/ { return 404; }
+
+* ``'X-Sendfile'`` (Apache mod_xsendfile, lighttpd): the response carries
+  the absolute path.
+
+Either way the server streams the bytes and handles Range itself, and the
+Python worker is free as soon as the headers are sent. Without a header
+configured (runserver, tests, a bare gunicorn) ``file_response()`` answers
+with a FileResponse that honours single-range ``Range`` requests; its file
+object is positioned at the start of the range, so a WSGI server with
+``wsgi.file_wrapper`` (gunicorn) still sends it with ``sendfile()``.
+
+``resume_zip()`` streams many resumes as one ZIP archive, written entry by
+entry as the client reads it. Nothing is buffered beyond one read block,
+so memory use does not depend on the number or size of the resumes.
+"""
+import csv
+import io
+import mimetypes
+import os
+import re
+import zipfile
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from django.utils import timezone
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+from django.utils.text import slugify
+
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+BLOCK_SIZE = 64 * 1024
+# Formats that are compressed already; deflating them again costs CPU for nothing.
+STORED_EXTENSIONS = ('.pdf', '.docx', '.zip', '.png', '.jpg', '.jpeg')
+INDEX_COLUMNS = ['id', 'full_name', 'email', 'phone', 'job', 'status', 'years_of_experience', 'submitted_at', 'resume']
+
+
+def server_header():
+    return getattr(settings, 'PROTECTED_MEDIA_HEADER', '')
+
+
+def accel_prefix():
+    return getattr(settings, 'PROTECTED_MEDIA_ACCEL_PREFIX', '/protected-media/')
+
+
+class FileRange:
+    """A file object that reads ``length`` bytes from its current position and then reports EOF"""
+
+    def __init__(self, file, length):
+        self.file = file
+        self.name = file.name
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """(start, end) inclusive for a single satisfiable range, None to send everything, or False if unsatisfiable"""
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match or match.groups() == ('', ''):
+        # Multiple ranges and anything malformed: RFC 9110 allows ignoring the header.
+        return None
+    first, last = match.groups()
+    if not first:
+        length = int(last)
+        if not length:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+def range_applies(request, modified):
+    """False when If-Range names an older version of the file than the one on disk"""
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    since = parse_http_date_safe(if_range)
+    # No ETags are sent, so an entity-tag If-Range never matches.
+    return since is not None and int(modified) <= since
+
+
+def file_response(request, path, filename):
+    """FileResponse for ``path`` supporting a single byte range"""
+    stat = os.stat(path)
+    size = stat.st_size
+    file = open(path, 'rb')
+    header = request.headers.get('Range', '')
+    byte_range = parse_range(header, size) if header and range_applies(request, stat.st_mtime) else None
+
+    if byte_range is False:
+        file.close()
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    if byte_range is None:
+        response = FileResponse(file, as_attachment=True, filename=filename)
+    else:
+        start, end = byte_range
+        file.seek(start)
+        response = FileResponse(FileRange(file, end - start + 1), as_attachment=True, filename=filename, status=206)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    response['Accept-Ranges'] = 'bytes'
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    return response
+
+
+def serve(request, field_file):
+    """Download response for a FileField value, delegated to the web server when one is configured"""
+    if not field_file:
+        raise Http404('No file')
+    path = field_file.path
+    if not os.path.isfile(path):
+        raise Http404('File not found')
+    filename = os.path.basename(field_file.name)
+
+    header = server_header()
+    if header:
+        response = HttpResponse(content_type=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+        if header.lower() == 'x-accel-redirect':
+            relative = os.path.relpath(path, settings.MEDIA_ROOT).replace(os.sep, '/')
+            response[header] = quote(accel_prefix().rstrip('/') + '/' + relative)
+        else:
+            response[header] = path
+        response['Content-Disposition'] = content_disposition_header(True, filename)
+    else:
+        response = file_response(request, path, filename)
+    # Personal data: never keep a copy in shared or browser caches.
+    patch_cache_control(response, private=True, no_store=True)
+    return response
+
+
+class ZipBuffer:
+    """Write-only stream for ZipFile; ``take()`` returns and forgets what was written since the last call"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_zip(entries):
+    """Yield a ZIP archive of ``entries`` ((name, path or bytes, datetime) tuples) while it is being written"""
+    buffer = ZipBuffer()
+    # The buffer cannot seek, so ZipFile writes sizes and CRCs after each entry's data (data descriptors).
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for name, source, modified in entries:
+            info = zipfile.ZipInfo(name, date_time=timezone.localtime(modified).timetuple()[:6])
+            info.compress_type = zipfile.ZIP_STORED if name.lower().endswith(STORED_EXTENSIONS) else zipfile.ZIP_DEFLATED
+            with archive.open(info, 'w') as entry:
+                if isinstance(source, bytes):
+                    entry.write(source)
+                else:
+                    with open(source, 'rb') as f:
+                        for block in iter(lambda: f.read(BLOCK_SIZE), b''):
+                            entry.write(block)
+                            data = buffer.take()
+                            if data:
+                                yield data
+            yield buffer.take()
+    yield buffer.take()
+
+
+def csv_safe(value):
+    """Stop spreadsheet apps from evaluating applicant-supplied text as a formula"""
+    value = str(value)
+    return "'" + value if value.startswith(('=', '+', '-', '@')) else value
+
+
+def resume_entries(applications):
+    """ZIP entries for ``applications``: an index.csv, then one file per resume found on disk"""
+    index = io.StringIO()
+    writer = csv.writer(index)
+    writer.writerow(INDEX_COLUMNS)
+    files = []
+    for application in applications:
+        archive_name = ''
+        if application.resume and os.path.isfile(application.resume.path):
+            extension = os.path.splitext(application.resume.name)[1].lower()
+            folder = slugify(application.job.title) or f'job-{application.job_id}'
+            archive_name = f'{folder}/{application.pk}-{slugify(application.full_name) or "applicant"}{extension}'
+            files.append((archive_name, application.resume.path, application.submitted_at))
+        writer.writerow([csv_safe(value) for value in (
+            application.pk, application.full_name, application.email, application.phone, application.job.title,
+            application.get_status_display(), application.years_of_experience,
+            timezone.localtime(application.submitted_at).isoformat(), archive_name,
+        )])
+    # The BOM makes Excel read the file as UTF-8.
+    yield 'index.csv', index.getvalue().encode('utf-8-sig'), timezone.now()
+    yield from files
+
+
+def resume_zip(applications, filename):
+    """Streaming download of every resume in ``applications`` with a CSV index"""
+    response = StreamingHttpResponse(stream_zip(resume_entries(applications)), content_type='application/zip')
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    patch_cache_control(response, private=True, no_store=True)
+    return response
@@ -0,0 +1,116 @@
+"""
+Shared (CDN / reverse proxy) caching of public pages.
+
+With EDGE_CACHE_PUBLIC_PAGES on, public views decorated with
+``edge_cache()`` are sent with ``Cache-Control: public, s-maxage=...`` and
+``Surrogate-Key``/``Cache-Tag`` headers naming the models they render. The
+pages carry no per-visitor data: forms get their CSRF token from the
+``csrf_token_json`` endpoint just before submitting. When a public model
+changes, ``purge_requested`` is sent with the affected keys and, if
+EDGE_CACHE_PURGE_URL is set, the keys are POSTed there.
+
+Flash messages live in the ``messages`` cookie, which the proxy does not
+see as part of its cache key. Form posts therefore redirect with
+``flash_redirect()`` to ``<page>?notice=1``; that URL is never cached, so
+the redirect always reaches Django and the message is shown. Other
+requests with the cookie (a message set on an ordinary page view) should
+bypass the proxy too, e.g. in nginx::
+
+    proxy_cache_bypass $cookie_messages;
+    proxy_no_cache $cookie_messages;
+
+or in Varnish ``if (req.http.Cookie ~ "messages=") { return (pass); }``.
+"""
+import json
+import logging
+from functools import wraps
+
+from django.conf import settings
+from django.dispatch import Signal, receiver
+from django.http import HttpResponseRedirect
+from django.shortcuts import resolve_url
+from django.utils.cache import add_never_cache_headers, patch_cache_control
+
+
+logger = logging.getLogger(__name__)
+
+# Sent with keys=[...] after a public model changes.
+purge_requested = Signal()
+
+# Query parameter marking a redirect that carries a flash message; such pages are never cached.
+FLASH_PARAM = 'notice'
+
+
+def is_enabled():
+    return getattr(settings, 'EDGE_CACHE_PUBLIC_PAGES', False)
+
+
+def model_key(model):
+    return model._meta.model_name
+
+
+def instance_keys(instance):
+    """Surrogate keys a change to ``instance`` invalidates"""
+    key = model_key(type(instance))
+    return [key, f'{key}-{instance.pk}']
+
+
+def flash_redirect(to='home'):
+    """Redirect after setting a flash message, to a URL no shared cache answers from cache"""
+    return HttpResponseRedirect(f'{resolve_url(to)}?{FLASH_PARAM}=1')
+
+
+def edge_cache(*keys):
+    """
+    Mark a public view as cacheable by shared caches.
+
+    ``keys`` may reference URL kwargs, e.g. ``edge_cache('job', 'job-{job_id}')``.
+    Responses to visitors with a pending flash message, and anything
+    requested from ``flash_redirect()``, stay private, since the page shows
+    the message and clears its cookie.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            response = view_func(request, *args, **kwargs)
+            if not is_enabled() or request.method not in ('GET', 'HEAD') or response.status_code != 200:
+                return response
+            if FLASH_PARAM in request.GET or (settings.MESSAGE_STORAGE.endswith('CookieStorage') and 'messages' in request.COOKIES):
+                add_never_cache_headers(response)
+                return response
+            patch_cache_control(
+                response,
+                public=True,
+                max_age=getattr(settings, 'EDGE_CACHE_MAX_AGE', 0),
+                s_maxage=getattr(settings, 'EDGE_CACHE_S_MAXAGE', 300),
+            )
+            surrogate_keys = ' '.join(key.format(**kwargs) for key in keys)
+            response['Surrogate-Key'] = surrogate_keys
+            response['Cache-Tag'] = surrogate_keys.replace(' ', ',')
+            return response
+        # Read by static_export to know which pages a model change affects.
+        wrapper.surrogate_keys = keys
+        return wrapper
+    return decorator
+
+
+def request_purge(keys):
+    purge_requested.send(sender=None, keys=list(keys))
+
+
+@receiver(purge_requested)
+def post_purge_to_proxy(sender, keys, **kwargs):
+    """POST purged keys as JSON to EDGE_CACHE_PURGE_URL, if configured"""
+    url = getattr(settings, 'EDGE_CACHE_PURGE_URL', '')
+    if not is_enabled() or not url:
+        return
+    # Imported here: urllib.request is only needed when a purge URL is configured, not at worker startup.
+    import urllib.request
+
+    body = json.dumps({'keys': keys}).encode()
+    purge = urllib.request.Request(url, data=body, method='POST', headers={'Content-Type': 'application/json'})
+    try:
+        urllib.request.urlopen(purge, timeout=2).close()
+    except Exception as e:
+        # A failed purge only means the page lives until s-maxage expires.
+        logger.warning('Edge cache purge of %s failed: %s', keys, e)
@@ -0,0 +1,94 @@
+"""
+In-process pub/sub for live admin notifications.
+
+Signals ``publish()`` an event after the saving transaction commits; every
+open Server-Sent Events stream (``admin_events``) holds a queue and
+receives it. Publishing happens in whatever thread ran the view, so events
+are handed to each subscriber's event loop with call_soon_threadsafe().
+
+The channel is local to one process: run the ASGI server with a single
+worker, or admins connected to another worker only see events saved there.
+"""
+import asyncio
+import json
+import threading
+import time
+
+from django.conf import settings
+
+
+_subscribers = set()
+_lock = threading.Lock()
+
+QUEUE_SIZE = 100
+
+
+def publish(event):
+    """Send ``event`` (a JSON-serializable dict with a ``type``) to every open stream"""
+    with _lock:
+        subscribers = list(_subscribers)
+    for loop, queue in subscribers:
+        try:
+            loop.call_soon_threadsafe(_deliver, queue, event)
+        except RuntimeError:
+            # Loop already closed; the stream's finally block removes it.
+            pass
+
+
+def _deliver(queue, event):
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        # A stalled client misses events rather than growing without bound.
+        pass
+
+
+def subscriber_count():
+    return len(_subscribers)
+
+
+def format_event(event):
+    return f'event: {event["type"]}\ndata: {json.dumps(event)}\n\n'
+
+
+async def stream(keepalive=None, lifetime=None):
+    """
+    Yield SSE frames until ``lifetime`` seconds have passed.
+
+    A comment is sent every ``keepalive`` seconds so proxies keep the
+    connection open and dead clients are noticed; after ``lifetime`` the
+    stream ends and the browser reconnects on its own.
+    """
+    keepalive = keepalive or getattr(settings, 'ADMIN_EVENTS_KEEPALIVE', 15)
+    lifetime = lifetime or getattr(settings, 'ADMIN_EVENTS_LIFETIME', 300)
+    subscriber = (asyncio.get_running_loop(), asyncio.Queue(maxsize=QUEUE_SIZE))
+    with _lock:
+        _subscribers.add(subscriber)
+    try:
+        yield 'retry: 5000\n\n'
+        deadline = time.monotonic() + lifetime
+        while (remaining := deadline - time.monotonic()) > 0:
+            try:
+                event = await asyncio.wait_for(subscriber[1].get(), timeout=min(keepalive, remaining))
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield format_event(event)
+    finally:
+        with _lock:
+            _subscribers.discard(subscriber)
+
+
+def count_deltas(kind, created, from_status, to_status):
+    """Changes to the dashboard counters (``stats`` keys) caused by one save"""
+    total_key, open_key, open_status = {
+        'application': ('total_job_applications', 'pending_applications', 'pending'),
+        'request': ('total_project_requests', 'new_requests', 'new'),
+    }[kind]
+    deltas = {}
+    if created:
+        deltas[total_key] = 1
+    opened = (to_status == open_status) - (from_status == open_status)
+    if opened:
+        deltas[open_key] = opened
+    return deltas
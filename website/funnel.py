@@ -0,0 +1,155 @@
+"""
+Status history and precomputed hiring funnel analytics.
+
+Every status change of a JobApplication or ProjectRequest (including the
+initial submission) is appended to StatusTransition, and in the same
+transaction the rollup tables are bumped with F() updates:
+
+* FunnelDailyRollup counts rows entering each status per job per day.
+* StageTimeRollup is a per-job histogram of whole days from submission to
+  first reaching a stage in TIME_TO_STAGES, from which medians are read.
+
+The analytics page only ever reads these small rollup tables.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import (
+    JobApplication, ProjectRequest, StatusTransition, FunnelDailyRollup, StageTimeRollup
+)
+
+
+KINDS = {
+    JobApplication: 'application',
+    ProjectRequest: 'request',
+}
+
+# Stages whose time-from-submission is tracked
+TIME_TO_STAGES = {
+    'application': ('shortlisted', 'interview'),
+    'request': ('contacted',),
+}
+
+MAX_DAYS = 365
+
+
+def increment(model, **lookup):
+    """Atomically add one to ``model.count`` for the row matching ``lookup``, creating it if needed"""
+    if model.objects.filter(**lookup).update(count=F('count') + 1):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(count=1, **lookup)
+    except IntegrityError:
+        # Created concurrently by another request
+        model.objects.filter(**lookup).update(count=F('count') + 1)
+
+
+def record_transition(instance, from_status, changed_by=None):
+    """Append a transition for ``instance`` and update the rollups"""
+    kind = KINDS[type(instance)]
+    job_id = getattr(instance, 'job_id', None)
+    with transaction.atomic():
+        first_time = not StatusTransition.objects.filter(
+            kind=kind, object_id=instance.pk, to_status=instance.status
+        ).exists()
+        transition = StatusTransition.objects.create(
+            kind=kind,
+            object_id=instance.pk,
+            job_id=job_id,
+            from_status=from_status,
+            to_status=instance.status,
+            changed_by=changed_by,
+        )
+        increment(
+            FunnelDailyRollup,
+            kind=kind, job_id=job_id or 0, day=timezone.localdate(transition.changed_at), status=instance.status,
+        )
+        if first_time and instance.status in TIME_TO_STAGES[kind]:
+            days = max(0, min((transition.changed_at - instance.submitted_at).days, MAX_DAYS))
+            increment(StageTimeRollup, kind=kind, job_id=job_id or 0, stage=instance.status, days=days)
+    return transition
+
+
+def median_from_histogram(histogram):
+    """Median of a sorted [(days, count), ...] histogram, or None if empty"""
+    total = sum(count for _, count in histogram)
+    if not total:
+        return None
+    seen = 0
+    for days, count in histogram:
+        seen += count
+        if seen * 2 >= total:
+            return days
+    return None
+
+
+def stage_counts(kind, days=30, job_id=None):
+    """{status: number of rows that entered it} over the last ``days`` days"""
+    rollups = FunnelDailyRollup.objects.filter(kind=kind, day__gte=timezone.localdate() - timedelta(days=days))
+    if job_id is not None:
+        rollups = rollups.filter(job_id=job_id)
+    return dict(rollups.values_list('status').annotate(total=Sum('count')).order_by())
+
+
+def stage_counts_by_job(kind, days=30):
+    """{job_id: {status: count}} over the last ``days`` days, in one grouped query"""
+    rows = (
+        FunnelDailyRollup.objects
+        .filter(kind=kind, day__gte=timezone.localdate() - timedelta(days=days))
+        .values_list('job_id', 'status')
+        .annotate(total=Sum('count'))
+        .order_by()
+    )
+    counts = defaultdict(dict)
+    for job_id, status, total in rows:
+        counts[job_id][status] = total
+    return counts
+
+
+def daily_counts(kind, days=30):
+    """[(day, {status: count}), ...] for the last ``days`` days, newest first"""
+    rows = (
+        FunnelDailyRollup.objects
+        .filter(kind=kind, day__gte=timezone.localdate() - timedelta(days=days))
+        .values_list('day', 'status')
+        .annotate(total=Sum('count'))
+        .order_by()
+    )
+    by_day = defaultdict(dict)
+    for day, status, total in rows:
+        by_day[day][status] = total
+    return sorted(by_day.items(), reverse=True)
+
+
+def median_days_by_job(kind):
+    """{job_id: {stage: median days}} from the stage time histograms"""
+    rows = (
+        StageTimeRollup.objects.filter(kind=kind)
+        .values_list('job_id', 'stage', 'days')
+        .annotate(total=Sum('count'))
+        .order_by('job_id', 'stage', 'days')
+    )
+    histograms = defaultdict(list)
+    for job_id, stage, days, total in rows:
+        histograms[job_id, stage].append((days, total))
+    medians = defaultdict(dict)
+    for (job_id, stage), histogram in histograms.items():
+        medians[job_id][stage] = median_from_histogram(histogram)
+    return medians
+
+
+def overall_median_days(kind):
+    """{stage: median days} across all jobs"""
+    medians = {}
+    for stage in TIME_TO_STAGES[kind]:
+        histogram = list(
+            StageTimeRollup.objects.filter(kind=kind, stage=stage)
+            .values_list('days').annotate(total=Sum('count')).order_by('days')
+        )
+        medians[stage] = median_from_histogram(histogram)
+    return medians
@@ -0,0 +1,93 @@
+"""
+Idempotency keys for public form submissions.
+
+Public forms carry a random ``idempotency_key`` generated in the browser.
+The first request with a key claims it; a repeat (double-click, browser
+retry, back-and-resubmit) within IDEMPOTENCY_KEY_TTL seconds gets the
+original success message and redirect back without running the view, so
+no row is written, no file is stored and no email is sent.
+"""
+import re
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import messages
+from django.db import IntegrityError, transaction
+from django.shortcuts import redirect
+from django.utils import timezone
+
+from .edge_cache import flash_redirect
+from .models import IdempotencyKey
+
+
+KEY_PATTERN = re.compile(r'^[A-Za-z0-9_-]{8,64}$')
+
+
+def expiry_cutoff():
+    return timezone.now() - timedelta(seconds=getattr(settings, 'IDEMPOTENCY_KEY_TTL', 86400))
+
+
+def claim(scope, key):
+    """Return (record, created); ``created`` is False if the key was already used"""
+    for _ in range(2):
+        try:
+            with transaction.atomic():
+                return IdempotencyKey.objects.create(scope=scope, key=key), True
+        except IntegrityError:
+            record = IdempotencyKey.objects.filter(scope=scope, key=key).first()
+            if record is None:
+                continue  # released by a failed attempt in the meantime
+            if record.created_at >= expiry_cutoff():
+                return record, False
+            record.delete()
+    return IdempotencyKey.objects.get(scope=scope, key=key), False
+
+
+def complete(request, message):
+    """Mark the current submission as processed, remembering the message to replay"""
+    record = getattr(request, 'idempotency_record', None)
+    if record is not None:
+        record.completed = True
+        record.message = message
+
+
+def replay(request, record):
+    if record.completed:
+        messages.success(request, record.message)
+        return redirect(record.redirect_to) if record.redirect_to else flash_redirect('home')
+    messages.info(request, 'Your submission is already being processed.')
+    return flash_redirect('home')
+
+
+def idempotent(view_func):
+    """
+    Process each ``idempotency_key`` POSTed to ``view_func`` at most once.
+
+    The view calls ``complete()`` once the submission is saved; if it does
+    not (validation error, exception), the key is released so the visitor
+    can fix the form and send it again.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        key = request.POST.get('idempotency_key', '').strip()
+        if not KEY_PATTERN.match(key):
+            return view_func(request, *args, **kwargs)
+
+        record, created = claim(view_func.__name__, key)
+        if not created:
+            return replay(request, record)
+
+        request.idempotency_record = record
+        try:
+            response = view_func(request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+        if record.completed:
+            record.redirect_to = response.get('Location', '')
+            record.save(update_fields=['completed', 'message', 'redirect_to'])
+        else:
+            record.delete()
+        return response
+    return wrapper
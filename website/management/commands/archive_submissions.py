@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from website.archive import ARCHIVES, archivable, archive_batch
+
+
+class Command(BaseCommand):
+    help = 'Move closed job applications and project requests older than a cutoff into the archive tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=365,
+                            help='Archive rows submitted more than this many days ago (default: 365)')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows moved per transaction')
+        parser.add_argument('--kind', choices=sorted(ARCHIVES), action='append',
+                            help='What to archive (default: all)')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many rows would be moved')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        for kind in options['kind'] or sorted(ARCHIVES):
+            if options['dry_run']:
+                count = archivable(kind, cutoff).count()
+                self.stdout.write(f'{kind}: {count} row(s) would be archived')
+                continue
+
+            total = 0
+            while True:
+                moved = archive_batch(kind, cutoff, options['batch_size'])
+                if not moved:
+                    break
+                total += moved
+                self.stdout.write(f'{kind}: archived {total} row(s)...')
+            self.stdout.write(self.style.SUCCESS(f'{kind}: {total} row(s) archived'))
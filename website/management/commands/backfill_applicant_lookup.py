@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from website.models import JobApplication, normalize_email, normalize_phone
+
+
+class Command(BaseCommand):
+    help = 'Fill JobApplication.email_normalized/phone_digits for rows saved before those columns existed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows updated per query')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        pending = JobApplication.objects.filter(
+            Q(email_normalized='') & ~Q(email='') | Q(phone_digits='') & ~Q(phone='')
+        ).order_by('pk').only('pk', 'email', 'phone')
+
+        updated = 0
+        last_pk = 0
+        while True:
+            # Keyset pagination: rows whose phone has no digits stay "pending" forever.
+            batch = list(pending.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            for application in batch:
+                application.email_normalized = normalize_email(application.email)
+                application.phone_digits = normalize_phone(application.phone)
+            JobApplication.objects.bulk_update(batch, ['email_normalized', 'phone_digits'])
+            updated += len(batch)
+            last_pk = batch[-1].pk
+            self.stdout.write(f'{updated} application(s) updated...')
+        self.stdout.write(self.style.SUCCESS(f'{updated} application(s) backfilled'))
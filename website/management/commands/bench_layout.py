@@ -0,0 +1,41 @@
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.test import RequestFactory, override_settings
+from django.urls import resolve
+
+
+LAYOUTS = {
+    'website/base.html': '/',
+    'admin_panel/base.html': '/admin-panel/',
+}
+
+
+class Command(BaseCommand):
+    help = 'Measure per-request render time of the base layouts with and without the fragment cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=500, help='Renders per layout and mode')
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        iterations = options['iterations']
+        for template_name, path in LAYOUTS.items():
+            timings = {}
+            for cached in (False, True):
+                with override_settings(SITE_FRAGMENT_CACHE=cached):
+                    request = factory.get(path)
+                    request.user = AnonymousUser()
+                    request.resolver_match = resolve(path)
+                    # First render compiles the template and fills the fragment cache.
+                    render_to_string(template_name, request=request)
+                    started = time.perf_counter()
+                    for _ in range(iterations):
+                        render_to_string(template_name, request=request)
+                    timings[cached] = (time.perf_counter() - started) / iterations * 1000
+            self.stdout.write(
+                f'{template_name:<24} uncached {timings[False]:.3f} ms  cached {timings[True]:.3f} ms  '
+                f'({(1 - timings[True] / timings[False]) * 100:.0f}% less)'
+            )
@@ -0,0 +1,128 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from django.db.utils import ConnectionHandler, OperationalError, load_backend
+
+
+ENGINES = {
+    'stock': 'django.db.backends.sqlite3',
+    'tuned': 'website.db_backends.sqlite3',
+}
+
+
+class Command(BaseCommand):
+    help = 'Benchmark concurrent read/write throughput of the stock and tuned SQLite backends'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8, help='Number of reader threads')
+        parser.add_argument('--writers', type=int, default=4, help='Number of writer threads')
+        parser.add_argument('--duration', type=float, default=5.0, help='Seconds to run each backend')
+        parser.add_argument('--engine', choices=sorted(ENGINES), action='append',
+                            help='Backend(s) to run (default: both)')
+
+    def handle(self, *args, **options):
+        engines = options['engine'] or ['stock', 'tuned']
+        self.stdout.write(
+            f"{options['readers']} readers, {options['writers']} writers, {options['duration']}s per backend"
+        )
+        for name in engines:
+            result = self.run_backend(name, options['readers'], options['writers'], options['duration'])
+            self.stdout.write(
+                f"{name:>6}: {result['reads'] / result['elapsed']:9.0f} reads/s  "
+                f"{result['writes'] / result['elapsed']:8.0f} writes/s  "
+                f"{result['errors']} lock errors"
+            )
+
+    def run_backend(self, name, readers, writers, duration):
+        tmpdir = tempfile.mkdtemp(prefix='bench_sqlite_')
+        alias = f'bench_{name}'
+        # ConnectionHandler fills in the defaults Django expects in a settings dict.
+        settings_dict = ConnectionHandler({
+            'default': {
+                'ENGINE': ENGINES[name],
+                'NAME': os.path.join(tmpdir, 'bench.sqlite3'),
+                # Keep the stock backend's default 5s busy timeout comparable to busy_timeout=5000.
+                'OPTIONS': {'timeout': 5} if name == 'stock' else {},
+            }
+        }).settings['default']
+        backend = load_backend(settings_dict['ENGINE'])
+
+        counters = {'reads': 0, 'writes': 0, 'errors': 0}
+        lock = threading.Lock()
+        stop = threading.Event()
+
+        def connect():
+            # Register a per-thread connection so transaction.atomic(using=alias) finds it.
+            connection = backend.DatabaseWrapper(settings_dict, alias)
+            connections[alias] = connection
+            return connection
+
+        setup = connect()
+        with setup.cursor() as cursor:
+            cursor.execute(
+                'CREATE TABLE bench (id INTEGER PRIMARY KEY AUTOINCREMENT, '
+                'payload TEXT NOT NULL, created REAL NOT NULL)'
+            )
+            cursor.executemany(
+                'INSERT INTO bench (payload, created) VALUES (%s, %s)',
+                [('x' * 200, time.time()) for _ in range(1000)],
+            )
+        setup.close()
+
+        def reader():
+            connection = connect()
+            reads = errors = 0
+            while not stop.is_set():
+                try:
+                    with connection.cursor() as cursor:
+                        cursor.execute('SELECT id, payload FROM bench ORDER BY id DESC LIMIT 20')
+                        cursor.fetchall()
+                        cursor.execute('SELECT COUNT(*) FROM bench')
+                        cursor.fetchone()
+                    reads += 1
+                except OperationalError:
+                    errors += 1
+            connection.close()
+            with lock:
+                counters['reads'] += reads
+                counters['errors'] += errors
+
+        def writer():
+            connection = connect()
+            writes = errors = 0
+            while not stop.is_set():
+                try:
+                    # Read-then-write, like a view that looks something up before saving.
+                    with transaction.atomic(using=alias):
+                        with connection.cursor() as cursor:
+                            cursor.execute('SELECT MAX(id) FROM bench')
+                            cursor.fetchone()
+                            cursor.execute(
+                                'INSERT INTO bench (payload, created) VALUES (%s, %s)',
+                                ['y' * 200, time.time()],
+                            )
+                    writes += 1
+                except OperationalError:
+                    errors += 1
+            connection.close()
+            with lock:
+                counters['writes'] += writes
+                counters['errors'] += errors
+
+        threads = [threading.Thread(target=reader) for _ in range(readers)]
+        threads += [threading.Thread(target=writer) for _ in range(writers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        counters['elapsed'] = time.perf_counter() - started
+        shutil.rmtree(tmpdir, ignore_errors=True)
+        return counters
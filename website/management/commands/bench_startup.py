@@ -0,0 +1,39 @@
+import statistics
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from website import startup
+
+
+class Command(BaseCommand):
+    help = 'Measure cold-start time of it_solutions.wsgi in fresh interpreters and list the slowest imports'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters to start')
+        parser.add_argument('--top', type=int, default=20, help='Slowest imports to list')
+        parser.add_argument('--warm', action='store_true', help='Also time the pre-fork warm-up (URLconf, views, templates)')
+        parser.add_argument(
+            '--budget', type=float, default=None,
+            help='Fail if the median import time exceeds this many ms (default STARTUP_BUDGET_MS)',
+        )
+
+    def handle(self, *args, **options):
+        runs = [startup.measure(warm=options['warm']) for _ in range(options['runs'])]
+        import_ms = statistics.median(run['import_seconds'] for run in runs) * 1000
+        self.stdout.write(f'import it_solutions.wsgi  median {import_ms:.1f} ms over {len(runs)} run(s)')
+        if options['warm']:
+            warm_ms = statistics.median(run['warm_seconds'] for run in runs) * 1000
+            self.stdout.write(f'warm()                    median {warm_ms:.1f} ms')
+        self.stdout.write(f'modules loaded            {len(runs[-1]["modules"])}')
+
+        # One more run with -X importtime; its overhead would skew the timings above.
+        profile = startup.measure(warm=options['warm'], importtime=True)
+        self.stdout.write('')
+        self.stdout.write(f'{"cumulative ms":>14}  module')
+        for cumulative, name in sorted(profile['importtime'], reverse=True)[:options['top']]:
+            self.stdout.write(f'{cumulative / 1000:>14.1f}  {name}')
+
+        budget = options['budget'] if options['budget'] is not None else getattr(settings, 'STARTUP_BUDGET_MS', None)
+        if budget and import_ms > budget:
+            raise CommandError(f'Startup took {import_ms:.1f} ms, over the {budget:.0f} ms budget.')
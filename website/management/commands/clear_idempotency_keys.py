@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from website.idempotency import expiry_cutoff
+from website.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = 'Delete idempotency keys older than IDEMPOTENCY_KEY_TTL'
+
+    def handle(self, *args, **options):
+        deleted, _ = IdempotencyKey.objects.filter(created_at__lt=expiry_cutoff()).delete()
+        self.stdout.write(self.style.SUCCESS(f'{deleted} expired idempotency key(s) deleted'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from website.uploads import clear_expired
+
+
+class Command(BaseCommand):
+    help = 'Delete resumable uploads idle for longer than UPLOAD_SESSION_TTL, and their partial files'
+
+    def handle(self, *args, **options):
+        sessions, files = clear_expired()
+        self.stdout.write(self.style.SUCCESS(
+            f'{sessions} abandoned upload(s) and {files} orphaned part file(s) deleted'
+        ))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from website import static_export
+
+
+class Command(BaseCommand):
+    help = 'Render public pages to STATIC_EXPORT_ROOT for nginx, regenerating only pages marked dirty'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Re-render every page, not just dirty ones')
+        parser.add_argument('--keep', type=int, default=3, help='Number of releases to keep (default: 3)')
+        parser.add_argument('--dry-run', action='store_true', help='Only list pages that would be rendered or removed')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            render_paths, remove_paths = static_export.stale_paths(options['full'])
+            for path in render_paths:
+                self.stdout.write(f'render {path}')
+            for path in remove_paths:
+                self.stdout.write(f'remove {path}')
+            self.stdout.write(self.style.WARNING(
+                f'{len(render_paths)} page(s) to render, {len(remove_paths)} to remove (dry run)'
+            ))
+            return
+
+        log = self.stdout.write if options['verbosity'] > 1 else None
+        rendered, removed = static_export.export(full=options['full'], keep=max(1, options['keep']), log=log)
+        if not rendered and not removed:
+            self.stdout.write('Static export is up to date.')
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(rendered)} page(s) rendered, {len(removed)} removed; '
+            f'{static_export.current_link()} -> {static_export.current_release()}'
+        ))
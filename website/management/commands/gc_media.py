@@ -0,0 +1,64 @@
+import os
+import shutil
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from website.media_gc import QUARANTINE_DIR, find_orphans
+
+
+class Command(BaseCommand):
+    help = 'Report, quarantine or delete files in MEDIA_ROOT that no database row references'
+
+    def add_arguments(self, parser):
+        action = parser.add_mutually_exclusive_group()
+        action.add_argument('--quarantine', action='store_true',
+                            help=f'Move orphans to MEDIA_ROOT/{QUARANTINE_DIR}/<timestamp>/ instead of deleting them')
+        action.add_argument('--delete', action='store_true', help='Delete orphans')
+        parser.add_argument('--min-age', type=float, default=24,
+                            help='Ignore files modified in the last N hours (default: 24)')
+        parser.add_argument('--batch-size', type=int, default=500, help='Files processed per progress line')
+
+    def handle(self, *args, **options):
+        root = str(settings.MEDIA_ROOT)
+        if not os.path.isdir(root):
+            self.stdout.write(f'{root} does not exist, nothing to do.')
+            return
+
+        dry_run = not (options['quarantine'] or options['delete'])
+        quarantine_root = os.path.join(root, QUARANTINE_DIR, timezone.now().strftime('%Y%m%d-%H%M%S'))
+        count = total_bytes = 0
+        batch = []
+
+        def flush():
+            for name in batch:
+                source = os.path.join(root, name)
+                if options['quarantine']:
+                    target = os.path.join(quarantine_root, name)
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    shutil.move(source, target)
+                else:
+                    os.remove(source)
+            batch.clear()
+            self.stdout.write(f'{count} file(s) processed...')
+
+        for name, size in find_orphans(root, min_age=options['min_age'] * 3600):
+            count += 1
+            total_bytes += size
+            if dry_run:
+                self.stdout.write(f'{name} ({size} bytes)')
+                continue
+            batch.append(name)
+            if len(batch) >= options['batch_size']:
+                flush()
+        if batch:
+            flush()
+
+        summary = f'{count} orphaned file(s), {total_bytes / (1024 * 1024):.1f} MB'
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f'{summary} (dry run, use --quarantine or --delete)'))
+        elif options['quarantine']:
+            self.stdout.write(self.style.SUCCESS(f'{summary} moved to {quarantine_root}'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'{summary} deleted'))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from website import counters
+
+
+class Command(BaseCommand):
+    help = 'Recount the denormalized application counters on Job and repair any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report jobs whose counters are wrong')
+        parser.add_argument('--batch-size', type=int, default=500, help='Jobs read per query')
+
+    def handle(self, *args, **options):
+        repaired = 0
+        for job, expected in counters.drifted(batch_size=options['batch_size']):
+            changes = ', '.join(f'{field} {getattr(job, field)} -> {value}' for field, value in expected.items())
+            self.stdout.write(f'Job #{job.pk} {job.title}: {changes}')
+            if not options['dry_run']:
+                # Recount under a transaction rather than writing the snapshot,
+                # so applications submitted meanwhile are not lost.
+                counters.recount(job.pk)
+            repaired += 1
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'{repaired} job(s) with drifted counters (dry run)'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'{repaired} job(s) repaired'))
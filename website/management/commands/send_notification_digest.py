@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from website import notifications
+from website.models import SiteSetting
+
+
+class Command(BaseCommand):
+    help = 'Email one summary of new project requests and job applications (hourly/daily notification modes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true',
+                            help='Send now even if the period has not elapsed or the mode is immediate')
+        parser.add_argument('--dry-run', action='store_true', help='Print the digest instead of sending it')
+
+    def handle(self, *args, **options):
+        site_settings = SiteSetting.objects.first()
+        if not notifications.smtp_configured(site_settings):
+            self.stdout.write('Notification email / SMTP settings are not configured, nothing to do.')
+            return
+
+        now = timezone.now()
+        if not options['force'] and not notifications.digest_due(site_settings, now):
+            self.stdout.write(f'No digest due ({site_settings.get_notification_mode_display()}).')
+            return
+
+        requests, applications = notifications.pending_rows()
+        if not requests and not applications:
+            self.stdout.write('No new submissions since the last digest.')
+            return
+
+        if options['dry_run']:
+            email_message = notifications.digest_email(site_settings, requests, applications)
+            self.stdout.write(f'Subject: {email_message.subject}\n\n{email_message.body}')
+            return
+
+        try:
+            notifications.send_digest(site_settings, requests, applications, now)
+        except Exception as e:
+            # Rows stay un-notified, so the next run retries them.
+            raise CommandError(f'Sending the digest failed: {e}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Digest sent: {len(requests)} project request(s), {len(applications)} job application(s)'
+        ))
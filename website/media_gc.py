@@ -0,0 +1,80 @@
+"""
+Find files under MEDIA_ROOT that no database row points at any more.
+
+Replacing an image in the admin panel or deleting a row leaves the old file
+behind; the gc_media management command uses these helpers to report,
+quarantine or delete them.
+"""
+import os
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.db import models
+
+from .archive import ARCHIVES, payload_fields
+
+
+QUARANTINE_DIR = '.quarantine'
+
+
+def file_fields():
+    """Yield (model, field) for every FileField/ImageField of every installed model"""
+    for model in apps.get_models():
+        for field in model._meta.concrete_fields:
+            if isinstance(field, models.FileField):
+                yield model, field
+
+
+def referenced_paths(chunk_size=2000):
+    """Set of storage names referenced by the database, read in a streaming pass"""
+    referenced = set()
+    for model, field in file_fields():
+        names = (
+            model._base_manager.exclude(**{field.attname: ''})
+            .exclude(**{f'{field.attname}__isnull': True})
+            .values_list(field.attname, flat=True)
+        )
+        referenced.update(names.iterator(chunk_size=chunk_size))
+
+    # Archived rows keep their files (e.g. resumes) inside the JSON payload.
+    for model, archive_model, _ in ARCHIVES.values():
+        for field in payload_fields(model, archive_model):
+            if isinstance(field, models.FileField):
+                names = archive_model.objects.values_list(f'data__{field.attname}', flat=True)
+                referenced.update(name for name in names.iterator(chunk_size=chunk_size) if name)
+    return referenced
+
+
+def media_files(root=None, min_age=0):
+    """
+    Yield storage names of files under MEDIA_ROOT older than ``min_age`` seconds.
+
+    The age check leaves alone uploads whose row has not been saved yet.
+    """
+    root = str(root or settings.MEDIA_ROOT)
+    cutoff = time.time() - min_age
+    for dirpath, dirnames, filenames in os.walk(root):
+        if dirpath == root and QUARANTINE_DIR in dirnames:
+            dirnames.remove(QUARANTINE_DIR)
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            try:
+                if os.path.getmtime(path) > cutoff:
+                    continue
+            except OSError:
+                continue
+            yield os.path.relpath(path, root).replace(os.sep, '/')
+
+
+def find_orphans(root=None, min_age=0):
+    """Yield (name, size) for media files not referenced by any row"""
+    root = str(root or settings.MEDIA_ROOT)
+    referenced = referenced_paths()
+    for name in media_files(root, min_age):
+        if name not in referenced:
+            try:
+                size = os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+            yield name, size
@@ -0,0 +1,230 @@
+"""
+Prometheus metrics, served at ``/metrics`` in the text exposition format.
+
+Only counters and histograms are kept, so the samples of several processes
+can simply be added up. Each process counts in memory; with METRICS_DIR set
+(required under gunicorn with more than one worker) it also writes its
+totals to ``METRICS_DIR/<pid>-<nonce>.json`` at most every
+METRICS_FLUSH_INTERVAL seconds and once more at exit, and ``/metrics`` sums
+every file in the directory, including those of workers that have since
+exited, so totals never go backwards. The per-process nonce keeps a new
+worker that is given a dead worker's pid from overwriting its totals. Empty the
+directory when the service starts, as with prometheus_client's
+multiprocess mode.
+
+Cache hit ratio, for example, is
+``sum(rate(cache_requests_total{result="hit"}[5m])) / sum(rate(cache_requests_total[5m]))``.
+"""
+import atexit
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (10 * 1024, 100 * 1024, 512 * 1024, 1024 * 1024, 2 * 1024 * 1024, 5 * 1024 * 1024, 10 * 1024 * 1024)
+
+# Methods kept as label values; anything else is counted as 'other'.
+HTTP_METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+# name -> (type, help, histogram buckets)
+METRICS = {
+    'http_request_duration_seconds': ('histogram', 'Time to produce a response, by URL name.', LATENCY_BUCKETS),
+    'db_queries_total': ('counter', 'SQL queries executed while handling requests, by URL name.', None),
+    'db_query_duration_seconds_total': ('counter', 'Time spent in SQL queries while handling requests, by URL name.', None),
+    'smtp_send_duration_seconds': ('histogram', 'Time to send a notification email, by kind.', LATENCY_BUCKETS),
+    'smtp_send_failures_total': ('counter', 'Notification emails that could not be sent, by kind.', None),
+    'upload_size_bytes': ('histogram', 'Size of files received with a form, by purpose.', SIZE_BUCKETS),
+    'upload_rejections_total': ('counter', 'Uploads refused, by purpose and reason.', None),
+    'cache_requests_total': ('counter', 'Cache lookups, by cache and result (hit or miss).', None),
+}
+
+_lock = threading.Lock()
+_samples = defaultdict(float)  # (sample name, ((label, value), ...)) -> value
+_owner_pid = os.getpid()
+_nonce = uuid.uuid4().hex[:12]
+_last_flush = 0.0
+
+
+def enabled():
+    return getattr(settings, 'METRICS_ENABLED', True)
+
+
+def metrics_dir():
+    return str(getattr(settings, 'METRICS_DIR', '') or '')
+
+
+def _local():
+    """This process's samples; a forked worker starts from zero instead of re-counting its parent's"""
+    global _owner_pid, _nonce, _last_flush
+    if os.getpid() != _owner_pid:
+        _samples.clear()
+        _owner_pid = os.getpid()
+        _nonce = uuid.uuid4().hex[:12]
+        _last_flush = 0.0
+    return _samples
+
+
+def snapshot_path(directory):
+    """This process's file in METRICS_DIR"""
+    return os.path.join(directory, f'{_owner_pid}-{_nonce}.json')
+
+
+def _key(name, labels):
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+def inc(name, amount=1, **labels):
+    """Add ``amount`` to a counter"""
+    if not enabled():
+        return
+    with _lock:
+        _local()[_key(name, labels)] += amount
+    flush()
+
+
+def observe(name, value, **labels):
+    """Record one observation in a histogram"""
+    if not enabled():
+        return
+    with _lock:
+        samples = _local()
+        for bound in METRICS[name][2] + (math.inf,):
+            if value <= bound:
+                samples[_key(f'{name}_bucket', dict(labels, le=format_bound(bound)))] += 1
+        samples[_key(f'{name}_sum', labels)] += value
+        samples[_key(f'{name}_count', labels)] += 1
+    flush()
+
+
+def cache_lookup(cache_name, hits, misses):
+    if hits:
+        inc('cache_requests_total', hits, cache=cache_name, result='hit')
+    if misses:
+        inc('cache_requests_total', misses, cache=cache_name, result='miss')
+
+
+def format_bound(bound):
+    return '+Inf' if bound == math.inf else repr(float(bound))
+
+
+def flush(force=False):
+    """Write this process's samples to METRICS_DIR if the flush interval has passed"""
+    global _last_flush
+    directory = metrics_dir()
+    if not directory:
+        return
+    now = time.monotonic()
+    with _lock:
+        if not force and now - _last_flush < getattr(settings, 'METRICS_FLUSH_INTERVAL', 5):
+            return
+        _last_flush = now
+        data = [[name, labels, value] for (name, labels), value in _local().items()]
+        target = snapshot_path(directory)
+    os.makedirs(directory, exist_ok=True)
+    tmp = f'{target}.{threading.get_ident()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp, target)
+
+
+@atexit.register
+def _flush_at_exit():
+    """Write what was counted since the last flush; a worker may sit idle until it is stopped"""
+    with _lock:
+        if os.getpid() != _owner_pid or not _samples:
+            return
+    try:
+        flush(force=True)
+    except OSError:
+        pass
+
+
+def collect():
+    """Samples summed over every process"""
+    directory = metrics_dir()
+    if not directory:
+        with _lock:
+            return dict(_local())
+    flush(force=True)
+    totals = defaultdict(float)
+    for entry in os.scandir(directory):
+        if not entry.name.endswith('.json'):
+            continue
+        try:
+            with open(entry.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for name, labels, value in data:
+            totals[(name, tuple(tuple(pair) for pair in labels))] += value
+    return totals
+
+
+def escape(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_value(value):
+    return repr(int(value)) if float(value).is_integer() else repr(value)
+
+
+def sort_key(item):
+    """Group a histogram's samples by label set: buckets in ascending ``le``, then _sum and _count"""
+    (name, labels), _ = item
+    pairs = dict(labels)
+    le = pairs.pop('le', None)
+    suffix = 1 if name.endswith('_sum') else 2 if name.endswith('_count') else 0
+    return tuple(sorted(pairs.items())), suffix, float(le) if le else 0.0
+
+
+def render():
+    """The Prometheus text exposition of every metric"""
+    by_metric = defaultdict(list)
+    for (name, labels), value in collect().items():
+        base = name
+        for suffix in ('_bucket', '_sum', '_count'):
+            if name.endswith(suffix) and name[:-len(suffix)] in METRICS:
+                base = name[:-len(suffix)]
+        by_metric[base].append(((name, labels), value))
+
+    lines = []
+    for base, (kind, help_text, _) in METRICS.items():
+        lines.append(f'# HELP {base} {help_text}')
+        lines.append(f'# TYPE {base} {kind}')
+        for (name, labels), value in sorted(by_metric.get(base, ()), key=sort_key):
+            label_text = ','.join(f'{label}="{escape(text)}"' for label, text in labels)
+            lines.append(f'{name}{{{label_text}}} {format_value(value)}' if label_text else f'{name} {format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def method_label(request):
+    """The request method, with anything non-standard folded into 'other' to keep label cardinality bounded"""
+    return request.method if request.method in HTTP_METHODS else 'other'
+
+
+def view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else '<unresolved>'
+
+
+class QueryTimer:
+    """execute_wrapper counting the queries of one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
@@ -0,0 +1,130 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.db import connections
+
+from . import metrics, profiling, routers
+
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+def is_public(response):
+    """True if shared caches may store ``response``"""
+    directives = (directive.strip().split('=')[0].lower() for directive in response.get('Cache-Control', '').split(','))
+    return 'public' in directives
+
+
+class ReplicaPinningMiddleware:
+    """
+    Keep read-your-writes consistency when reads go to replicas.
+
+    Unsafe requests read from the primary for their whole duration. If a
+    request wrote anything, a short-lived cookie pins the follow-up requests
+    (typically the redirect after a form post) to the primary as well, so the
+    user sees their own change even if the replica is lagging. Responses
+    marked ``Cache-Control: public`` (see edge_cache) never carry the pin:
+    a shared cache would either skip them or hand the cookie to everyone.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        cookie_name = getattr(settings, 'DATABASE_REPLICA_PIN_COOKIE', 'primary_pin')
+        routers.unpin()
+        if request.method not in SAFE_METHODS or request.COOKIES.get(cookie_name):
+            routers.pin_to_primary()
+
+        response = self.get_response(request)
+
+        if routers.has_written() and routers.replica_aliases() and not is_public(response):
+            response.set_cookie(
+                cookie_name,
+                '1',
+                max_age=getattr(settings, 'DATABASE_REPLICA_PIN_SECONDS', 15),
+                httponly=True,
+                samesite='Lax',
+            )
+        routers.unpin()
+        return response
+
+
+class PathSessionMiddleware(SessionMiddleware):
+    """
+    SessionMiddleware that only uses the session store under SESSION_PATH_PREFIXES.
+
+    With SESSIONLESS_PUBLIC_PAGES on, every other request gets an empty,
+    throwaway session: request.user resolves to AnonymousUser without a
+    query, nothing is ever saved to django_session and no ``Vary: Cookie``
+    is added, so public pages stay cacheable. Flash messages on those pages
+    need a cookie-based MESSAGE_STORAGE.
+    """
+
+    def uses_session(self, request):
+        if not getattr(settings, 'SESSIONLESS_PUBLIC_PAGES', False):
+            return True
+        return request.path_info.startswith(tuple(settings.SESSION_PATH_PREFIXES))
+
+    def process_request(self, request):
+        if self.uses_session(request):
+            super().process_request(request)
+        else:
+            request.session = self.SessionStore(None)
+
+    def process_response(self, request, response):
+        if not self.uses_session(request):
+            return response
+        return super().process_response(request, response)
+
+
+class RequestProfilingMiddleware:
+    """
+    Profile requests on demand with the sampling profiler in profiling.py.
+
+    Staff trigger it with PROFILING_QUERY_PARAM or PROFILING_HEADER (also on
+    sessionless public pages, where the session cookie is checked only when
+    the flag is present); PROFILING_SAMPLE_RATE profiles a random fraction
+    of all requests. Must come after AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        trigger, user = profiling.trigger_for(request)
+        if trigger is None:
+            return self.get_response(request)
+        return profiling.profile(request, self.get_response, trigger, user)
+
+
+class MetricsMiddleware:
+    """
+    Record request latency and SQL query count/time per URL name (metrics.py).
+
+    Goes first in MIDDLEWARE so the latency covers the whole middleware chain.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not metrics.enabled():
+            return self.get_response(request)
+        queries = metrics.QueryTimer()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            response = self.get_response(request)
+        view = metrics.view_label(request)
+        metrics.observe(
+            'http_request_duration_seconds', time.perf_counter() - started,
+            view=view, method=metrics.method_label(request), status=response.status_code,
+        )
+        if queries.count:
+            metrics.inc('db_queries_total', queries.count, view=view)
+            metrics.inc('db_query_duration_seconds_total', queries.seconds, view=view)
+        return response
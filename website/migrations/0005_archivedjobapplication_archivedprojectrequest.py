@@ -0,0 +1,57 @@
+# Generated by Django 4.2.25 on 2026-10-19 16:52
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0004_job_jobapplication'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedJobApplication',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.BigIntegerField(help_text='Primary key of the original row', unique=True)),
+                ('status', models.CharField(max_length=20)),
+                ('submitted_at', models.DateTimeField(db_index=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('data', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='Remaining fields of the original row')),
+                ('job_id', models.BigIntegerField(db_index=True, help_text='Job ID (a plain integer so the archive survives job deletion)')),
+                ('job_title', models.CharField(max_length=200)),
+                ('full_name', models.CharField(max_length=200)),
+                ('email', models.EmailField(db_index=True, max_length=254)),
+                ('phone', models.CharField(max_length=20)),
+            ],
+            options={
+                'verbose_name': 'Archived Job Application',
+                'verbose_name_plural': 'Archived Job Applications',
+                'ordering': ['-submitted_at'],
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedProjectRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.BigIntegerField(help_text='Primary key of the original row', unique=True)),
+                ('status', models.CharField(max_length=20)),
+                ('submitted_at', models.DateTimeField(db_index=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('data', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='Remaining fields of the original row')),
+                ('name', models.CharField(max_length=200)),
+                ('email', models.EmailField(db_index=True, max_length=254)),
+                ('company_name', models.CharField(blank=True, max_length=200)),
+                ('project_type', models.CharField(max_length=200)),
+            ],
+            options={
+                'verbose_name': 'Archived Project Request',
+                'verbose_name_plural': 'Archived Project Requests',
+                'ordering': ['-submitted_at'],
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.25 on 2026-10-19 16:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0005_archivedjobapplication_archivedprojectrequest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sitesetting',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 4.2.25 on 2026-10-19 16:59
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('website', '0008_jobapplication_normalized_lookup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FunnelDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('application', 'Job Application'), ('request', 'Project Request')], max_length=20)),
+                ('job_id', models.BigIntegerField(default=0)),
+                ('day', models.DateField()),
+                ('status', models.CharField(max_length=20)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Funnel Daily Rollup',
+                'verbose_name_plural': 'Funnel Daily Rollups',
+            },
+        ),
+        migrations.CreateModel(
+            name='StageTimeRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('application', 'Job Application'), ('request', 'Project Request')], max_length=20)),
+                ('job_id', models.BigIntegerField(default=0)),
+                ('stage', models.CharField(max_length=20)),
+                ('days', models.PositiveIntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Stage Time Rollup',
+                'verbose_name_plural': 'Stage Time Rollups',
+            },
+        ),
+        migrations.CreateModel(
+            name='StatusTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('application', 'Job Application'), ('request', 'Project Request')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('job_id', models.BigIntegerField(blank=True, help_text='Job of the application (plain integer, survives job deletion)', null=True)),
+                ('from_status', models.CharField(blank=True, help_text='Empty for the initial submission', max_length=20)),
+                ('to_status', models.CharField(max_length=20)),
+                ('changed_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('changed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Status Transition',
+                'verbose_name_plural': 'Status Transitions',
+                'ordering': ['changed_at'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='stagetimerollup',
+            constraint=models.UniqueConstraint(fields=('kind', 'job_id', 'stage', 'days'), name='unique_stage_time'),
+        ),
+        migrations.AddConstraint(
+            model_name='funneldailyrollup',
+            constraint=models.UniqueConstraint(fields=('kind', 'job_id', 'day', 'status'), name='unique_funnel_daily'),
+        ),
+        migrations.AddIndex(
+            model_name='statustransition',
+            index=models.Index(fields=['kind', 'object_id'], name='transition_object_idx'),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.25 on 2026-10-19 17:02
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+STATUSES = ('pending', 'reviewed', 'shortlisted', 'interview', 'rejected', 'accepted')
+
+
+def fill_counters(apps, schema_editor):
+    Job = apps.get_model('website', 'Job')
+    JobApplication = apps.get_model('website', 'JobApplication')
+    counts = {}
+    rows = JobApplication.objects.values_list('job_id', 'status').annotate(total=Count('id')).order_by()
+    for job_id, status, total in rows:
+        job_counts = counts.setdefault(job_id, {'applications_total': 0})
+        job_counts['applications_total'] += total
+        if status in STATUSES:
+            job_counts[f'applications_{status}'] = total
+    for job_id, values in counts.items():
+        Job.objects.filter(pk=job_id).update(**values)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0009_status_history_funnel_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='applications_accepted',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='applications_interview',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='applications_pending',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='applications_rejected',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='applications_reviewed',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='applications_shortlisted',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='applications_total',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
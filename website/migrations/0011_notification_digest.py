@@ -0,0 +1,42 @@
+# Generated by Django 4.2.25 on 2026-10-19 17:06
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def mark_existing_notified(apps, schema_editor):
+    # Rows submitted before digests existed were already emailed one by one.
+    for model_name in ('JobApplication', 'ProjectRequest'):
+        model = apps.get_model('website', model_name)
+        model.objects.filter(notified_at__isnull=True).update(notified_at=F('submitted_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0010_job_application_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobapplication',
+            name='notified_at',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, help_text='When the notification email covering this application was sent', null=True),
+        ),
+        migrations.AddField(
+            model_name='projectrequest',
+            name='notified_at',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, help_text='When the notification email covering this request was sent', null=True),
+        ),
+        migrations.AddField(
+            model_name='sitesetting',
+            name='last_digest_sent_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='sitesetting',
+            name='notification_mode',
+            field=models.CharField(choices=[('immediate', 'Immediate (one email per submission)'), ('hourly', 'Hourly digest'), ('daily', 'Daily digest')], default='immediate', help_text='Send one email per submission, or an hourly/daily digest (run send_notification_digest from cron)', max_length=20),
+        ),
+        migrations.RunPython(mark_existing_notified, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.25 on 2026-10-19 17:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0012_uploadsession'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StaticPage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=300, unique=True)),
+                ('keys', models.CharField(help_text='Space-delimited surrogate keys the page depends on', max_length=500)),
+                ('dirty_at', models.DateTimeField(blank=True, db_index=True, help_text='Empty when the exported file is current', null=True)),
+                ('exported_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Static Page',
+                'verbose_name_plural': 'Static Pages',
+                'ordering': ['path'],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.25 on 2026-10-19 17:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0013_staticpage'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['is_active', '-featured', '-order', '-created_at', '-id'], name='job_listing_idx'),
+        ),
+    ]
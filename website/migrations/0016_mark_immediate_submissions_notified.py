@@ -0,0 +1,26 @@
+# Generated by Django 4.2.25 on 2026-10-19 18:40
+
+from django.db import migrations
+from django.utils import timezone
+
+
+def mark_notified(apps, schema_editor):
+    """Submissions left unsent in immediate mode must not reappear in the first digest"""
+    SiteSetting = apps.get_model('website', 'SiteSetting')
+    site_settings = SiteSetting.objects.first()
+    if site_settings is not None and site_settings.notification_mode != 'immediate':
+        return  # still waiting for their digest
+    now = timezone.now()
+    for model_name in ('ProjectRequest', 'JobApplication'):
+        apps.get_model('website', model_name).objects.filter(notified_at__isnull=True).update(notified_at=now)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0015_requestprofile'),
+    ]
+
+    operations = [
+        migrations.RunPython(mark_notified, migrations.RunPython.noop),
+    ]
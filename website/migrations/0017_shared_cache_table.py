@@ -0,0 +1,20 @@
+# Generated by Django 4.2.25 on 2026-10-19 19:05
+
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_tables(apps, schema_editor):
+    """Tables of the DatabaseCache aliases in CACHES (the shared single-flight cache); existing ones are kept"""
+    call_command('createcachetable', database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0016_mark_immediate_submissions_notified'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_tables, migrations.RunPython.noop),
+    ]
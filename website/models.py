@@ -1,8 +1,45 @@
+import re
+import uuid
+
 from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MinLengthValidator
 
 # Create your models here.
 
+def normalize_email(value):
+    """Lower-cased, trimmed email used for indexed lookups"""
+    return (value or '').strip().lower()
+
+
+def normalize_phone(value):
+    """Digits-only phone number, so '+1 (555) 123-4567' and '15551234567' match"""
+    return re.sub(r'\D', '', value or '')
+
+
+def prefix_range(field, prefix):
+    """
+    Q for ``field`` starting with ``prefix`` as a range comparison.
+
+    Unlike ``__startswith`` (a LIKE, case-insensitive on SQLite) a range
+    can be answered from an ordinary index.
+    """
+    return models.Q(**{f'{field}__gte': prefix, f'{field}__lt': prefix + '\U0010ffff'})
+
+
+class ProjectionQuerySet(models.QuerySet):
+    
+    def projection(self, name):
+        """
+        Load only the columns a list view shows, from the model's PROJECTIONS.
+        
+        Anything else the template touches is fetched with one query per row,
+        so keep each projection in step with its template (the tests render
+        every list with deferred loading forbidden).
+        """
+        return self.only(*self.model.PROJECTIONS[name])
+
+
 class Service(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
@@ -10,6 +47,13 @@ class Service(models.Model):
     order = models.IntegerField(default=0, help_text="Display order (lower numbers first)")
     is_active = models.BooleanField(default=True)
     
+    # The admin list shows every column.
+    PROJECTIONS = {
+        'home': ('title', 'description', 'icon'),
+    }
+    
+    objects = ProjectionQuerySet.as_manager()
+    
     class Meta:
         ordering = ['order', 'title']
         verbose_name = "Service"
@@ -39,6 +83,14 @@ class Project(models.Model):
     order = models.IntegerField(default=0, help_text="Display order")
     created_at = models.DateTimeField(auto_now_add=True)
     
+    PROJECTIONS = {
+        'home': ('title', 'description', 'category', 'image', 'technologies', 'project_url'),
+        'admin_list': ('title', 'description', 'category', 'image', 'client_name', 'featured'),
+        'dashboard': ('title', 'category', 'featured'),
+    }
+    
+    objects = ProjectionQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-featured', '-order', '-created_at']
         verbose_name = "Project"
@@ -60,6 +112,13 @@ class TeamMember(models.Model):
     order = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
     
+    PROJECTIONS = {
+        'home': ('name', 'designation', 'bio', 'photo', 'linkedin', 'twitter', 'github'),
+        'admin_list': ('name', 'designation', 'email', 'photo', 'order', 'is_active'),
+    }
+    
+    objects = ProjectionQuerySet.as_manager()
+    
     class Meta:
         ordering = ['order', 'name']
         verbose_name = "Team Member"
@@ -79,6 +138,13 @@ class Testimonial(models.Model):
     order = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    PROJECTIONS = {
+        'home': ('client_name', 'company_name', 'testimonial_text', 'client_photo', 'rating'),
+        'admin_list': ('client_name', 'company_name', 'client_photo', 'rating', 'featured', 'order'),
+    }
+    
+    objects = ProjectionQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-featured', '-order', '-created_at']
         verbose_name = "Testimonial"
@@ -106,8 +172,16 @@ class ProjectRequest(models.Model):
     description = models.TextField(help_text="Project requirements and details")
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='new')
     submitted_at = models.DateTimeField(auto_now_add=True)
+    notified_at = models.DateTimeField(blank=True, null=True, db_index=True, editable=False, help_text="When the notification email covering this request was sent")
     notes = models.TextField(blank=True, help_text="Internal notes")
     
+    PROJECTIONS = {
+        'admin_list': ('name', 'email', 'company_name', 'project_type', 'budget', 'status', 'submitted_at'),
+        'dashboard': ('name', 'project_type', 'status'),
+    }
+    
+    objects = ProjectionQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-submitted_at']
         verbose_name = "Project Request"
@@ -118,6 +192,12 @@ class ProjectRequest(models.Model):
 
 
 class SiteSetting(models.Model):
+    NOTIFICATION_MODE_CHOICES = [
+        ('immediate', 'Immediate (one email per submission)'),
+        ('hourly', 'Hourly digest'),
+        ('daily', 'Daily digest'),
+    ]
+    
     company_name = models.CharField(max_length=200, default="TechSolutions Pro", help_text="Your company name (shown in header and footer)")
     logo = models.ImageField(upload_to='site/', blank=True, null=True, help_text="Upload your company logo (recommended size: 200x60px)")
     tagline = models.CharField(max_length=300, default="Transforming Ideas into Digital Solutions", help_text="Company tagline or slogan")
@@ -137,6 +217,14 @@ class SiteSetting(models.Model):
     smtp_username = models.EmailField(blank=True, help_text="SMTP username (usually your email address)")
     smtp_password = models.CharField(max_length=200, blank=True, help_text="SMTP password or app password")
     use_tls = models.BooleanField(default=True, help_text="Use TLS encryption (recommended)")
+    notification_mode = models.CharField(
+        max_length=20, choices=NOTIFICATION_MODE_CHOICES, default='immediate',
+        help_text="Send one email per submission, or an hourly/daily digest (run send_notification_digest from cron)"
+    )
+    last_digest_sent_at = models.DateTimeField(blank=True, null=True, editable=False)
+    
+    # Bumped on every save; cached template fragments are keyed by it
+    version = models.PositiveIntegerField(default=1, editable=False)
     
     class Meta:
         verbose_name = "Site Settings"
@@ -148,6 +236,9 @@ class SiteSetting(models.Model):
     def save(self, *args, **kwargs):
         # Ensure only one instance exists
         self.pk = 1
+        # Read the stored version so a fresh instance saved over pk=1 still moves it forward
+        current = SiteSetting.objects.filter(pk=1).values_list('version', flat=True).first()
+        self.version = (current or 0) + 1
         super().save(*args, **kwargs)
 
 
@@ -192,17 +283,87 @@ class Job(models.Model):
     featured = models.BooleanField(default=False, help_text="Feature this job on homepage")
     order = models.IntegerField(default=0, help_text="Display order (lower numbers first)")
     
+    # Application counters, kept in step by signals (see counters.py)
+    applications_total = models.PositiveIntegerField(default=0, editable=False)
+    applications_pending = models.PositiveIntegerField(default=0, editable=False, db_index=True)
+    applications_reviewed = models.PositiveIntegerField(default=0, editable=False)
+    applications_shortlisted = models.PositiveIntegerField(default=0, editable=False)
+    applications_interview = models.PositiveIntegerField(default=0, editable=False)
+    applications_rejected = models.PositiveIntegerField(default=0, editable=False)
+    applications_accepted = models.PositiveIntegerField(default=0, editable=False)
+    
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    PROJECTIONS = {
+        # Listing cards on home and careers, plus the listing order for keyset cursors
+        'card': (
+            'title', 'department', 'job_type', 'experience_level', 'location', 'salary_range', 'short_description',
+            'technologies', 'application_deadline', 'featured', 'order', 'created_at',
+        ),
+        'admin_list': (
+            'title', 'department', 'job_type', 'location', 'short_description', 'featured', 'is_active',
+            'applications_total', 'applications_pending',
+        ),
+        'choice': ('title',),
+    }
+    
+    objects = ProjectionQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-featured', '-order', '-created_at']
+        indexes = [
+            # Careers listing order, used for keyset pagination
+            models.Index(fields=['is_active', '-featured', '-order', '-created_at', '-id'], name='job_listing_idx'),
+        ]
         verbose_name = "Job"
         verbose_name_plural = "Jobs"
     
     def __str__(self):
         return f"{self.title} - {self.location}"
+    
+    def save(self, *args, **kwargs):
+        # Never write back counters loaded earlier; they only change through F() updates.
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and not field.name.startswith('applications_')
+            ]
+        super().save(*args, **kwargs)
+
+
+class JobApplicationQuerySet(ProjectionQuerySet):
+    
+    def search(self, term):
+        """
+        Search applicants, using the normalized email/phone indexes when the
+        term looks like an email or phone number and falling back to a
+        substring search when that finds nothing.
+        """
+        term = term.strip()
+        if not term:
+            return self
+        indexed = None
+        if '@' in term:
+            email = normalize_email(term)
+            if '.' in email.rsplit('@', 1)[-1]:
+                indexed = self.filter(email_normalized=email)
+            else:
+                indexed = self.filter(prefix_range('email_normalized', email))
+        elif re.fullmatch(r'[\d\s()+\-.]+', term) and len(normalize_phone(term)) >= 4:
+            indexed = self.filter(prefix_range('phone_digits', normalize_phone(term)))
+        if indexed is not None and indexed.exists():
+            return indexed
+        
+        query = (
+            models.Q(full_name__icontains=term) |
+            models.Q(email__icontains=term) |
+            models.Q(phone__icontains=term)
+        )
+        if normalize_phone(term):
+            query |= models.Q(phone_digits__contains=normalize_phone(term))
+        return self.filter(query)
 
 
 class JobApplication(models.Model):
@@ -244,9 +405,27 @@ class JobApplication(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     notes = models.TextField(blank=True, help_text="Internal notes (not visible to applicant)")
     
+    # Normalized copies of email/phone for indexed search (filled on save)
+    email_normalized = models.CharField(max_length=254, blank=True, db_index=True, editable=False)
+    phone_digits = models.CharField(max_length=20, blank=True, db_index=True, editable=False)
+    
     # Metadata
     submitted_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    notified_at = models.DateTimeField(blank=True, null=True, db_index=True, editable=False, help_text="When the notification email covering this application was sent")
+    
+    PROJECTIONS = {
+        # With select_related('job')
+        'admin_list': (
+            'job', 'job__title', 'full_name', 'email', 'phone', 'current_position', 'years_of_experience', 'status',
+            'submitted_at',
+        ),
+        'resume_index': (
+            'job', 'job__title', 'full_name', 'email', 'phone', 'years_of_experience', 'status', 'submitted_at', 'resume',
+        ),
+    }
+    
+    objects = JobApplicationQuerySet.as_manager()
     
     class Meta:
         ordering = ['-submitted_at']
@@ -255,3 +434,237 @@ class JobApplication(models.Model):
     
     def __str__(self):
         return f"{self.full_name} - {self.job.title}"
+    
+    def save(self, *args, **kwargs):
+        self.email_normalized = normalize_email(self.email)
+        self.phone_digits = normalize_phone(self.phone)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and ('email' in update_fields or 'phone' in update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'email_normalized', 'phone_digits'}
+        super().save(*args, **kwargs)
+
+
+class ArchivedRecord(models.Model):
+    """
+    Compact copy of a closed submission moved out of its hot table.
+
+    Only the columns the archive is searched by are real columns; every other
+    field of the original row is kept in ``data`` so it can be restored.
+    """
+    original_id = models.BigIntegerField(unique=True, help_text="Primary key of the original row")
+    status = models.CharField(max_length=20)
+    submitted_at = models.DateTimeField(db_index=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    data = models.JSONField(default=dict, encoder=DjangoJSONEncoder, help_text="Remaining fields of the original row")
+    
+    # Fields of the source model copied into columns of the same name
+    COPIED_FIELDS = ('status', 'submitted_at')
+    
+    class Meta:
+        abstract = True
+        ordering = ['-submitted_at']
+    
+    @classmethod
+    def extra_columns(cls, obj):
+        """Denormalized columns that are not fields of the source model"""
+        return {}
+
+
+class ArchivedJobApplication(ArchivedRecord):
+    job_id = models.BigIntegerField(db_index=True, help_text="Job ID (a plain integer so the archive survives job deletion)")
+    job_title = models.CharField(max_length=200)
+    full_name = models.CharField(max_length=200)
+    email = models.EmailField(db_index=True)
+    phone = models.CharField(max_length=20)
+    
+    COPIED_FIELDS = ('job_id', 'full_name', 'email', 'phone', 'status', 'submitted_at')
+    
+    PROJECTIONS = {
+        'admin_list': ('job_title', 'full_name', 'email', 'status', 'submitted_at', 'archived_at'),
+    }
+    
+    objects = ProjectionQuerySet.as_manager()
+    
+    class Meta(ArchivedRecord.Meta):
+        verbose_name = "Archived Job Application"
+        verbose_name_plural = "Archived Job Applications"
+    
+    def __str__(self):
+        return f"{self.full_name} - {self.job_title}"
+    
+    @classmethod
+    def extra_columns(cls, obj):
+        return {'job_title': obj.job.title}
+
+
+class ArchivedProjectRequest(ArchivedRecord):
+    name = models.CharField(max_length=200)
+    email = models.EmailField(db_index=True)
+    company_name = models.CharField(max_length=200, blank=True)
+    project_type = models.CharField(max_length=200)
+    
+    COPIED_FIELDS = ('name', 'email', 'company_name', 'project_type', 'status', 'submitted_at')
+    
+    PROJECTIONS = {
+        'admin_list': ('name', 'email', 'company_name', 'project_type', 'status', 'submitted_at', 'archived_at'),
+    }
+    
+    objects = ProjectionQuerySet.as_manager()
+    
+    class Meta(ArchivedRecord.Meta):
+        verbose_name = "Archived Project Request"
+        verbose_name_plural = "Archived Project Requests"
+    
+    def __str__(self):
+        return f"{self.name} - {self.project_type}"
+
+
+class IdempotencyKey(models.Model):
+    """One-time key sent with a public form, recorded so a repeated submission is not processed twice"""
+    scope = models.CharField(max_length=100, help_text="View the key was used with")
+    key = models.CharField(max_length=64)
+    completed = models.BooleanField(default=False)
+    message = models.TextField(blank=True, help_text="Success message shown for the original submission")
+    redirect_to = models.CharField(max_length=300, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'key'], name='unique_idempotency_key'),
+        ]
+        verbose_name = "Idempotency Key"
+        verbose_name_plural = "Idempotency Keys"
+    
+    def __str__(self):
+        return f"{self.scope}: {self.key}"
+
+
+class UploadSession(models.Model):
+    """A resumable chunked upload being assembled on disk (see uploads.py)"""
+    PURPOSE_CHOICES = [
+        ('resume', 'Resume'),
+        ('image', 'Image'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    purpose = models.CharField(max_length=20, choices=PURPOSE_CHOICES)
+    filename = models.CharField(max_length=255)
+    length = models.PositiveBigIntegerField(help_text="Declared total size in bytes")
+    offset = models.PositiveBigIntegerField(default=0, help_text="Bytes received so far")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    
+    class Meta:
+        verbose_name = "Upload Session"
+        verbose_name_plural = "Upload Sessions"
+    
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.length})"
+    
+    @property
+    def is_complete(self):
+        return self.offset == self.length
+
+
+class StaticPage(models.Model):
+    """A public page written to disk by export_static, and whether it needs regenerating"""
+    path = models.CharField(max_length=300, unique=True)
+    keys = models.CharField(max_length=500, help_text="Space-delimited surrogate keys the page depends on")
+    dirty_at = models.DateTimeField(blank=True, null=True, db_index=True, help_text="Empty when the exported file is current")
+    exported_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        ordering = ['path']
+        verbose_name = "Static Page"
+        verbose_name_plural = "Static Pages"
+    
+    def __str__(self):
+        return self.path
+
+
+class StatusTransition(models.Model):
+    """Append-only log of status changes of job applications and project requests"""
+    KIND_CHOICES = [
+        ('application', 'Job Application'),
+        ('request', 'Project Request'),
+    ]
+    
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    job_id = models.BigIntegerField(blank=True, null=True, help_text="Job of the application (plain integer, survives job deletion)")
+    from_status = models.CharField(max_length=20, blank=True, help_text="Empty for the initial submission")
+    to_status = models.CharField(max_length=20)
+    changed_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    changed_by = models.ForeignKey('auth.User', blank=True, null=True, on_delete=models.SET_NULL, related_name='+')
+    
+    class Meta:
+        ordering = ['changed_at']
+        indexes = [
+            models.Index(fields=['kind', 'object_id'], name='transition_object_idx'),
+        ]
+        verbose_name = "Status Transition"
+        verbose_name_plural = "Status Transitions"
+    
+    def __str__(self):
+        return f"{self.kind} #{self.object_id}: {self.from_status or '-'} -> {self.to_status}"
+
+
+class FunnelDailyRollup(models.Model):
+    """Number of rows that entered ``status`` on ``day``, per job (job_id 0 for project requests)"""
+    kind = models.CharField(max_length=20, choices=StatusTransition.KIND_CHOICES)
+    job_id = models.BigIntegerField(default=0)
+    day = models.DateField()
+    status = models.CharField(max_length=20)
+    count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'job_id', 'day', 'status'], name='unique_funnel_daily'),
+        ]
+        verbose_name = "Funnel Daily Rollup"
+        verbose_name_plural = "Funnel Daily Rollups"
+
+
+class StageTimeRollup(models.Model):
+    """Histogram of whole days from submission to first reaching ``stage``, per job"""
+    kind = models.CharField(max_length=20, choices=StatusTransition.KIND_CHOICES)
+    job_id = models.BigIntegerField(default=0)
+    stage = models.CharField(max_length=20)
+    days = models.PositiveIntegerField()
+    count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'job_id', 'stage', 'days'], name='unique_stage_time'),
+        ]
+        verbose_name = "Stage Time Rollup"
+        verbose_name_plural = "Stage Time Rollups"
+
+
+class RequestProfile(models.Model):
+    """Sampled stack profile of one request (see profiling.py)"""
+    TRIGGER_CHOICES = [
+        ('staff', 'Requested by staff'),
+        ('sample', 'Random sample'),
+    ]
+    
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    view_name = models.CharField(max_length=200, blank=True)
+    status_code = models.PositiveSmallIntegerField(default=0)
+    trigger = models.CharField(max_length=20, choices=TRIGGER_CHOICES)
+    user = models.ForeignKey('auth.User', blank=True, null=True, on_delete=models.SET_NULL, related_name='+')
+    duration_ms = models.FloatField()
+    sample_count = models.PositiveIntegerField(default=0)
+    sql_count = models.PositiveIntegerField(default=0)
+    sql_ms = models.FloatField(default=0)
+    stacks = models.TextField(blank=True, help_text="Collapsed stacks: 'frame;frame;frame count' per line, root first")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Request Profile"
+        verbose_name_plural = "Request Profiles"
+    
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
@@ -0,0 +1,237 @@
+"""
+Notification emails for new project requests and job applications.
+
+In ``immediate`` mode (SiteSetting.notification_mode) each submission is
+emailed on its own, resume attached. In ``hourly``/``daily`` mode nothing is
+sent from the request; ``manage.py send_notification_digest``, run from
+cron at least as often as the period, sends one summary listing every row
+not yet covered (``notified_at`` is null) with links to the admin panel
+instead of attachments. Submissions arriving in immediate mode are marked
+covered even when their email could not be sent (failures are logged), so
+switching to a digest never re-sends old submissions.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.urls import reverse
+from django.utils import timezone
+
+from . import metrics
+from .models import JobApplication, ProjectRequest, SiteSetting
+
+
+logger = logging.getLogger(__name__)
+
+
+DIGEST_PERIODS = {
+    'hourly': timedelta(hours=1),
+    'daily': timedelta(days=1),
+}
+
+# Cron rarely fires on the exact second; a run this early still counts as due.
+DIGEST_SLACK = timedelta(minutes=5)
+
+# Rows listed per section; the rest are summarized as a count.
+DIGEST_MAX_ROWS = 200
+
+
+def smtp_configured(site_settings):
+    return bool(
+        site_settings and site_settings.notification_email and site_settings.smtp_host
+        and site_settings.smtp_username and site_settings.smtp_password
+    )
+
+
+def smtp_connection(site_settings):
+    return get_connection(
+        host=site_settings.smtp_host,
+        port=site_settings.smtp_port,
+        username=site_settings.smtp_username,
+        password=site_settings.smtp_password,
+        use_tls=site_settings.use_tls,
+    )
+
+
+def admin_link(site_settings, url_name, pk):
+    path = reverse(url_name, args=[pk])
+    return f'{site_settings.website_url.rstrip("/")}{path}' if site_settings.website_url else path
+
+
+def project_request_email(site_settings, project_request):
+    subject = f"New Project Request: {project_request.project_type}"
+    message = f"""
+New project request received from your website:
+
+Name: {project_request.name}
+Email: {project_request.email}
+Phone: {project_request.phone if project_request.phone else 'Not provided'}
+Company: {project_request.company_name if project_request.company_name else 'Not provided'}
+Project Type: {project_request.project_type}
+Budget: {project_request.budget if project_request.budget else 'Not specified'}
+
+Project Description:
+{project_request.description}
+
+---
+This request has been saved in your admin panel.
+"""
+    return EmailMessage(
+        subject=subject,
+        body=message,
+        from_email=site_settings.smtp_username,
+        to=[site_settings.notification_email],
+    )
+
+
+def job_application_email(site_settings, application):
+    job = application.job
+    subject = f"New Job Application: {job.title} - {application.full_name}"
+    message = f"""
+New job application received for: {job.title}
+
+Applicant Information:
+Name: {application.full_name}
+Email: {application.email}
+Phone: {application.phone}
+Location: {application.current_location if application.current_location else 'Not provided'}
+
+Current Position: {application.current_position if application.current_position else 'Not provided'}
+Current Company: {application.current_company if application.current_company else 'Not provided'}
+Years of Experience: {application.years_of_experience}
+LinkedIn: {application.linkedin_url if application.linkedin_url else 'Not provided'}
+Portfolio: {application.portfolio_url if application.portfolio_url else 'Not provided'}
+
+Additional Information:
+Availability: {application.availability if application.availability else 'Not specified'}
+Expected Salary: {application.expected_salary if application.expected_salary else 'Not specified'}
+Notice Period: {application.notice_period if application.notice_period else 'Not specified'}
+
+Cover Letter:
+{application.cover_letter if application.cover_letter else 'No cover letter provided'}
+
+---
+Resume has been uploaded and saved in admin panel.
+Application ID: {application.id}
+"""
+    email_message = EmailMessage(
+        subject=subject,
+        body=message,
+        from_email=site_settings.smtp_username,
+        to=[site_settings.notification_email],
+    )
+    # Attach resume
+    if application.resume:
+        email_message.attach(application.resume.name, application.resume.read(), 'application/pdf')
+    return email_message
+
+
+def send(email_message, kind):
+    """Send with SMTP latency and failure metrics"""
+    started = time.perf_counter()
+    try:
+        email_message.send()
+    except Exception:
+        metrics.inc('smtp_send_failures_total', kind=kind)
+        raise
+    finally:
+        metrics.observe('smtp_send_duration_seconds', time.perf_counter() - started, kind=kind)
+
+
+def submission_received(instance):
+    """Email a new submission right away when in immediate mode; digests pick it up otherwise"""
+    try:
+        site_settings = SiteSetting.objects.first()
+        if site_settings is not None and site_settings.notification_mode != 'immediate':
+            return
+        try:
+            if not smtp_configured(site_settings):
+                return
+            if isinstance(instance, JobApplication):
+                email_message = job_application_email(site_settings, instance)
+                kind = 'job_application'
+            else:
+                email_message = project_request_email(site_settings, instance)
+                kind = 'project_request'
+            email_message.connection = smtp_connection(site_settings)
+            send(email_message, kind)
+        finally:
+            # Immediate mode is done with the row whether the email went out, failed or
+            # SMTP is not set up; a digest after switching modes must not send it again.
+            type(instance).objects.filter(pk=instance.pk).update(notified_at=timezone.now())
+    except Exception:
+        # Log error but don't fail the request
+        logger.exception('Error sending email notification for %s #%s', type(instance).__name__, instance.pk)
+
+
+def digest_due(site_settings, now=None):
+    period = DIGEST_PERIODS.get(site_settings.notification_mode)
+    if period is None:
+        return False
+    last = site_settings.last_digest_sent_at
+    return last is None or (now or timezone.now()) >= last + period - DIGEST_SLACK
+
+
+def pending_rows():
+    """(project requests, job applications) not covered by any notification yet, oldest first"""
+    requests = ProjectRequest.objects.filter(notified_at__isnull=True).only(
+        'id', 'name', 'email', 'company_name', 'project_type', 'budget', 'submitted_at',
+    ).order_by('submitted_at')
+    applications = JobApplication.objects.filter(notified_at__isnull=True).select_related('job').only(
+        'id', 'full_name', 'email', 'years_of_experience', 'submitted_at', 'job__title',
+    ).order_by('submitted_at')
+    return list(requests), list(applications)
+
+
+def digest_email(site_settings, requests, applications):
+    period = dict(SiteSetting.NOTIFICATION_MODE_CHOICES).get(site_settings.notification_mode, 'Digest')
+    subject = f"{period}: {len(requests)} project request(s), {len(applications)} job application(s)"
+    lines = ['New submissions since the last digest:', '']
+
+    lines.append(f'Project Requests ({len(requests)})')
+    for project_request in requests[:DIGEST_MAX_ROWS]:
+        company = f' ({project_request.company_name})' if project_request.company_name else ''
+        lines.append(
+            f'- {project_request.submitted_at:%Y-%m-%d %H:%M} {project_request.name}{company}, '
+            f'{project_request.project_type}, budget {project_request.budget or "not specified"}'
+        )
+        lines.append(f'  {admin_link(site_settings, "admin_project_request_detail", project_request.id)}')
+    if len(requests) > DIGEST_MAX_ROWS:
+        lines.append(f'... and {len(requests) - DIGEST_MAX_ROWS} more in the admin panel')
+    lines.append('')
+
+    lines.append(f'Job Applications ({len(applications)})')
+    for application in applications[:DIGEST_MAX_ROWS]:
+        lines.append(
+            f'- {application.submitted_at:%Y-%m-%d %H:%M} {application.full_name} for {application.job.title}, '
+            f'{application.years_of_experience} year(s) experience'
+        )
+        lines.append(f'  {admin_link(site_settings, "admin_job_application_detail", application.id)}')
+    if len(applications) > DIGEST_MAX_ROWS:
+        lines.append(f'... and {len(applications) - DIGEST_MAX_ROWS} more in the admin panel')
+
+    lines += ['', '---', 'Resumes and full details are available from the links above.']
+    return EmailMessage(
+        subject=subject,
+        body='\n'.join(lines),
+        from_email=site_settings.smtp_username,
+        to=[site_settings.notification_email],
+    )
+
+
+def mark_notified(model, pks, when, batch_size=500):
+    for start in range(0, len(pks), batch_size):
+        model.objects.filter(pk__in=pks[start:start + batch_size]).update(notified_at=when)
+
+
+def send_digest(site_settings, requests, applications, now=None):
+    """Send one digest for the given rows and mark them as notified"""
+    now = now or timezone.now()
+    email_message = digest_email(site_settings, requests, applications)
+    email_message.connection = smtp_connection(site_settings)
+    send(email_message, 'digest')
+    mark_notified(ProjectRequest, [row.pk for row in requests], now)
+    mark_notified(JobApplication, [row.pk for row in applications], now)
+    # update() rather than save(): no version bump, so cached fragments survive.
+    SiteSetting.objects.filter(pk=site_settings.pk).update(last_digest_sent_at=now)
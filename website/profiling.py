@@ -0,0 +1,251 @@
+"""
+On-demand sampling profiler for single requests.
+
+A request is profiled when a staff user adds ``?_profile=1`` (or sends an
+``X-Profile: 1`` header), or at random for a PROFILING_SAMPLE_RATE fraction
+of all requests. While the view and its template render run, a background
+thread records the thread's Python stack every PROFILING_INTERVAL seconds;
+samples taken during a SQL query get the statement as their leaf frame.
+Nothing is instrumented per call, so the overhead is the same whether a
+view makes ten function calls or ten million, and unprofiled requests pay
+only for the trigger check.
+
+The samples are stored as a RequestProfile in collapsed-stack format (one
+``frame;frame;frame count`` line per distinct stack, the format flamegraph.pl
+and speedscope read) and rendered as a flame graph in the admin panel.
+"""
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, namedtuple
+from contextlib import ExitStack
+from functools import lru_cache
+from importlib import import_module
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.db import connections
+from django.utils.cache import add_never_cache_headers
+
+from .models import RequestProfile
+
+
+ROW_HEIGHT = 18
+
+
+def query_param():
+    return getattr(settings, 'PROFILING_QUERY_PARAM', '_profile')
+
+
+def header_name():
+    return getattr(settings, 'PROFILING_HEADER', 'X-Profile')
+
+
+def excluded(path):
+    return path.startswith(tuple(getattr(settings, 'PROFILING_EXCLUDE_PREFIXES', ())))
+
+
+def session_user(request):
+    """The logged-in user, also on public pages where PathSessionMiddleware skips the session"""
+    if request.user.is_authenticated:
+        return request.user
+    session_key = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if not session_key:
+        return request.user
+    store = import_module(settings.SESSION_ENGINE).SessionStore(session_key)
+    return get_user(SimpleNamespace(session=store))
+
+
+def trigger_for(request):
+    """('staff', user), ('sample', None) or (None, None) for an unprofiled request"""
+    if excluded(request.path_info):
+        return None, None
+    if request.GET.get(query_param()) or request.headers.get(header_name()):
+        user = session_user(request)
+        if user.is_active and user.is_staff:
+            return 'staff', user
+    rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0)
+    if rate and random.random() < rate:
+        return 'sample', None
+    return None, None
+
+
+@lru_cache(maxsize=None)
+def short_filename(filename):
+    base_dir = str(settings.BASE_DIR) + os.sep
+    if filename.startswith(base_dir):
+        return filename[len(base_dir):]
+    for marker in ('site-packages' + os.sep, 'dist-packages' + os.sep):
+        if marker in filename:
+            return filename.split(marker, 1)[1]
+    return os.path.basename(filename)
+
+
+def frame_label(code):
+    return f'{code.co_name} ({short_filename(code.co_filename)}:{code.co_firstlineno})'
+
+
+class SqlTimer:
+    """execute_wrapper counting queries and exposing the one in progress to the sampler"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.current = None
+
+    def __call__(self, execute, sql, params, many, context):
+        self.current = ' '.join(str(sql).split())[:120]
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+            self.current = None
+
+
+class Sampler:
+    """Samples another thread's stack every ``interval`` seconds from a daemon thread"""
+
+    def __init__(self, thread_id, interval, sql=None):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.sql = sql
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.counts[self.stack(frame)] += 1
+
+    def stack(self, frame):
+        frames = []
+        # Stop at run_profiled(): the middleware and server frames below it are the same for every sample.
+        while frame is not None and frame.f_code is not run_profiled.__code__:
+            frames.append(frame_label(frame.f_code))
+            frame = frame.f_back
+        frames.reverse()
+        query = self.sql.current if self.sql else None
+        if query:
+            frames.append(f'SQL: {query}')
+        return tuple(frames)
+
+
+def collapse(counts):
+    return '\n'.join(f'{";".join(frame.replace(";", ",") for frame in stack)} {count}' for stack, count in counts.most_common())
+
+
+def run_profiled(get_response, request):
+    return get_response(request)
+
+
+def profile(request, get_response, trigger, user=None):
+    """Run the rest of the middleware chain under the sampler and store the result"""
+    sql = SqlTimer()
+    sampler = Sampler(threading.get_ident(), getattr(settings, 'PROFILING_INTERVAL', 0.005), sql)
+    started = time.perf_counter()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(sql))
+        sampler.start()
+        try:
+            response = run_profiled(get_response, request)
+        finally:
+            sampler.stop()
+    duration = time.perf_counter() - started
+
+    match = getattr(request, 'resolver_match', None)
+    result = RequestProfile.objects.create(
+        method=request.method,
+        path=request.get_full_path()[:500],
+        view_name=(match.view_name if match else '')[:200],
+        status_code=response.status_code,
+        trigger=trigger,
+        user=user,
+        duration_ms=duration * 1000,
+        sample_count=sum(sampler.counts.values()),
+        sql_count=sql.count,
+        sql_ms=sql.seconds * 1000,
+        stacks=collapse(sampler.counts),
+    )
+    prune()
+    # A profiled response must not be stored by caches and served to other visitors.
+    add_never_cache_headers(response)
+    response['X-Profile-Id'] = str(result.pk)
+    return response
+
+
+def prune():
+    keep = getattr(settings, 'PROFILING_KEEP', 500)
+    oldest_kept = RequestProfile.objects.order_by('-pk').values_list('pk', flat=True)[keep - 1:keep].first()
+    if oldest_kept is not None:
+        RequestProfile.objects.filter(pk__lt=oldest_kept).delete()
+
+
+def parse_stacks(text):
+    for line in text.splitlines():
+        stack, _, count = line.rpartition(' ')
+        if stack:
+            yield stack.split(';'), int(count)
+
+
+Box = namedtuple('Box', 'label kind samples left width top')
+
+
+def frame_kind(label):
+    if label.startswith('SQL: '):
+        return 'sql'
+    if '(django/template/' in label or '(django/templatetags/' in label:
+        return 'template'
+    if '(website/' in label or '(it_solutions/' in label:
+        return 'app'
+    return 'library'
+
+
+def flame_graph(text, min_width=0.1):
+    """(boxes, height in px) laying out ``text`` as a top-down flame graph; boxes narrower than ``min_width`` % are dropped"""
+    root = {'count': 0, 'children': {}}
+    for frames, count in parse_stacks(text):
+        root['count'] += count
+        node = root
+        for frame in frames:
+            node = node['children'].setdefault(frame, {'count': 0, 'children': {}})
+            node['count'] += count
+
+    boxes = []
+    total = root['count'] or 1
+    pending = [(root, 0, 0.0)]
+    while pending:
+        node, depth, left = pending.pop()
+        for label, child in sorted(node['children'].items()):
+            width = child['count'] * 100 / total
+            if width >= min_width:
+                boxes.append(Box(label, frame_kind(label), child['count'], round(left, 3), round(width, 3), depth * ROW_HEIGHT))
+                pending.append((child, depth + 1, left))
+            left += width
+    height = (max(box.top for box in boxes) + ROW_HEIGHT) if boxes else 0
+    return boxes, height
+
+
+def top_frames(text, limit=20):
+    """[(frame, self samples, total samples)] for the frames with the most samples on top of the stack"""
+    own = Counter()
+    inclusive = Counter()
+    for frames, count in parse_stacks(text):
+        own[frames[-1]] += count
+        for frame in set(frames):
+            inclusive[frame] += count
+    return [(frame, count, inclusive[frame]) for frame, count in own.most_common(limit)]
@@ -0,0 +1,122 @@
+"""
+Database router that sends public content reads to read replicas.
+
+Replicas are ordinary entries in settings.DATABASES listed in
+settings.DATABASE_REPLICAS. Reads of the models in DATABASE_REPLICA_MODELS
+go to a replica, everything else (and every write) goes to ``default``.
+
+Once a request writes, the rest of that request reads from the primary too
+(read-your-writes). ReplicaPinningMiddleware resets that state per request
+and carries it across the post/redirect/get round trip with a short-lived
+cookie.
+"""
+import itertools
+import time
+
+from asgiref.local import Local
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+DEFAULT_REPLICA_MODELS = [
+    'website.service',
+    'website.project',
+    'website.teammember',
+    'website.testimonial',
+    'website.sitesetting',
+    'website.job',
+]
+
+_state = Local()
+_round_robin = itertools.count()
+_health = {}  # alias -> (healthy, checked_at)
+
+
+def pin_to_primary():
+    """Send all reads for the rest of this request to the primary"""
+    _state.pinned = True
+
+
+def unpin():
+    _state.pinned = False
+    _state.wrote = False
+
+
+def is_pinned():
+    return getattr(_state, 'pinned', False)
+
+
+def has_written():
+    return getattr(_state, 'wrote', False)
+
+
+def replica_aliases():
+    return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+def replica_models():
+    return set(getattr(settings, 'DATABASE_REPLICA_MODELS', DEFAULT_REPLICA_MODELS))
+
+
+def mark_unhealthy(alias):
+    """Take a replica out of rotation until the next health check"""
+    _health[alias] = (False, time.monotonic())
+
+
+def is_healthy(alias):
+    """Check a replica with a trivial query, caching the result for DATABASE_REPLICA_HEALTH_TTL seconds"""
+    ttl = getattr(settings, 'DATABASE_REPLICA_HEALTH_TTL', 30)
+    now = time.monotonic()
+    cached = _health.get(alias)
+    if cached and now - cached[1] < ttl:
+        return cached[0]
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT 1')
+        healthy = True
+    except Exception:
+        healthy = False
+    _health[alias] = (healthy, now)
+    return healthy
+
+
+def choose_replica():
+    """Pick the next replica alias, or None if none is configured/healthy"""
+    replicas = replica_aliases()
+    if getattr(settings, 'DATABASE_REPLICA_SELECTION', 'round_robin') == 'health':
+        replicas = [alias for alias in replicas if is_healthy(alias)]
+    if not replicas:
+        return None
+    return replicas[next(_round_robin) % len(replicas)]
+
+
+def is_cache_entry(model):
+    """DatabaseCache's stand-in model (it has only a minimal _meta)"""
+    return model._meta.app_label == 'django_cache'
+
+
+class ReplicaRouter:
+    """Route public content reads to replicas and everything else to the primary"""
+
+    def db_for_read(self, model, **hints):
+        if is_cache_entry(model) or is_pinned() or model._meta.label_lower not in replica_models():
+            return DEFAULT_DB_ALIAS
+        return choose_replica() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        if is_cache_entry(model):
+            # Caching a page is not a content write; it must not pin the visitor to the primary.
+            return DEFAULT_DB_ALIAS
+        pin_to_primary()
+        _state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary, so relations across them are fine.
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
@@ -0,0 +1,123 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from . import autocomplete, counters, edge_cache, events, funnel, single_flight, static_export
+from .models import Service, Project, TeamMember, Testimonial, SiteSetting, Job, JobApplication, ProjectRequest
+
+
+PUBLIC_MODELS = (Service, Project, TeamMember, Testimonial, SiteSetting, Job)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def purge_public_pages(sender, instance, **kwargs):
+    """Ask the edge cache to drop pages showing a changed public model"""
+    if sender not in PUBLIC_MODELS:
+        return
+    keys = edge_cache.instance_keys(instance)
+    transaction.on_commit(lambda: edge_cache.request_purge(keys))
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_public_view_cache(sender, instance, **kwargs):
+    """Mark cached public view data showing a changed public model stale"""
+    if sender not in PUBLIC_MODELS:
+        return
+    keys = edge_cache.instance_keys(instance)
+    # Now, so nothing older is served as fresh, and again after commit, so a
+    # recomputation that read the rows before the commit is not kept either.
+    single_flight.invalidate(keys)
+    transaction.on_commit(lambda: single_flight.invalidate(keys))
+    if sender is Job:
+        # Other processes notice the new generation; this one can drop its search index right away.
+        autocomplete.reset()
+        transaction.on_commit(autocomplete.reset)
+
+
+@receiver(edge_cache.purge_requested)
+def mark_static_pages_dirty(sender, keys, **kwargs):
+    """Queue exported pages showing the changed model for the next export_static run"""
+    static_export.mark_dirty(keys)
+
+
+@receiver(post_init, sender=JobApplication)
+@receiver(post_init, sender=ProjectRequest)
+def remember_status(sender, instance, **kwargs):
+    # Read __dict__ directly so deferred fields are not fetched just for this.
+    instance._original_status = instance.__dict__.get('status') if instance.pk else None
+    instance._original_job_id = instance.__dict__.get('job_id') if instance.pk else None
+
+
+@receiver(pre_save, sender=JobApplication)
+@receiver(pre_save, sender=ProjectRequest)
+def fetch_deferred_originals(sender, instance, raw=False, **kwargs):
+    """Read the stored status (and job) of a row loaded without them, e.g. with .only(), before it is changed"""
+    if raw or instance.pk is None or instance._state.adding:
+        return
+    names = ['status', 'job_id'] if sender is JobApplication else ['status']
+    missing = [name for name in names if name in instance.__dict__ and getattr(instance, f'_original_{name}') is None]
+    if missing:
+        stored = sender._base_manager.filter(pk=instance.pk).values(*missing).first() or {}
+        for name, value in stored.items():
+            setattr(instance, f'_original_{name}', value)
+
+
+@receiver(post_save, sender=JobApplication)
+@receiver(post_save, sender=ProjectRequest)
+def record_status_change(sender, instance, created, raw=False, **kwargs):
+    """
+    Append submissions and status changes to the status history and keep
+    the per-job application counters in step.
+
+    Views set ``_changed_by`` to attribute a change to an admin; restoring
+    from the archive sets ``_skip_status_history``. QuerySet.update() is not
+    seen here, so status changes must go through save().
+    """
+    previous = instance._original_status
+    previous_job_id = instance._original_job_id
+    instance._original_status = instance.status
+    instance._original_job_id = getattr(instance, 'job_id', None)
+    if raw:
+        return
+    if sender is JobApplication:
+        update_job_counters(instance, created, previous, previous_job_id)
+    if getattr(instance, '_skip_status_history', False):
+        return
+    if created:
+        funnel.record_transition(instance, '', getattr(instance, '_changed_by', None))
+        publish_status_event(instance, True, '')
+    elif previous is not None and previous != instance.status:
+        funnel.record_transition(instance, previous, getattr(instance, '_changed_by', None))
+        publish_status_event(instance, False, previous)
+
+
+def publish_status_event(instance, created, from_status):
+    """Notify open admin event streams once the save has committed"""
+    kind = funnel.KINDS[type(instance)]
+    event = {
+        'type': 'submission' if created else 'status',
+        'kind': kind,
+        'id': instance.pk,
+        'name': instance.full_name if kind == 'application' else instance.name,
+        'from_status': from_status,
+        'status': instance.status,
+        'counts': events.count_deltas(kind, created, from_status, instance.status),
+    }
+    transaction.on_commit(lambda: events.publish(event))
+
+
+def update_job_counters(application, created, previous_status, previous_job_id):
+    if created:
+        counters.application_added(application.job_id, application.status)
+    elif previous_job_id is not None and previous_job_id != application.job_id:
+        counters.application_removed(previous_job_id, previous_status or application.status)
+        counters.application_added(application.job_id, application.status)
+    elif previous_status is not None and previous_status != application.status:
+        counters.status_changed(application.job_id, previous_status, application.status)
+
+
+@receiver(post_delete, sender=JobApplication)
+def release_job_counters(sender, instance, **kwargs):
+    counters.application_removed(instance.job_id, instance.status)
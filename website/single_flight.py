@@ -0,0 +1,147 @@
+"""
+Stampede-safe caching of the data behind public views.
+
+``get_or_compute(name, compute, keys)`` caches ``compute()`` for
+PUBLIC_CACHE_TTL seconds and keeps it for PUBLIC_CACHE_STALE_TTL seconds
+longer. ``keys`` are the surrogate keys of ``edge_cache()`` (``'job'``,
+``'job-5'``, ...); a change to a public model bumps their generation
+(``invalidate()``), which makes dependent entries stale without deleting
+them. Then:
+
+* single flight: only the request that wins a short cache lock recomputes;
+  concurrent requests keep serving the stale value meanwhile (stale while
+  revalidate), so an admin save during peak traffic costs one recomputation
+  instead of one per worker;
+* on a cold miss, with nothing stale to serve, the losers wait up to
+  SINGLE_FLIGHT_WAIT seconds for the winner's result before computing it
+  themselves;
+* probabilistic early refresh ("XFetch"): as an entry nears the end of its
+  TTL, a request recomputes it early with a probability that grows as the
+  expiry approaches and with how long the computation took, so busy entries
+  are refreshed before they ever expire.
+
+Entries, locks and generations live in the SINGLE_FLIGHT_CACHE alias,
+which must be shared by all workers (the database cache by default, or
+Redis/Memcached): with a per-process cache like LocMemCache every worker
+would recompute on its own and keep serving pre-edit data until its TTL
+ran out.
+"""
+import math
+import random
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+PREFIX = 'singleflight'
+POLL_INTERVAL = 0.05
+
+
+class Entry:
+    """A cached value with what is needed to decide when to refresh it"""
+
+    def __init__(self, value, generations, fresh_until, compute_seconds):
+        self.value = value
+        self.generations = generations
+        self.fresh_until = fresh_until
+        self.compute_seconds = compute_seconds
+
+
+def shared_cache():
+    return caches[getattr(settings, 'SINGLE_FLIGHT_CACHE', 'default')]
+
+
+def ttl():
+    return getattr(settings, 'PUBLIC_CACHE_TTL', 60)
+
+
+def stale_ttl():
+    return getattr(settings, 'PUBLIC_CACHE_STALE_TTL', 300)
+
+
+def entry_key(name):
+    return f'{PREFIX}:entry:{name}'
+
+
+def lock_key(name):
+    return f'{PREFIX}:lock:{name}'
+
+
+def generation_key(key):
+    return f'{PREFIX}:gen:{key}'
+
+
+def invalidate(keys):
+    """Mark entries depending on any of ``keys`` stale; they are recomputed by one request on next use"""
+    generation = uuid.uuid4().hex
+    shared_cache().set_many({generation_key(key): generation for key in keys}, None)
+
+
+def should_refresh_early(entry, now, beta=None):
+    """XFetch: recompute before expiry with probability rising towards fresh_until"""
+    beta = getattr(settings, 'PUBLIC_CACHE_EARLY_REFRESH_BETA', 1.0) if beta is None else beta
+    if not beta or not entry.compute_seconds:
+        return False
+    return now - entry.compute_seconds * beta * math.log(random.random() or 1e-12) >= entry.fresh_until
+
+
+def acquire(name):
+    token = uuid.uuid4().hex
+    timeout = getattr(settings, 'SINGLE_FLIGHT_LOCK_TIMEOUT', 10)
+    return token if shared_cache().add(lock_key(name), token, timeout) else None
+
+
+def release(name, token):
+    if shared_cache().get(lock_key(name)) == token:
+        shared_cache().delete(lock_key(name))
+
+
+def compute_and_store(name, compute, generations):
+    started = time.time()
+    value = compute()
+    finished = time.time()
+    entry = Entry(value, generations, finished + ttl(), finished - started)
+    shared_cache().set(entry_key(name), entry, ttl() + stale_ttl())
+    return value
+
+
+def get_or_compute(name, compute, keys=()):
+    """The cached result of ``compute()`` for ``name``, recomputed by at most one caller at a time"""
+    if not getattr(settings, 'PUBLIC_VIEW_CACHE', True):
+        return compute()
+
+    generation_keys = [generation_key(key) for key in keys]
+    found = shared_cache().get_many([entry_key(name)] + generation_keys)
+    entry = found.get(entry_key(name))
+    generations = tuple(found.get(key) for key in generation_keys)
+    now = time.time()
+
+    if entry is not None:
+        fresh = entry.generations == generations and now < entry.fresh_until
+        if fresh and not should_refresh_early(entry, now):
+            return entry.value
+        token = acquire(name)
+        if token is None:
+            # Someone else is already recomputing; serve what we have.
+            return entry.value
+        try:
+            return compute_and_store(name, compute, generations)
+        finally:
+            release(name, token)
+
+    token = acquire(name)
+    if token is None:
+        deadline = now + getattr(settings, 'SINGLE_FLIGHT_WAIT', 2.0)
+        while time.time() < deadline:
+            time.sleep(POLL_INTERVAL)
+            entry = shared_cache().get(entry_key(name))
+            if entry is not None:
+                return entry.value
+        # The winner is taking too long (or died holding the lock); don't make this request wait longer.
+        return compute()
+    try:
+        return compute_and_store(name, compute, generations)
+    finally:
+        release(name, token)
@@ -0,0 +1,95 @@
+"""
+Cold-start helpers: pre-fork warm-up and import-time measurement.
+
+``import it_solutions.wsgi`` only sets Django up; the URLconf, every view
+module and the templates are loaded by the first requests a worker serves,
+so each new instance answers those slowly. ``warm()`` does that work up
+front. With STARTUP_WARM on, wsgi.py and asgi.py call it at import time;
+under ``gunicorn --preload`` that is once in the master, before forking, and
+the workers share the loaded modules and compiled templates copy-on-write.
+It never touches the database, so no connection is inherited by the workers.
+
+``measure()`` times the startup in a fresh interpreter, for
+``manage.py bench_startup`` and the startup budget test.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+
+
+def project_template_files():
+    """Template names under the project's own template directories (not third-party apps)"""
+    from django.template import engines
+
+    base_dir = str(settings.BASE_DIR)
+    engine = engines['django'].engine
+    directories = [str(directory) for directory in engine.dirs]
+    directories.append(os.path.join(base_dir, 'website', 'templates'))
+    for directory in directories:
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                if filename.endswith(('.html', '.txt')):
+                    yield os.path.relpath(os.path.join(root, filename), directory).replace(os.sep, '/')
+
+
+def warm():
+    """Import the URLconf and views and compile the project templates; returns seconds taken"""
+    from django.template.loader import get_template
+    from django.urls import get_resolver
+
+    started = time.perf_counter()
+    resolver = get_resolver()
+    # Reading reverse_dict fills the resolver's reverse lookup tables, which
+    # imports every view module the URLconf references; the value is unused.
+    _ = resolver.reverse_dict
+    for name in project_template_files():
+        get_template(name)
+    return time.perf_counter() - started
+
+
+PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+import it_solutions.wsgi
+imported = time.perf_counter()
+warm_seconds = 0.0
+if {warm!r}:
+    from website.startup import warm
+    warm_seconds = warm()
+print(json.dumps({{
+    'import_seconds': imported - started,
+    'warm_seconds': warm_seconds,
+    'modules': sorted(sys.modules),
+}}))
+'''
+
+
+def measure(warm=False, importtime=False):
+    """Start the WSGI application in a fresh interpreter and return its timings and loaded modules"""
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', PROBE.format(warm=warm)]
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'it_solutions.settings'))
+    result = subprocess.run(command, cwd=str(settings.BASE_DIR), env=env, capture_output=True, text=True, check=True)
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    data['importtime'] = parse_importtime(result.stderr) if importtime else []
+    return data
+
+
+def parse_importtime(output):
+    """[(cumulative microseconds, module)] from ``python -X importtime`` output"""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        try:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            rows.append((int(cumulative), name.strip()))
+        except ValueError:
+            continue  # the header line
+    return rows
@@ -66,3 +66,24 @@ document.querySelectorAll('form[method="post"]').forEach(form => {
     }
 });
 
+
+// Live counters: patch [data-live-count] elements from the admin event stream
+const mainContent = document.getElementById('mainContent');
+const liveCounts = document.querySelectorAll('[data-live-count]');
+
+if (mainContent && mainContent.dataset.eventsUrl && liveCounts.length && window.EventSource) {
+    const source = new EventSource(mainContent.dataset.eventsUrl);
+    const applyCounts = (e) => {
+        const event = JSON.parse(e.data);
+        Object.entries(event.counts || {}).forEach(([key, delta]) => {
+            document.querySelectorAll(`[data-live-count="${key}"]`).forEach(el => {
+                el.textContent = Math.max(0, (parseInt(el.textContent, 10) || 0) + delta);
+                el.style.transition = 'color 0.3s ease';
+                el.style.color = '#FAA624';
+                setTimeout(() => { el.style.color = ''; }, 1500);
+            });
+        });
+    };
+    source.addEventListener('submission', applyCounts);
+    source.addEventListener('status', applyCounts);
+}
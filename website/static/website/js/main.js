@@ -172,7 +172,8 @@ function openJobModal(jobId) {
                     <div class="job-application-form">
                         <h3>Apply for this Position</h3>
                         <form method="post" action="/apply-job/${jobId}/" enctype="multipart/form-data" id="jobApplicationForm">
-                            <input type="hidden" name="csrfmiddlewaretoken" value="${getCookie('csrftoken')}">
+                            <input type="hidden" name="csrfmiddlewaretoken" value="${getCookie('csrftoken') || ''}" data-csrf-deferred>
+                            <input type="hidden" name="idempotency_key" value="${newIdempotencyKey()}">
                             
                             <div class="form-row">
                                 <div class="form-group">
@@ -214,7 +215,7 @@ function openJobModal(jobId) {
                                 </div>
                                 <div class="form-group">
                                     <label for="resume">Resume * (PDF, DOC, DOCX - Max 5MB)</label>
-                                    <input type="file" id="resume" name="resume" accept=".pdf,.doc,.docx" required>
+                                    <input type="file" id="resume" name="resume" accept=".pdf,.doc,.docx" required data-chunked-upload="/uploads/">
                                 </div>
                             </div>
                             
@@ -273,6 +274,43 @@ window.onclick = function(event) {
     }
 }
 
+// Forms on edge-cached pages are rendered without a CSRF token;
+// fetch one just before the form is actually submitted.
+document.addEventListener('submit', function(e) {
+    const form = e.target;
+
+    // A key generated once per form lets the server ignore double-clicks and retries.
+    const keyInput = form.querySelector('input[name="idempotency_key"]');
+    if (keyInput && !keyInput.value) {
+        keyInput.value = newIdempotencyKey();
+    }
+
+    const tokenInput = form.querySelector('input[data-csrf-deferred]');
+    if (!tokenInput || tokenInput.value) {
+        return;
+    }
+    e.preventDefault();
+    fetch('/csrf-token/', { credentials: 'same-origin', cache: 'no-store' })
+        .then(response => response.json())
+        .then(data => {
+            tokenInput.value = data.csrfToken;
+            form.submit();
+        })
+        .catch(() => {
+            alert('Could not submit the form. Please check your connection and try again.');
+        });
+});
+
+// Random one-time key for a form submission
+function newIdempotencyKey() {
+    if (window.crypto && crypto.randomUUID) {
+        return crypto.randomUUID();
+    }
+    const bytes = new Uint8Array(16);
+    crypto.getRandomValues(bytes);
+    return Array.from(bytes, b => b.toString(16).padStart(2, '0')).join('');
+}
+
 // Get CSRF token from cookies
 function getCookie(name) {
     let cookieValue = null;
@@ -289,3 +327,134 @@ function getCookie(name) {
     return cookieValue;
 }
 
+
+// Careers infinite scroll: load the next page of listings when "Load More" comes into view
+const loadMore = document.getElementById('jobsLoadMore');
+if (loadMore && window.fetch) {
+    const jobsList = document.querySelector('.jobs-list');
+    let loading = false;
+
+    const loadNextPage = () => {
+        if (loading || !loadMore.dataset.jsonUrl) {
+            return;
+        }
+        loading = true;
+        loadMore.textContent = 'Loading...';
+        fetch(loadMore.dataset.jsonUrl)
+            .then(response => response.json())
+            .then(data => {
+                jobsList.insertAdjacentHTML('beforeend', data.html);
+                if (data.next) {
+                    loadMore.dataset.jsonUrl = data.next;
+                    loadMore.href = '?' + data.next.split('?')[1];
+                    loadMore.textContent = 'Load More Jobs';
+                } else {
+                    loadMore.parentElement.remove();
+                }
+            })
+            .catch(() => {
+                loadMore.textContent = 'Load More Jobs';
+            })
+            .finally(() => {
+                loading = false;
+            });
+    };
+
+    loadMore.addEventListener('click', (e) => {
+        e.preventDefault();
+        loadNextPage();
+    });
+
+    if ('IntersectionObserver' in window) {
+        new IntersectionObserver(entries => {
+            if (entries.some(entry => entry.isIntersecting)) {
+                loadNextPage();
+            }
+        }, { rootMargin: '400px' }).observe(loadMore);
+    }
+}
+
+
+// Careers search suggestions: titles, departments, locations and technologies as you type
+const searchInput = document.querySelector('input[data-autocomplete-url]');
+if (searchInput && window.fetch) {
+    const list = document.getElementById('searchSuggestions');
+    let timer = null;
+    let active = -1;
+    let latest = '';
+
+    const hide = () => {
+        list.hidden = true;
+        list.innerHTML = '';
+        active = -1;
+    };
+
+    const highlight = (index) => {
+        const items = list.querySelectorAll('a');
+        items.forEach((item, i) => item.classList.toggle('active', i === index));
+        active = index;
+    };
+
+    const show = (suggestions) => {
+        list.innerHTML = '';
+        suggestions.forEach(suggestion => {
+            const item = document.createElement('li');
+            const link = document.createElement('a');
+            link.href = suggestion.url;
+            link.setAttribute('role', 'option');
+            link.textContent = suggestion.value;
+            const kind = document.createElement('span');
+            kind.className = 'search-suggestion-kind';
+            kind.textContent = suggestion.kind;
+            link.appendChild(kind);
+            item.appendChild(link);
+            list.appendChild(item);
+        });
+        list.hidden = suggestions.length === 0;
+        active = -1;
+    };
+
+    searchInput.addEventListener('input', () => {
+        clearTimeout(timer);
+        const query = searchInput.value.trim();
+        if (!query) {
+            hide();
+            return;
+        }
+        timer = setTimeout(() => {
+            latest = query;
+            fetch(searchInput.dataset.autocompleteUrl + '?q=' + encodeURIComponent(query))
+                .then(response => response.json())
+                .then(data => {
+                    // Ignore answers that arrive after a newer query was sent
+                    if (data.query === latest) {
+                        show(data.suggestions);
+                    }
+                })
+                .catch(hide);
+        }, 120);
+    });
+
+    searchInput.addEventListener('keydown', (e) => {
+        const items = list.querySelectorAll('a');
+        if (list.hidden || !items.length) {
+            return;
+        }
+        if (e.key === 'ArrowDown' || e.key === 'ArrowUp') {
+            e.preventDefault();
+            const step = e.key === 'ArrowDown' ? 1 : -1;
+            highlight((active + step + items.length) % items.length);
+        } else if (e.key === 'Enter' && active >= 0) {
+            e.preventDefault();
+            window.location.href = items[active].href;
+        } else if (e.key === 'Escape') {
+            hide();
+        }
+    });
+
+    document.addEventListener('click', (e) => {
+        if (!list.contains(e.target) && e.target !== searchInput) {
+            hide();
+        }
+    });
+}
@@ -0,0 +1,154 @@
+// Resumable chunked uploads (tus-style) for <input type="file" data-chunked-upload="/uploads/">.
+// On submit, each selected file is sent in small PATCH requests; after a dropped
+// connection the upload continues from the offset the server reports. The form
+// is then posted with <name>_upload=<id> instead of the file itself.
+(function() {
+    const RETRIES = 5;
+
+    function encodeMetadata(fields) {
+        return Object.entries(fields)
+            .map(([key, value]) => `${key} ${btoa(unescape(encodeURIComponent(value)))}`)
+            .join(',');
+    }
+
+    function csrfToken(form) {
+        const input = form.querySelector('input[name="csrfmiddlewaretoken"]');
+        if (input && input.value) {
+            return Promise.resolve(input.value);
+        }
+        // Edge-cached pages render forms without a token; fetch one and keep it for the final post.
+        return fetch('/csrf-token/', { credentials: 'same-origin', cache: 'no-store' })
+            .then(response => response.json())
+            .then(data => {
+                if (input) {
+                    input.value = data.csrfToken;
+                }
+                return data.csrfToken;
+            });
+    }
+
+    function request(method, url, token, headers, body) {
+        return fetch(url, {
+            method: method,
+            credentials: 'same-origin',
+            headers: Object.assign({ 'Tus-Resumable': '1.0.0', 'X-CSRFToken': token }, headers),
+            body: body,
+        }).then(response => {
+            if (!response.ok && response.status !== 409) {
+                return response.text().then(text => {
+                    const error = new Error(text || `Upload failed (${response.status})`);
+                    error.status = response.status;
+                    throw error;
+                });
+            }
+            return response;
+        });
+    }
+
+    function storageKey(file) {
+        return `upload:${file.name}:${file.size}:${file.lastModified}`;
+    }
+
+    // Reuse an unfinished upload of the same file from an earlier attempt, if the server still has it.
+    function resumeOrCreate(endpoint, file, token) {
+        const saved = localStorage.getItem(storageKey(file));
+        const create = () => request('POST', endpoint, token, {
+            'Upload-Length': String(file.size),
+            'Upload-Metadata': encodeMetadata({ filename: file.name }),
+        }).then(response => {
+            const url = response.headers.get('Location');
+            localStorage.setItem(storageKey(file), url);
+            return { url: url, offset: 0, chunkSize: parseInt(response.headers.get('Upload-Chunk-Size'), 10) || 1048576 };
+        });
+        if (!saved) {
+            return create();
+        }
+        return request('HEAD', saved, token, {})
+            .then(response => ({ url: saved, offset: parseInt(response.headers.get('Upload-Offset'), 10), chunkSize: 1048576 }))
+            .catch(() => {
+                localStorage.removeItem(storageKey(file));
+                return create();
+            });
+    }
+
+    function sendChunks(upload, file, token, onProgress, attempt) {
+        if (upload.offset >= file.size) {
+            return Promise.resolve(upload);
+        }
+        const chunk = file.slice(upload.offset, upload.offset + upload.chunkSize);
+        return request('PATCH', upload.url, token, {
+            'Upload-Offset': String(upload.offset),
+            'Content-Type': 'application/offset+octet-stream',
+        }, chunk).then(response => {
+            upload.offset = parseInt(response.headers.get('Upload-Offset'), 10);
+            onProgress(upload.offset / file.size);
+            return sendChunks(upload, file, token, onProgress, 0);
+        }).catch(error => {
+            if (error.status || attempt >= RETRIES) {
+                throw error;
+            }
+            // Network error: wait, ask the server how far it got, and carry on from there.
+            return new Promise(resolve => setTimeout(resolve, 1000 * Math.pow(2, attempt)))
+                .then(() => request('HEAD', upload.url, token, {}))
+                .then(response => {
+                    upload.offset = parseInt(response.headers.get('Upload-Offset'), 10);
+                    return sendChunks(upload, file, token, onProgress, attempt + 1);
+                }, () => sendChunks(upload, file, token, onProgress, attempt + 1));
+        });
+    }
+
+    function uploadInput(input, token) {
+        const file = input.files[0];
+        const label = input.closest('.form-group') ? input.closest('.form-group').querySelector('label') : null;
+        const originalLabel = label ? label.textContent : '';
+        const onProgress = fraction => {
+            if (label) {
+                label.textContent = `${originalLabel} (uploading ${Math.floor(fraction * 100)}%)`;
+            }
+        };
+        return resumeOrCreate(input.dataset.chunkedUpload, file, token)
+            .then(upload => sendChunks(upload, file, token, onProgress, 0))
+            .then(upload => {
+                localStorage.removeItem(storageKey(file));
+                const hidden = document.createElement('input');
+                hidden.type = 'hidden';
+                hidden.name = `${input.name}_upload`;
+                hidden.value = upload.url.replace(/\/$/, '').split('/').pop();
+                input.form.appendChild(hidden);
+                // Disabled inputs are not submitted, so the bytes are not sent twice.
+                input.disabled = true;
+                if (label) {
+                    label.textContent = originalLabel;
+                }
+            });
+    }
+
+    document.addEventListener('submit', function(e) {
+        const form = e.target;
+        const inputs = Array.from(form.querySelectorAll('input[type="file"][data-chunked-upload]'))
+            .filter(input => !input.disabled && input.files.length);
+        if (!inputs.length || !window.fetch || !window.Blob || !Blob.prototype.slice) {
+            return;
+        }
+        e.preventDefault();
+        e.stopImmediatePropagation();
+        const button = form.querySelector('[type="submit"]');
+        if (button) {
+            button.disabled = true;
+        }
+        csrfToken(form)
+            .then(token => Promise.all(inputs.map(input => uploadInput(input, token))))
+            .then(() => {
+                if (button) {
+                    button.disabled = false;
+                }
+                form.requestSubmit ? form.requestSubmit() : form.submit();
+            })
+            .catch(error => {
+                if (button) {
+                    button.disabled = false;
+                }
+                alert(error.message || 'Could not upload the file. Please check your connection and try again.');
+            });
+    }, true);
+})();
@@ -0,0 +1,183 @@
+"""
+Static export of the public pages for nginx to serve without Django.
+
+``manage.py export_static`` renders home, careers and the job-detail JSON
+into a new release directory under STATIC_EXPORT_ROOT and atomically
+repoints the ``current`` symlink at it. Each page is recorded as a
+StaticPage with the surrogate keys of its view (see ``edge_cache()``);
+when a public model changes, the edge cache purge signal marks the pages
+sharing its keys dirty, so the next run only re-renders those and
+hard-links everything else from the previous release.
+
+Example nginx configuration (anything with a query string or a flash
+message cookie, every POST and any path not exported falls through to
+Django)::
+
+    root /srv/worklink/static_export/current;
+    error_page 418 = @django;
+    location / {
+        if ($args) { return 418; }
+        # A pending flash message is shown (and cleared) by Django.
+        if ($cookie_messages) { return 418; }
+        try_files $uri/index.html $uri/index.json @django;
+    }
+    location @django { proxy_pass http://django; }
+"""
+import os
+import shutil
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db.models import Q
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from .models import Job, StaticPage
+
+
+def export_root():
+    return str(getattr(settings, 'STATIC_EXPORT_ROOT', os.path.join(settings.BASE_DIR, 'static_export')))
+
+
+def current_link():
+    return os.path.join(export_root(), 'current')
+
+
+def current_release():
+    link = current_link()
+    return os.path.realpath(link) if os.path.islink(link) else None
+
+
+def public_paths():
+    """Every page the export should contain"""
+    paths = [reverse('home'), reverse('careers')]
+    for job_id in Job.objects.filter(is_active=True).values_list('pk', flat=True).order_by('pk'):
+        paths.append(reverse('get_job_details', args=[job_id]))
+    return paths
+
+
+def page_keys(path):
+    match = resolve(path)
+    return [key.format(**match.kwargs) for key in getattr(match.func, 'surrogate_keys', ())]
+
+
+def mark_dirty(keys):
+    """Flag exported pages depending on any of ``keys`` for regeneration"""
+    query = Q()
+    for key in keys:
+        query |= Q(keys__contains=f' {key} ')
+    if query:
+        StaticPage.objects.filter(query).update(dirty_at=timezone.now())
+
+
+def render(path):
+    """Render ``path`` as an anonymous visitor with no cookies would see it"""
+    # Imported here: django.test is only needed by the export command, not at web startup.
+    from django.test import RequestFactory
+
+    request = RequestFactory().get(path)
+    request.user = AnonymousUser()
+    # Forms get an empty CSRF field filled in by the browser; a token baked into the file would be shared by everyone.
+    request.static_export = True
+    match = resolve(path)
+    request.resolver_match = match
+    response = match.func(request, *match.args, **match.kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    return response
+
+
+def output_name(path, content_type):
+    filename = 'index.json' if content_type.startswith('application/json') else 'index.html'
+    return os.path.join(path.strip('/'), filename)
+
+
+def write_atomic(target, content):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp = f'{target}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(content)
+    # Replacing (not rewriting) keeps hard-linked copies in older releases intact.
+    os.replace(tmp, target)
+
+
+def remove_page(release, path):
+    directory = os.path.join(release, path.strip('/'))
+    for filename in ('index.html', 'index.json'):
+        try:
+            os.remove(os.path.join(directory, filename))
+        except FileNotFoundError:
+            pass
+
+
+def swap(release):
+    """Point ``current`` at ``release`` in one rename, so nginx never sees a half-written tree"""
+    tmp_link = os.path.join(export_root(), f'.current-{os.getpid()}')
+    if os.path.lexists(tmp_link):
+        os.remove(tmp_link)
+    os.symlink(os.path.relpath(release, export_root()), tmp_link)
+    os.replace(tmp_link, current_link())
+
+
+def prune(keep):
+    releases_dir = os.path.join(export_root(), 'releases')
+    current = current_release()
+    releases = sorted(os.path.join(releases_dir, name) for name in os.listdir(releases_dir))
+    for release in releases[:-keep] if keep else []:
+        if release != current:
+            shutil.rmtree(release, ignore_errors=True)
+
+
+def stale_paths(full=False):
+    """(paths to render, paths to remove) for the next export"""
+    paths = public_paths()
+    known = {page.path: page for page in StaticPage.objects.all()}
+    if full or current_release() is None:
+        render_paths = paths
+    else:
+        render_paths = [path for path in paths if path not in known or known[path].dirty_at is not None]
+    wanted = set(paths)
+    return render_paths, [path for path in known if path not in wanted]
+
+
+def export(full=False, keep=3, log=None):
+    """Write a new release with the stale pages re-rendered; returns (rendered, removed) paths"""
+    started = timezone.now()
+    render_paths, remove_paths = stale_paths(full)
+    if not render_paths and not remove_paths:
+        return [], []
+
+    previous = current_release()
+    release = os.path.join(export_root(), 'releases', started.strftime('%Y%m%d-%H%M%S-%f'))
+    if previous and not full:
+        shutil.copytree(previous, release, copy_function=os.link)
+    else:
+        os.makedirs(release)
+
+    rendered = []
+    for path in render_paths:
+        response = render(path)
+        if response.status_code != 200:
+            # e.g. a job deactivated since the list was read
+            remove_paths.append(path)
+            continue
+        write_atomic(os.path.join(release, output_name(path, response['Content-Type'])), response.content)
+        keys = f' {" ".join(page_keys(path))} '
+        page, created = StaticPage.objects.get_or_create(path=path, defaults={'keys': keys, 'dirty_at': started})
+        if not created and page.keys != keys:
+            StaticPage.objects.filter(pk=page.pk).update(keys=keys)
+        rendered.append(path)
+        if log:
+            log(f'rendered {path}')
+
+    for path in remove_paths:
+        remove_page(release, path)
+        if log:
+            log(f'removed {path}')
+
+    swap(release)
+    StaticPage.objects.filter(path__in=remove_paths).delete()
+    # Pages changed again while rendering stay dirty for the next run.
+    StaticPage.objects.filter(path__in=rendered, dirty_at__lte=started).update(dirty_at=None, exported_at=timezone.now())
+    prune(keep)
+    return rendered, remove_paths
@@ -0,0 +1,78 @@
+import hashlib
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.middleware.csrf import get_token
+from django.utils.html import format_html
+
+from website import edge_cache, metrics
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def deferred_csrf_token(context):
+    """
+    CSRF hidden input for public forms.
+
+    When public pages are edge cached or statically exported the token is
+    left empty (rendering it would make the page per-visitor);
+    website/js/main.js fetches it from the csrf-token endpoint just before
+    the form is submitted.
+    """
+    if edge_cache.is_enabled() or getattr(context.get('request'), 'static_export', False):
+        return format_html('<input type="hidden" name="csrfmiddlewaretoken" value="" data-csrf-deferred>')
+    return format_html(
+        '<input type="hidden" name="csrfmiddlewaretoken" value="{}">', get_token(context['request'])
+    )
+
+
+class SiteFragmentNode(template.Node):
+
+    def __init__(self, nodelist, name, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        if not getattr(settings, 'SITE_FRAGMENT_CACHE', True):
+            return self.nodelist.render(context)
+        site_settings = context.get('site_settings')
+        version = getattr(site_settings, 'version', 0)
+        vary_on = ':'.join(str(var.resolve(context)) for var in self.vary_on)
+        key = 'sitefragment:%s:%s:%s' % (
+            self.name.resolve(context), version, hashlib.md5(vary_on.encode()).hexdigest()
+        )
+        content = cache.get(key)
+        metrics.cache_lookup('site_fragment', int(content is not None), int(content is None))
+        if content is None:
+            content = self.nodelist.render(context)
+            cache.set(key, content, getattr(settings, 'SITE_FRAGMENT_CACHE_TIMEOUT', 86400))
+        return content
+
+
+@register.tag
+def sitefragment(parser, token):
+    """
+    Cache a layout fragment until SiteSetting changes.
+
+    Usage::
+
+        {% sitefragment 'site_header' [vary_on ...] %} ... {% endsitefragment %}
+
+    The key includes ``site_settings.version``, which every SiteSetting save
+    bumps, so an edit in the admin panel is picked up on the next request in
+    every process without explicit invalidation. Use ``vary_on`` for anything
+    else the fragment depends on (e.g. the current url_name).
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError("'%s' tag requires a fragment name." % bits[0])
+    nodelist = parser.parse(('endsitefragment',))
+    parser.delete_first_token()
+    return SiteFragmentNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        [parser.compile_filter(bit) for bit in bits[2:]],
+    )
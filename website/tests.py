@@ -1,3 +1,1278 @@
-from django.test import TestCase
+import base64
+import csv
+import io
+import json
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import zipfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core import mail
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.http import Http404, HttpResponse
+from django.test import AsyncClient, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+
+from . import (
+    api, archive, autocomplete, counters, edge_cache, events, funnel, media_gc, metrics, profiling, routers, single_flight,
+    startup, static_export, uploads, views,
+)
+from .db_backends.sqlite3 import base as sqlite_backend
+from .middleware import ReplicaPinningMiddleware
+from .models import (
+    ArchivedJobApplication, ArchivedProjectRequest, FunnelDailyRollup, IdempotencyKey, Job, JobApplication, Project,
+    ProjectRequest, RequestProfile, Service, SiteSetting, StatusTransition, TeamMember, Testimonial, UploadSession,
+)
+
 
 # Create your tests here.
+
+@override_settings(DATABASE_REPLICAS=['replica'], DATABASE_REPLICA_SELECTION='round_robin')
+class ReplicaRouterTests(TestCase):
+    """Route reads between the primary and a second SQLite file acting as replica"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tmpdir = tempfile.mkdtemp()
+        connections.settings['replica'] = {
+            **connections.settings[DEFAULT_DB_ALIAS],
+            'NAME': os.path.join(cls.tmpdir, 'replica.sqlite3'),
+            'TEST': {},
+        }
+        with connections['replica'].schema_editor() as editor:
+            editor.create_model(Service)
+
+    @classmethod
+    def tearDownClass(cls):
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+        shutil.rmtree(cls.tmpdir, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        routers.unpin()
+        Service.objects.using('replica').all().delete()
+        Service.objects.using('replica').create(title='Replica only', description='x', icon='fa-code')
+
+    def tearDown(self):
+        routers.unpin()
+
+    def test_public_reads_go_to_replica(self):
+        self.assertEqual(list(Service.objects.values_list('title', flat=True)), ['Replica only'])
+
+    def test_private_models_read_from_primary(self):
+        self.assertEqual(routers.ReplicaRouter().db_for_read(JobApplication), DEFAULT_DB_ALIAS)
+
+    def test_reads_after_write_stay_on_primary(self):
+        Service.objects.create(title='Primary', description='x', icon='fa-code')
+        self.assertEqual(list(Service.objects.values_list('title', flat=True)), ['Primary'])
+
+    def test_post_pins_request_and_sets_cookie(self):
+        response = self.client.post('/submit-request/', {
+            'name': 'Jane', 'email': 'jane@example.com', 'project_type': 'Web', 'description': 'A site',
+        })
+        self.assertIn('primary_pin', response.cookies)
+        self.assertFalse(routers.is_pinned())
+
+    def test_public_responses_never_set_the_pin(self):
+        def view(request, cache_control):
+            Service.objects.create(title='Primary', description='x', icon='fa-code')
+            response = HttpResponse()
+            patch_cache_control(response, **cache_control)
+            return response
+
+        for cache_control, pinned in (({'public': True, 's_maxage': 300}, False), ({'private': True}, True)):
+            response = ReplicaPinningMiddleware(lambda request: view(request, cache_control))(RequestFactory().get('/'))
+            self.assertEqual('primary_pin' in response.cookies, pinned)
+
+    @override_settings(DATABASE_REPLICAS=['replica', 'missing'], DATABASE_REPLICA_SELECTION='health')
+    def test_health_aware_selection_skips_failed_replica(self):
+        routers.mark_unhealthy('missing')
+        self.assertEqual({routers.choose_replica() for _ in range(4)}, {'replica'})
+
+
+class SqliteBackendTests(SimpleTestCase):
+
+    def setUp(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        self.path = os.path.join(tmpdir, 'test.sqlite3')
+
+    def connect(self, **options):
+        wrapper = sqlite_backend.DatabaseWrapper(
+            {**connections[DEFAULT_DB_ALIAS].settings_dict, 'NAME': self.path, 'OPTIONS': options}, alias='sqlite_test',
+        )
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def test_pragmas_applied_on_connect(self):
+        with self.connect(pragmas={'busy_timeout': 1234}).cursor() as cursor:
+            values = {}
+            for pragma in ('journal_mode', 'busy_timeout', 'synchronous'):
+                cursor.execute(f'PRAGMA {pragma}')
+                values[pragma] = cursor.fetchone()[0]
+        self.assertEqual(values, {'journal_mode': 'wal', 'busy_timeout': 1234, 'synchronous': 1})  # 1 = NORMAL
+
+    def test_transactions_begin_immediate(self):
+        wrapper = self.connect()
+        wrapper.ensure_connection()
+        with CaptureQueriesContext(wrapper) as queries:
+            wrapper._start_transaction_under_autocommit()
+        self.assertEqual(queries[-1]['sql'], 'BEGIN IMMEDIATE')
+        # The write lock is already held, before anything was written.
+        other = sqlite3.connect(self.path, timeout=0)
+        self.addCleanup(other.close)
+        with self.assertRaisesMessage(sqlite3.OperationalError, 'database is locked'):
+            other.execute('BEGIN IMMEDIATE')
+        wrapper.connection.execute('ROLLBACK')
+
+    def test_locked_writes_are_retried_then_raised(self):
+        wrapper = self.connect(pragmas={'busy_timeout': 0}, lock_retries=3, lock_retry_delay=0)
+        with wrapper.cursor() as cursor:
+            cursor.execute('CREATE TABLE t (x INTEGER)')
+        holder = sqlite3.connect(self.path, timeout=0, isolation_level=None)
+        self.addCleanup(holder.close)
+        holder.execute('BEGIN IMMEDIATE')
+        with mock.patch('website.db_backends.sqlite3.base.time.sleep') as sleep:
+            with self.assertRaisesMessage(OperationalError, 'database is locked'), wrapper.cursor() as cursor:
+                cursor.execute('INSERT INTO t VALUES (1)')
+        self.assertEqual(sleep.call_count, 2)  # three attempts
+
+        holder.execute('ROLLBACK')
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise sqlite3.OperationalError('database is locked')
+            return 'ok'
+
+        policy = sqlite_backend.LockRetryPolicy(attempts=3, base_delay=0)
+        self.assertEqual(policy.run(flaky), 'ok')
+        with self.assertRaisesMessage(sqlite3.OperationalError, 'no such table'):
+            policy.run(mock.Mock(side_effect=sqlite3.OperationalError('no such table: x')))
+
+
+class ArchiveTests(TestCase):
+
+    def setUp(self):
+        self.job = Job.objects.create(
+            title='Python Developer', location='Remote', short_description='x',
+            full_description='x', requirements='x', responsibilities='x',
+        )
+        self.old = JobApplication.objects.create(
+            job=self.job, full_name='Old Applicant', email='old@example.com', phone='123',
+            resume='resumes/old.pdf', cover_letter='Hello', status='rejected',
+        )
+        self.submitted_at = timezone.now() - timedelta(days=400)
+        JobApplication.objects.filter(pk=self.old.pk).update(submitted_at=self.submitted_at)
+        self.open = JobApplication.objects.create(
+            job=self.job, full_name='Open Applicant', email='open@example.com', phone='456',
+            resume='resumes/open.pdf',
+        )
+
+    def test_archive_moves_only_old_terminal_rows(self):
+        cutoff = timezone.now() - timedelta(days=365)
+        self.assertEqual(archive.archive_batch('applications', cutoff), 1)
+        self.assertEqual(list(JobApplication.objects.values_list('pk', flat=True)), [self.open.pk])
+        archived = ArchivedJobApplication.objects.get()
+        self.assertEqual(archived.original_id, self.old.pk)
+        self.assertEqual(archived.job_title, 'Python Developer')
+        self.assertEqual(archived.data['cover_letter'], 'Hello')
+
+    def test_restore_round_trip(self):
+        archive.archive_batch('applications', timezone.now() - timedelta(days=365))
+        restored = archive.restore('applications', ArchivedJobApplication.objects.get())
+        restored.refresh_from_db()
+        self.assertEqual(restored.pk, self.old.pk)
+        self.assertEqual(restored.resume.name, 'resumes/old.pdf')
+        self.assertEqual(restored.submitted_at, self.submitted_at)
+        self.assertFalse(ArchivedJobApplication.objects.exists())
+
+
+class MediaGcTests(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        settings_override = override_settings(MEDIA_ROOT=self.tmpdir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        job = Job.objects.create(title='Dev', short_description='x', full_description='x', requirements='x', responsibilities='x')
+        JobApplication.objects.create(job=job, full_name='Live', email='live@example.com', phone='1', resume='resumes/live.pdf')
+        archived = JobApplication.objects.create(
+            job=job, full_name='Old', email='old@example.com', phone='2', resume='resumes/archived.pdf', status='rejected',
+        )
+        JobApplication.objects.filter(pk=archived.pk).update(submitted_at=timezone.now() - timedelta(days=400))
+        archive.archive_batch('applications', timezone.now() - timedelta(days=365))
+        day_ago = time.time() - 2 * 86400
+        for name in ('live.pdf', 'archived.pdf', 'orphan.pdf', 'recent.pdf'):
+            self.write(f'resumes/{name}', mtime=None if name == 'recent.pdf' else day_ago)
+
+    def write(self, name, mtime=None):
+        path = os.path.join(self.tmpdir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(b'x' * 10)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+
+    def gc(self, *args):
+        out = io.StringIO()
+        call_command('gc_media', *args, stdout=out)
+        return out.getvalue()
+
+    def remaining(self):
+        return sorted(os.listdir(os.path.join(self.tmpdir, 'resumes')))
+
+    def test_dry_run_only_reports(self):
+        output = self.gc()
+        self.assertIn('resumes/orphan.pdf (10 bytes)', output)
+        self.assertIn('1 orphaned file(s)', output)
+        self.assertEqual(self.remaining(), ['archived.pdf', 'live.pdf', 'orphan.pdf', 'recent.pdf'])
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir, media_gc.QUARANTINE_DIR)))
+
+    def test_quarantine_moves_orphans(self):
+        self.gc('--quarantine')
+        self.assertEqual(self.remaining(), ['archived.pdf', 'live.pdf', 'recent.pdf'])
+        quarantine = os.path.join(self.tmpdir, media_gc.QUARANTINE_DIR)
+        [batch] = os.listdir(quarantine)
+        self.assertTrue(os.path.isfile(os.path.join(quarantine, batch, 'resumes', 'orphan.pdf')))
+        # A second run does not look inside the quarantine.
+        self.assertIn('0 orphaned file(s)', self.gc())
+
+    def test_delete_keeps_referenced_and_recent_files(self):
+        self.gc('--delete')
+        self.assertEqual(self.remaining(), ['archived.pdf', 'live.pdf', 'recent.pdf'])
+
+    def test_min_age(self):
+        self.assertEqual(dict(media_gc.find_orphans(min_age=0)), {'resumes/orphan.pdf': 10, 'resumes/recent.pdf': 10})
+        self.gc('--delete', '--min-age', '0')
+        self.assertEqual(self.remaining(), ['archived.pdf', 'live.pdf'])
+
+    def test_archived_resumes_are_referenced(self):
+        self.assertTrue(ArchivedJobApplication.objects.exists())
+        self.assertFalse(JobApplication.objects.filter(resume='resumes/archived.pdf').exists())
+        self.assertIn('resumes/archived.pdf', media_gc.referenced_paths())
+
+
+@override_settings(SESSIONLESS_PUBLIC_PAGES=True)
+class SessionlessPublicPagesTests(TestCase):
+
+    def test_public_submission_uses_cookie_messages_only(self):
+        response = self.client.post('/submit-request/', {
+            'name': 'Jane', 'email': 'jane@example.com', 'project_type': 'Web', 'description': 'A site',
+        })
+        self.assertIn('messages', response.cookies)
+        self.assertNotIn('sessionid', response.cookies)
+        self.assertFalse(Session.objects.exists())
+
+        response = self.client.get('/')
+        self.assertContains(response, 'Thank you!')
+        self.assertNotIn('sessionid', response.cookies)
+        self.assertFalse(Session.objects.exists())
+
+    def test_admin_panel_keeps_database_sessions(self):
+        User.objects.create_user('staff', password='secret', is_staff=True)
+        self.client.post('/admin-panel/login/', {'username': 'staff', 'password': 'secret'})
+        self.assertTrue(Session.objects.exists())
+        self.assertEqual(self.client.get('/admin-panel/').status_code, 200)
+
+
+@override_settings(EDGE_CACHE_PUBLIC_PAGES=True, EDGE_CACHE_S_MAXAGE=120)
+class EdgeCacheTests(TestCase):
+
+    def test_public_page_is_shared_cacheable(self):
+        response = self.client.get('/')
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('s-maxage=120', response['Cache-Control'])
+        self.assertIn('sitesetting', response['Surrogate-Key'].split())
+        self.assertNotIn('csrftoken', response.cookies)
+        self.assertNotIn('Cookie', response.get('Vary', ''))
+        self.assertContains(response, 'data-csrf-deferred')
+
+    def test_pending_flash_message_keeps_page_private(self):
+        self.client.post('/submit-request/', {
+            'name': 'Jane', 'email': 'jane@example.com', 'project_type': 'Web', 'description': 'A site',
+        })
+        response = self.client.get('/')
+        self.assertNotIn('public', response['Cache-Control'])
+
+    def test_form_posts_redirect_to_an_uncached_url(self):
+        response = self.client.post('/submit-request/', {'name': 'Jane'})
+        self.assertEqual(response['Location'], '/?notice=1')
+        # Even without the cookie (as a proxy keyed on the URL would see it), the page is not shareable.
+        self.client.cookies.clear()
+        response = self.client.get(response['Location'])
+        self.assertNotIn('public', response['Cache-Control'])
+        self.assertNotIn('Surrogate-Key', response)
+
+    def test_csrf_token_endpoint(self):
+        response = self.client.get('/csrf-token/')
+        self.assertTrue(response.json()['csrfToken'])
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertIn('csrftoken', response.cookies)
+
+    def test_model_change_requests_purge(self):
+        received = []
+        edge_cache.purge_requested.connect(lambda sender, keys, **kw: received.append(keys), weak=False,
+                                           dispatch_uid='test_purge')
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                Service.objects.create(title='Web', description='x', icon='fa-code')
+        finally:
+            edge_cache.purge_requested.disconnect(dispatch_uid='test_purge')
+        self.assertEqual(received[0][0], 'service')
+
+
+@override_settings(SITE_FRAGMENT_CACHE=True)
+class SiteFragmentCacheTests(TestCase):
+
+    def test_header_follows_site_setting_version(self):
+        self.assertContains(self.client.get('/careers/'), 'TechSolutions Pro')
+        settings_obj = SiteSetting.objects.get(pk=1)
+        version = settings_obj.version
+        settings_obj.company_name = 'Worklink Coders'
+        settings_obj.save()
+        self.assertEqual(settings_obj.version, version + 1)
+        response = self.client.get('/careers/')
+        self.assertContains(response, 'Worklink Coders')
+        self.assertNotContains(response, 'TechSolutions Pro')
+
+
+class IdempotencyTests(TestCase):
+    data = {
+        'name': 'Jane', 'email': 'jane@example.com', 'project_type': 'Web', 'description': 'A site',
+        'idempotency_key': 'b9d1c0de-5a4f-4c1e-9f77-2d0f1e6a9c21',
+    }
+
+    def test_repeat_submission_is_not_processed_again(self):
+        first = self.client.post('/submit-request/', self.data)
+        second = self.client.post('/submit-request/', self.data)
+        self.assertEqual(ProjectRequest.objects.count(), 1)
+        self.assertEqual(second['Location'], first['Location'])
+        self.assertContains(self.client.get(second['Location']), 'We have received your project request')
+
+    def test_invalid_submission_releases_key(self):
+        self.client.post('/submit-request/', {**self.data, 'description': ''})
+        self.assertFalse(IdempotencyKey.objects.exists())
+        self.client.post('/submit-request/', self.data)
+        self.assertEqual(ProjectRequest.objects.count(), 1)
+
+
+class ApplicantSearchTests(TestCase):
+
+    def setUp(self):
+        job = Job.objects.create(
+            title='Python Developer', location='Remote', short_description='x',
+            full_description='x', requirements='x', responsibilities='x',
+        )
+        self.jane = JobApplication.objects.create(
+            job=job, full_name='Jane Doe', email='Jane.Doe@Example.com', phone='+1 (555) 123-4567', resume='r.pdf',
+        )
+        self.john = JobApplication.objects.create(
+            job=job, full_name='John Roe', email='john@example.org', phone='0300 1234567', resume='r.pdf',
+        )
+
+    def test_normalized_columns_filled_on_save(self):
+        self.assertEqual(self.jane.email_normalized, 'jane.doe@example.com')
+        self.assertEqual(self.jane.phone_digits, '15551234567')
+
+    def test_email_and_phone_lookups(self):
+        self.assertEqual(list(JobApplication.objects.search('JANE.DOE@example.com')), [self.jane])
+        self.assertEqual(list(JobApplication.objects.search('john@')), [self.john])
+        self.assertEqual(list(JobApplication.objects.search('1-555-123')), [self.jane])
+        # No prefix match: falls back to a substring search on the digits
+        self.assertEqual(list(JobApplication.objects.search('(555) 123')), [self.jane])
+        self.assertEqual(list(JobApplication.objects.search('Roe')), [self.john])
+
+    def test_backfill_fills_rows_saved_before_the_columns(self):
+        # A phone without digits stays "pending"; keyset batching must still finish.
+        JobApplication.objects.create(
+            job=self.jane.job, full_name='No Phone', email='nophone@example.com', phone='n/a', resume='r.pdf',
+        )
+        JobApplication.objects.update(email_normalized='', phone_digits='')
+        self.assertFalse(JobApplication.objects.search('15551234').exists())
+
+        out = StringIO()
+        call_command('backfill_applicant_lookup', batch_size=1, stdout=out)
+        self.assertIn('3 application(s) backfilled', out.getvalue())
+        self.assertEqual(
+            list(JobApplication.objects.order_by('pk').values_list('email_normalized', 'phone_digits')),
+            [('jane.doe@example.com', '15551234567'), ('john@example.org', '03001234567'), ('nophone@example.com', '')],
+        )
+        self.assertEqual(list(JobApplication.objects.search('jane.doe@')), [self.jane])
+        self.assertEqual(list(JobApplication.objects.search('15551234')), [self.jane])
+        self.assertEqual(list(JobApplication.objects.search('0300 123')), [self.john])
+
+
+class FunnelTests(TestCase):
+
+    def setUp(self):
+        self.job = Job.objects.create(
+            title='Python Developer', location='Remote', short_description='x',
+            full_description='x', requirements='x', responsibilities='x',
+        )
+
+    def apply(self, name):
+        return JobApplication.objects.create(
+            job=self.job, full_name=name, email=f'{name}@example.com', phone='1', resume='r.pdf',
+        )
+
+    def test_transitions_and_rollups(self):
+        application = self.apply('jane')
+        application.status = 'shortlisted'
+        application.save()
+        application.save()  # no status change, nothing recorded
+
+        transitions = StatusTransition.objects.filter(kind='application', object_id=application.pk)
+        self.assertEqual(
+            list(transitions.values_list('from_status', 'to_status')),
+            [('', 'pending'), ('pending', 'shortlisted')],
+        )
+        self.assertEqual(funnel.stage_counts('application'), {'pending': 1, 'shortlisted': 1})
+        self.assertEqual(funnel.stage_counts_by_job('application')[self.job.id], {'pending': 1, 'shortlisted': 1})
+        self.assertEqual(funnel.median_days_by_job('application')[self.job.id], {'shortlisted': 0})
+
+    def test_change_on_a_row_loaded_without_its_status(self):
+        application = self.apply('jane')
+        application = JobApplication.objects.only('id').get(pk=application.pk)
+        application.status = 'shortlisted'
+        application.save()
+
+        transitions = StatusTransition.objects.filter(kind='application', object_id=application.pk)
+        self.assertEqual(list(transitions.values_list('from_status', 'to_status')), [('', 'pending'), ('pending', 'shortlisted')])
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.applications_pending, self.job.applications_shortlisted), (0, 1))
+
+    def test_rollup_counts_accumulate(self):
+        for name in ('a', 'b', 'c'):
+            self.apply(name)
+        rollup = FunnelDailyRollup.objects.get(kind='application', job_id=self.job.id, status='pending')
+        self.assertEqual(rollup.count, 3)
+
+    def test_median_from_histogram(self):
+        self.assertEqual(funnel.median_from_histogram([(1, 2), (3, 1), (10, 1)]), 1)
+        self.assertEqual(funnel.median_from_histogram([(1, 1), (3, 2), (10, 1)]), 3)
+        self.assertIsNone(funnel.median_from_histogram([]))
+
+
+class JobCounterTests(TestCase):
+
+    def setUp(self):
+        self.job = Job.objects.create(
+            title='Python Developer', location='Remote', short_description='x',
+            full_description='x', requirements='x', responsibilities='x',
+        )
+
+    def apply(self, name, job=None):
+        return JobApplication.objects.create(
+            job=job or self.job, full_name=name, email=f'{name}@example.com', phone='1', resume='r.pdf',
+        )
+
+    def test_counters_follow_create_status_change_and_delete(self):
+        jane = self.apply('jane')
+        self.apply('john')
+        jane.status = 'shortlisted'
+        jane.save()
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.applications_total, 2)
+        self.assertEqual(self.job.applications_pending, 1)
+        self.assertEqual(self.job.applications_shortlisted, 1)
+
+        jane.delete()
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.applications_total, self.job.applications_shortlisted), (1, 0))
+
+    def test_delete_after_drift_does_not_go_below_zero(self):
+        jane = self.apply('jane')
+        # QuerySet.update() bypasses the signals, so applications_accepted is still 0.
+        JobApplication.objects.filter(pk=jane.pk).update(status='accepted')
+        JobApplication.objects.get(pk=jane.pk).delete()
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.applications_total, self.job.applications_accepted, self.job.applications_pending), (0, 0, 1))
+
+    def test_admin_rejects_unknown_status(self):
+        jane = self.apply('jane')
+        request = ProjectRequest.objects.create(name='Dan', email='dan@example.com', project_type='App', description='x')
+        self.client.force_login(User.objects.create_user('staff', password='pw', is_staff=True))
+        response = self.client.post(f'/admin-panel/job-applications/{jane.pk}/', {'status': 'bogus'})
+        self.assertRedirects(response, f'/admin-panel/job-applications/{jane.pk}/', fetch_redirect_response=False)
+        response = self.client.post(f'/admin-panel/project-requests/{request.pk}/', {'status': 'bogus'})
+        self.assertEqual(response.status_code, 302)
+        jane.refresh_from_db()
+        request.refresh_from_db()
+        self.assertEqual((jane.status, request.status), ('pending', 'new'))
+
+    def test_saving_a_stale_job_keeps_counters(self):
+        stale = Job.objects.get(pk=self.job.pk)
+        self.apply('jane')
+        stale.title = 'Senior Python Developer'
+        stale.save()
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.title, 'Senior Python Developer')
+        self.assertEqual(self.job.applications_total, 1)
+
+    def test_reconcile_repairs_drift(self):
+        self.apply('jane')
+        JobApplication.objects.update(status='accepted')  # bypasses the signals
+        self.assertEqual([job.pk for job, _ in counters.drifted()], [self.job.pk])
+
+        call_command('reconcile_job_counters', stdout=StringIO())
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.applications_pending, self.job.applications_accepted), (0, 1))
+        self.assertEqual(list(counters.drifted()), [])
+
+
+class AdminEventTests(TestCase):
+
+    def setUp(self):
+        self.staff = User.objects.create_user('staff', password='pw', is_staff=True)
+
+    def test_count_deltas(self):
+        self.assertEqual(
+            events.count_deltas('application', True, '', 'pending'),
+            {'total_job_applications': 1, 'pending_applications': 1},
+        )
+        self.assertEqual(events.count_deltas('request', False, 'new', 'contacted'), {'new_requests': -1})
+        self.assertEqual(events.count_deltas('application', False, 'reviewed', 'shortlisted'), {})
+
+    def test_submission_published_after_commit(self):
+        with mock.patch.object(events, 'publish') as publish, self.captureOnCommitCallbacks(execute=True):
+            ProjectRequest.objects.create(
+                name='Acme', email='a@example.com', project_type='web', description='x',
+            )
+        event = publish.call_args.args[0]
+        self.assertEqual((event['type'], event['kind'], event['name']), ('submission', 'request', 'Acme'))
+        self.assertEqual(event['counts'], {'total_project_requests': 1, 'new_requests': 1})
+
+    def test_stream_requires_staff_and_asgi(self):
+        self.assertEqual(self.client.get('/admin-panel/events/').status_code, 403)
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get('/admin-panel/events/').status_code, 204)
+
+    async def test_stream_delivers_published_events(self):
+        client = AsyncClient()
+        await sync_to_async(client.force_login)(self.staff)
+        response = await client.get('/admin-panel/events/')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        content = response.streaming_content
+        self.assertEqual(await anext(content), b'retry: 5000\n\n')
+        events.publish({'type': 'status', 'counts': {'new_requests': -1}})
+        chunk = await anext(content)
+        self.assertTrue(chunk.startswith(b'event: status\ndata: '))
+
+    async def test_stream_ends_after_lifetime(self):
+        frames = [frame async for frame in events.stream(keepalive=0.01, lifetime=0.05)]
+        self.assertEqual(frames[0], 'retry: 5000\n\n')
+        self.assertIn(': keepalive\n\n', frames)
+        self.assertEqual(events.subscriber_count(), 0)
+
+
+class NotificationDigestTests(TestCase):
+
+    def setUp(self):
+        SiteSetting.objects.create(
+            notification_email='team@example.com', smtp_host='smtp.example.com', smtp_username='site@example.com',
+            smtp_password='secret', website_url='https://example.com/',
+        )
+
+    def submit(self, name):
+        self.client.post('/submit-request/', {
+            'name': name, 'email': f'{name}@example.com', 'project_type': 'Web', 'description': 'x',
+        })
+        return ProjectRequest.objects.get(name=name)
+
+    def test_immediate_mode_emails_each_submission(self):
+        project_request = self.submit('acme')
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, 'New Project Request: Web')
+        project_request.refresh_from_db()
+        self.assertIsNotNone(project_request.notified_at)
+
+    def test_failed_immediate_email_is_not_resent_by_a_later_digest(self):
+        with mock.patch('website.notifications.send', side_effect=OSError('SMTP down')):
+            project_request = self.submit('acme')
+        project_request.refresh_from_db()
+        self.assertIsNotNone(project_request.notified_at)
+
+        SiteSetting.objects.update(notification_mode='hourly')
+        call_command('send_notification_digest', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_hourly_digest(self):
+        SiteSetting.objects.update(notification_mode='hourly')
+        for name in ('acme', 'globex'):
+            self.submit(name)
+        self.assertEqual(len(mail.outbox), 0)
+
+        call_command('send_notification_digest', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('2 project request(s)', mail.outbox[0].subject)
+        self.assertIn('https://example.com/admin-panel/project-requests/', mail.outbox[0].body)
+        self.assertEqual(mail.outbox[0].attachments, [])
+        self.assertFalse(ProjectRequest.objects.filter(notified_at__isnull=True).exists())
+
+        # Not due again until the hour has passed
+        self.submit('initech')
+        call_command('send_notification_digest', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        SiteSetting.objects.update(last_digest_sent_at=timezone.now() - timedelta(hours=1))
+        call_command('send_notification_digest', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 2)
+
+
+class ResumableUploadTests(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        settings_override = override_settings(
+            UPLOAD_SESSION_DIR=os.path.join(self.tmpdir, 'sessions'), MEDIA_ROOT=os.path.join(self.tmpdir, 'media'),
+            UPLOAD_CHUNK_SIZE=4,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.job = Job.objects.create(
+            title='Python Developer', location='Remote', short_description='x',
+            full_description='x', requirements='x', responsibilities='x',
+        )
+
+    def start(self, filename, length):
+        metadata = 'filename ' + base64.b64encode(filename.encode()).decode()
+        return self.client.post('/uploads/', headers={'Upload-Length': str(length), 'Upload-Metadata': metadata})
+
+    def patch(self, url, offset, data):
+        return self.client.patch(
+            url, data, content_type='application/offset+octet-stream', headers={'Upload-Offset': str(offset)},
+        )
+
+    def test_chunked_upload_then_apply(self):
+        response = self.start('cv.pdf', 10)
+        self.assertEqual(response.status_code, 201)
+        url = response['Location']
+
+        self.assertEqual(self.patch(url, 0, b'%PDF').status_code, 204)
+        # A retried chunk with a stale offset is rejected with the current offset
+        stale = self.patch(url, 0, b'%PDF')
+        self.assertEqual((stale.status_code, stale['Upload-Offset']), (409, '4'))
+        self.assertEqual(self.client.head(url)['Upload-Offset'], '4')
+        self.assertEqual(self.patch(url, 4, b'-1.4').status_code, 204)
+        self.assertEqual(self.patch(url, 8, b'\n%').status_code, 204)
+
+        upload_id = url.rstrip('/').rsplit('/', 1)[1]
+        self.client.post(f'/apply-job/{self.job.id}/', {
+            'full_name': 'Jane Doe', 'email': 'jane@example.com', 'phone': '123', 'resume_upload': upload_id,
+        })
+        application = JobApplication.objects.get()
+        self.assertEqual(application.resume.read(), b'%PDF-1.4\n%')
+        self.assertFalse(UploadSession.objects.exists())
+        self.assertEqual(os.listdir(os.path.join(self.tmpdir, 'sessions')), [])
+
+    def test_rejected_form_keeps_the_upload(self):
+        url = self.start('cv.pdf', 4)['Location']
+        self.patch(url, 0, b'%PDF')
+        upload_id = url.rstrip('/').rsplit('/', 1)[1]
+        form = {'full_name': '', 'email': 'jane@example.com', 'phone': '123', 'resume_upload': upload_id}
+        self.client.post(f'/apply-job/{self.job.id}/', form)
+        self.assertFalse(JobApplication.objects.exists())
+        self.assertTrue(UploadSession.objects.filter(pk=upload_id).exists())
+
+        self.client.post(f'/apply-job/{self.job.id}/', dict(form, full_name='Jane Doe'))
+        self.assertEqual(JobApplication.objects.get().resume.read(), b'%PDF')
+        self.assertFalse(UploadSession.objects.exists())
+
+    def test_incomplete_upload_cannot_be_claimed(self):
+        url = self.start('cv.pdf', 10)['Location']
+        self.patch(url, 0, b'%PDF')
+        self.assertIsNone(uploads.claim(url.rstrip('/').rsplit('/', 1)[1], 'resume'))
+
+    def test_rejects_wrong_type_and_size(self):
+        self.assertEqual(self.start('cv.exe', 10).status_code, 415)
+        self.assertEqual(self.start('cv.pdf', 6 * 1024 * 1024).status_code, 413)
+        url = self.start('cv.pdf', 10)['Location']
+        self.assertEqual(self.patch(url, 0, b'too long').status_code, 413)
+
+    def test_expired_sessions_are_cleared(self):
+        url = self.start('cv.pdf', 10)['Location']
+        UploadSession.objects.update(updated_at=timezone.now() - timedelta(days=2))
+        self.assertEqual(uploads.clear_expired(), (1, 0))
+        self.assertEqual(self.client.head(url).status_code, 404)
+
+
+class StaticExportTests(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        settings_override = override_settings(STATIC_EXPORT_ROOT=self.tmpdir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.job = Job.objects.create(
+            title='Python Developer', location='Remote', short_description='x',
+            full_description='x', requirements='x', responsibilities='x',
+        )
+
+    def exported(self, name):
+        with open(os.path.join(self.tmpdir, 'current', name), 'rb') as f:
+            return f.read()
+
+    def test_full_then_incremental_export(self):
+        rendered, _ = static_export.export()
+        self.assertEqual(sorted(rendered), ['/', '/careers/', f'/job-details/{self.job.pk}/'])
+        self.assertIn(b'Python Developer', self.exported('careers/index.html'))
+        self.assertIn(b'"title": "Python Developer"', self.exported(f'job-details/{self.job.pk}/index.json'))
+        self.assertEqual(static_export.export(), ([], []))
+
+        # A service change only touches the home page
+        with self.captureOnCommitCallbacks(execute=True):
+            Service.objects.create(title='Cloud', description='x', icon='fa-cloud')
+        self.assertEqual(static_export.export()[0], ['/'])
+
+        # Deactivating the job re-renders the listings and drops its detail page
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.is_active = False
+            self.job.save()
+        rendered, removed = static_export.export()
+        self.assertEqual(sorted(rendered), ['/', '/careers/'])
+        self.assertEqual(removed, [f'/job-details/{self.job.pk}/'])
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir, 'current', f'job-details/{self.job.pk}/index.json')))
+        self.assertNotIn(b'Python Developer', self.exported('careers/index.html'))
+        self.assertEqual(len(os.listdir(os.path.join(self.tmpdir, 'releases'))), 3)
+
+
+    @override_settings(EDGE_CACHE_PUBLIC_PAGES=False)
+    def test_export_never_bakes_in_a_csrf_token(self):
+        static_export.export()
+        tokens = re.findall(rb'name="csrfmiddlewaretoken" value="([^"]*)"', self.exported('index.html'))
+        self.assertTrue(tokens)
+        self.assertEqual(set(tokens), {b''})
+
+@override_settings(CAREERS_PAGE_SIZE=2)
+class CareersPaginationTests(TestCase):
+
+    def setUp(self):
+        for i in range(5):
+            Job.objects.create(
+                title=f'Job {i}', location='Remote' if i % 2 else 'Lahore', short_description='x',
+                full_description='x', requirements='x', responsibilities='x', featured=(i == 3),
+            )
+
+    def walk(self, url):
+        titles = []
+        while url:
+            data = self.client.get(url).json()
+            titles += [job['title'] for job in data['results']]
+            url = data['next']
+        return titles
+
+    def test_pages_cover_every_job_once_in_listing_order(self):
+        expected = [job.title for job in Job.objects.order_by(*views.CAREERS_ORDERING)]
+        self.assertEqual(expected[0], 'Job 3')
+        self.assertEqual(self.walk('/careers/jobs/'), expected)
+
+        response = self.client.get('/careers/')
+        self.assertEqual(len(response.context['jobs']), 2)
+        self.assertEqual(response.context['jobs_count'], 5)
+        self.assertContains(response, 'Load More Jobs')
+
+    def test_infinite_scroll_pages_do_not_count(self):
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as queries:
+            self.client.get('/careers/jobs/?search=Job')
+        self.assertFalse([query for query in queries if 'COUNT(' in query['sql'] and 'website_job' in query['sql']])
+
+    def test_filters_apply_to_every_page(self):
+        self.assertEqual(sorted(self.walk('/careers/jobs/?location=Remote')), ['Job 1', 'Job 3'])
+
+    def test_only_listed_filters_reach_the_shared_cache(self):
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            def careers_rows():
+                cursor.execute(
+                    "SELECT COUNT(*) FROM website_shared_cache"
+                    " WHERE cache_key LIKE '%:entry:careers:%' AND cache_key NOT LIKE '%:careers:filters'"
+                )
+                return cursor.fetchone()[0]
+
+            for url in ('/careers/?search=job', '/careers/jobs/?search=zzz', '/careers/?location=Mars'):
+                self.assertEqual(self.client.get(url).status_code, 200)
+            self.assertEqual(careers_rows(), 0)
+            response = self.client.get('/careers/?location=Remote')
+            self.assertEqual(response.context['jobs_count'], 2)
+            self.assertEqual(careers_rows(), 1)
+            self.assertEqual(self.walk('/careers/jobs/?search=Job 4'), ['Job 4'])
+
+    def test_bad_cursor(self):
+        self.assertEqual(self.client.get('/careers/jobs/?cursor=bogus').status_code, 400)
+        self.assertRedirects(self.client.get('/careers/?cursor=bogus'), '/careers/')
+
+
+class JobApiTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        for i in range(3):
+            Job.objects.create(
+                title=f'Job {i}', location='Remote' if i % 2 else 'Lahore', short_description='x',
+                full_description='long text', requirements='x', responsibilities='x',
+            )
+
+    def test_list_pages_with_summary_fields(self):
+        data = self.client.get('/api/v1/jobs/?limit=2').json()
+        self.assertEqual(len(data['results']), 2)
+        self.assertNotIn('full_description', data['results'][0])
+        self.assertEqual(data['results'][0]['job_type_display'], 'Full Time')
+        rest = self.client.get(data['next']).json()
+        self.assertEqual(len(rest['results']), 1)
+        self.assertIsNone(rest['next'])
+
+        remote = self.client.get('/api/v1/jobs/?location=Remote').json()['results']
+        self.assertEqual([job['title'] for job in remote], ['Job 1'])
+
+    def test_sparse_fields_and_errors(self):
+        job = Job.objects.get(title='Job 0')
+        data = self.client.get(f'/api/v1/jobs/{job.pk}/?fields=title,full_description').json()
+        self.assertEqual(data, {'title': 'Job 0', 'full_description': 'long text'})
+        self.assertEqual(self.client.get('/api/v1/jobs/?fields=title,salary').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/jobs/?cursor=bogus').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/jobs/999/').status_code, 404)
+
+    def test_etag_and_serializer_cache_follow_job_version(self):
+        job = Job.objects.get(title='Job 0')
+        url = f'/api/v1/jobs/{job.pk}/'
+        response = self.client.get(url)
+        self.assertIn('max-age=60', response['Cache-Control'])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        with mock.patch.object(api, 'serialize', wraps=api.serialize) as serialize:
+            self.client.get(url)
+            self.assertFalse(serialize.called)
+            job.title = 'Renamed'
+            job.save()
+            changed = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(serialize.call_count, 1)
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.json()['title'], 'Renamed')
+
+
+class RequestProfilingTests(TestCase):
+
+    def setUp(self):
+        self.staff = User.objects.create_user('staff', password='pw', is_staff=True)
+        Job.objects.create(title='Dev', short_description='x', full_description='x', requirements='x', responsibilities='x')
+
+    def test_staff_flag_profiles_sessionless_public_page(self):
+        self.client.force_login(self.staff)
+        response = self.client.get('/careers/?_profile=1')
+        profile = RequestProfile.objects.get()
+        self.assertEqual(response['X-Profile-Id'], str(profile.pk))
+        self.assertIn('no-store', response['Cache-Control'])
+        self.assertEqual((profile.view_name, profile.trigger, profile.user), ('careers', 'staff', self.staff))
+        self.assertGreater(profile.sql_count, 0)
+
+        self.assertContains(self.client.get(f'/admin-panel/profiles/{profile.pk}/'), 'Flame Graph')
+        self.assertContains(self.client.get('/admin-panel/profiles/'), '/careers/?_profile=1')
+
+    def test_flag_ignored_for_visitors_and_sample_rate(self):
+        self.client.get('/careers/?_profile=1', HTTP_X_PROFILE='1')
+        self.assertFalse(RequestProfile.objects.exists())
+        with override_settings(PROFILING_SAMPLE_RATE=1.0):
+            self.client.get('/careers/')
+        self.assertEqual(RequestProfile.objects.get().trigger, 'sample')
+
+    def test_flame_graph_layout(self):
+        stacks = 'view (website/views.py:1);render (django/template/base.py:1) 3\nview (website/views.py:1);SQL: SELECT 1 1'
+        boxes, height = profiling.flame_graph(stacks)
+        self.assertEqual([(box.label, box.kind, box.width) for box in boxes if box.top == 0], [('view (website/views.py:1)', 'app', 100.0)])
+        sql = next(box for box in boxes if box.kind == 'sql')
+        self.assertEqual((sql.left, sql.width, height), (0.0, 25.0, 2 * profiling.ROW_HEIGHT))
+        self.assertEqual(profiling.top_frames(stacks)[0], ('render (django/template/base.py:1)', 3, 3))
+
+
+class MetricsTests(TestCase):
+
+    def setUp(self):
+        metrics._samples.clear()
+        cache.clear()
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_request_and_query_metrics(self):
+        Job.objects.create(title='Dev', short_description='x', full_description='x', requirements='x', responsibilities='x')
+        self.client.get('/careers/')
+        self.client.generic('BREW', '/careers/')
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        body = response.content.decode()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', body)
+        self.assertIn('http_request_duration_seconds_bucket{le="+Inf",method="GET",status="200",view="careers"} 1', body)
+        self.assertIn('http_request_duration_seconds_count{method="GET",status="200",view="careers"} 1', body)
+        self.assertIn('db_queries_total{view="careers"}', body)
+        self.assertIn('cache_requests_total{cache="site_fragment",result="miss"}', body)
+        self.assertIn('http_request_duration_seconds_count{method="other",status="200",view="careers"} 1', body)
+        self.assertNotIn('BREW', body)
+
+    def test_smtp_failures_and_upload_rejections(self):
+        SiteSetting.objects.create(
+            notification_email='team@example.com', smtp_host='smtp.example.com', smtp_username='site@example.com',
+            smtp_password='secret',
+        )
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError('refused')), \
+                self.assertLogs('website.notifications', 'ERROR'):
+            self.client.post('/submit-request/', {'name': 'acme', 'email': 'a@example.com', 'project_type': 'Web', 'description': 'x'})
+        self.client.post('/uploads/', HTTP_UPLOAD_LENGTH='10', HTTP_UPLOAD_METADATA=f'filename {base64.b64encode(b"cv.exe").decode()}')
+
+        body = metrics.render()
+        self.assertIn('smtp_send_failures_total{kind="project_request"} 1', body)
+        self.assertIn('smtp_send_duration_seconds_count{kind="project_request"} 1', body)
+        self.assertIn('upload_rejections_total{purpose="resume",reason="extension"} 1', body)
+
+    def test_processes_are_summed_from_metrics_dir(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        with open(os.path.join(tmpdir, '1.json'), 'w') as f:
+            f.write('[["upload_rejections_total", [["purpose", "image"], ["reason", "size"]], 2]]')
+        with override_settings(METRICS_DIR=tmpdir):
+            metrics.inc('upload_rejections_total', purpose='image', reason='size')
+            self.assertIn('upload_rejections_total{purpose="image",reason="size"} 3', metrics.render())
+            self.assertTrue(os.path.exists(metrics.snapshot_path(tmpdir)))
+
+    def test_reused_pid_keeps_the_dead_workers_totals(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        # Left by an earlier worker that had the same pid.
+        with open(os.path.join(tmpdir, f'{os.getpid()}-0123456789ab.json'), 'w') as f:
+            f.write('[["upload_rejections_total", [["purpose", "image"], ["reason", "size"]], 5]]')
+        with override_settings(METRICS_DIR=tmpdir):
+            metrics.inc('upload_rejections_total', purpose='image', reason='size')
+            self.assertIn('upload_rejections_total{purpose="image",reason="size"} 6', metrics.render())
+            self.assertEqual(len(os.listdir(tmpdir)), 2)
+
+    def test_flushed_at_exit(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        with override_settings(METRICS_DIR=tmpdir, METRICS_FLUSH_INTERVAL=3600):
+            metrics.flush(force=True)
+            metrics.inc('upload_rejections_total', purpose='image', reason='size')
+            with open(metrics.snapshot_path(tmpdir)) as f:
+                self.assertEqual(json.load(f), [])
+            metrics._flush_at_exit()
+            with open(metrics.snapshot_path(tmpdir)) as f:
+                self.assertEqual(json.load(f), [['upload_rejections_total', [['purpose', 'image'], ['reason', 'size']], 1]])
+
+    def test_closed_without_a_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret').status_code, 200)
+
+
+class StartupTests(TestCase):
+
+    def test_wsgi_import_stays_within_budget(self):
+        result = startup.measure()
+        self.assertLess(result['import_seconds'] * 1000, settings.STARTUP_BUDGET_MS)
+        # Loaded on demand only
+        lazy = {'PIL', 'urllib.request', 'django.test', 'website.views'}
+        self.assertEqual(lazy & set(result['modules']), set())
+
+    def test_warm_loads_views(self):
+        modules = set(startup.measure(warm=True)['modules'])
+        self.assertEqual({'website.views', 'website.admin_views', 'website.api'} - modules, set())
+        self.assertNotIn('PIL', modules)
+
+
+class SingleFlightTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def compute(self, value='v1', delay=0):
+        def compute():
+            self.calls += 1
+            time.sleep(delay)
+            return value
+        return compute
+
+    def test_stale_value_served_while_another_request_recomputes(self):
+        self.assertEqual(single_flight.get_or_compute('x', self.compute('v1'), ('job',)), 'v1')
+        single_flight.invalidate(['job'])
+        token = single_flight.acquire('x')
+        self.assertEqual(single_flight.get_or_compute('x', self.compute('v2'), ('job',)), 'v1')
+        self.assertEqual(self.calls, 1)
+        single_flight.release('x', token)
+        self.assertEqual(single_flight.get_or_compute('x', self.compute('v2'), ('job',)), 'v2')
+        self.assertEqual(single_flight.get_or_compute('x', self.compute('v3'), ('job',)), 'v2')
+        self.assertEqual(self.calls, 2)
+
+    # The threads use their own database connections, which cannot see this test's
+    # uncommitted database cache rows; the in-process cache stands in for the shared one.
+    @override_settings(SINGLE_FLIGHT_CACHE='default')
+    def test_concurrent_misses_compute_once(self):
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(single_flight.get_or_compute('y', self.compute('v', 0.2))))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ['v'] * 5)
+        self.assertEqual(self.calls, 1)
+
+    def test_entries_and_generations_live_in_the_shared_cache(self):
+        single_flight.get_or_compute('z', self.compute('v1'), ('job',))
+        self.assertIsNotNone(caches['shared'].get(single_flight.entry_key('z')))
+        self.assertIsNone(cache.get(single_flight.entry_key('z')))
+        single_flight.invalidate(['job'])
+        self.assertIsNotNone(caches['shared'].get(single_flight.generation_key('job')))
+
+    def test_early_refresh_probability_rises_towards_expiry(self):
+        entry = single_flight.Entry('v', (), fresh_until=100.0, compute_seconds=1.0)
+        with mock.patch('random.random', return_value=0.5):  # -log(0.5) * 1s ~= 0.69s early
+            self.assertFalse(single_flight.should_refresh_early(entry, now=99.0))
+            self.assertTrue(single_flight.should_refresh_early(entry, now=99.5))
+
+    def test_public_views_reuse_cached_querysets_until_a_job_changes(self):
+        job = Job.objects.create(title='Dev', short_description='x', full_description='x', requirements='x', responsibilities='x')
+        self.assertContains(self.client.get('/careers/'), 'Dev')
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as queries:
+            self.client.get('/careers/')
+        self.assertFalse([query for query in queries if 'website_job' in query['sql']])
+
+        job.title = 'Senior Dev'
+        job.save()
+        self.assertContains(self.client.get('/careers/'), 'Senior Dev')
+        self.assertEqual(self.client.get(f'/job-details/{job.pk}/').json()['title'], 'Senior Dev')
+
+
+def forbid_deferred_loads():
+    """Fail when anything reads a column a projection left out (Django would fetch it with one query per row)"""
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        raise AssertionError(f'{type(self).__name__}.{", ".join(fields or ())} is deferred but was used')
+    return mock.patch('django.db.models.Model.refresh_from_db', refresh_from_db)
+
+
+class ListProjectionTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        # Every optional field is filled in so each {% if %} branch of the templates renders.
+        Service.objects.create(title='Web', description='Sites', icon='fa-code')
+        Project.objects.create(
+            title='Shop', description='Store', category='web', image='projects/shop.png', technologies='Django',
+            client_name='Acme', project_url='https://example.com', featured=True,
+        )
+        TeamMember.objects.create(
+            name='Ann', designation='CTO', bio='Bio', photo='team/ann.png', email='ann@example.com',
+            linkedin='https://linkedin.com/in/ann', twitter='https://x.com/ann', github='https://github.com/ann',
+        )
+        Testimonial.objects.create(client_name='Bob', company_name='Globex', testimonial_text='Great work!', client_photo='t/bob.png')
+        self.job = Job.objects.create(
+            title='Dev', department='Eng', location='Remote', salary_range='$1', short_description='Short',
+            full_description='Long', requirements='x', responsibilities='x', technologies='Python', benefits='Lots',
+            application_deadline=timezone.now().date(), featured=True,
+        )
+        JobApplication.objects.create(
+            job=self.job, full_name='Cat', email='cat@example.com', phone='123', current_position='Dev',
+            resume='resumes/cat.pdf', cover_letter='Letter', notes='Notes',
+        )
+        ProjectRequest.objects.create(
+            name='Dan', email='dan@example.com', company_name='Initech', project_type='App', budget='$5k', description='Long brief',
+        )
+        ArchivedJobApplication.objects.create(
+            original_id=1, status='rejected', submitted_at=timezone.now(), job_id=self.job.pk, job_title='Dev',
+            full_name='Eve', email='eve@example.com', phone='1', data={'cover_letter': 'Old letter'},
+        )
+        ArchivedProjectRequest.objects.create(
+            original_id=1, status='closed', submitted_at=timezone.now(), name='Fay', email='fay@example.com',
+            company_name='Umbrella', project_type='Web', data={'description': 'Old brief'},
+        )
+        self.staff = User.objects.create_user('staff', password='pw', is_staff=True)
+
+    def test_public_lists_render_without_deferred_loads(self):
+        with forbid_deferred_loads():
+            home = self.client.get('/')
+            careers = self.client.get('/careers/')
+            self.assertEqual(self.client.get('/careers/jobs/').status_code, 200)
+        self.assertContains(home, 'Great work!')
+        self.assertContains(careers, 'Python')
+        self.assertIn('full_description', careers.context['jobs'].items[0].get_deferred_fields())
+
+    def test_admin_lists_render_without_deferred_loads(self):
+        self.client.force_login(self.staff)
+        paths = [
+            '/admin-panel/', '/admin-panel/projects/', '/admin-panel/team/', '/admin-panel/testimonials/',
+            '/admin-panel/project-requests/', '/admin-panel/jobs/', '/admin-panel/job-applications/',
+            '/admin-panel/archive/?kind=applications', '/admin-panel/archive/?kind=requests', '/admin-panel/analytics/funnel/',
+        ]
+        with forbid_deferred_loads():
+            for path in paths:
+                self.assertEqual(self.client.get(path).status_code, 200, path)
+        applications = self.client.get('/admin-panel/job-applications/').context['applications']
+        self.assertEqual({'cover_letter', 'notes'} - applications[0].get_deferred_fields(), set())
+
+
+class ResumeDownloadTests(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        settings_override = override_settings(MEDIA_ROOT=self.tmpdir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        os.makedirs(os.path.join(self.tmpdir, 'resumes'))
+        with open(os.path.join(self.tmpdir, 'resumes', 'cv.pdf'), 'wb') as f:
+            f.write(b'0123456789')
+        job = Job.objects.create(title='Dev', short_description='x', full_description='x', requirements='x', responsibilities='x')
+        self.application = JobApplication.objects.create(
+            job=job, full_name='Ann', email='ann@example.com', phone='1', resume='resumes/cv.pdf',
+        )
+        self.url = f'/admin-panel/job-applications/{self.application.pk}/resume/'
+        self.client.force_login(User.objects.create_user('staff', password='pw', is_staff=True))
+
+    def test_staff_only(self):
+        self.client.force_login(User.objects.create_user('user', password='pw'))
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+
+    def test_full_and_range_downloads(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="cv.pdf"')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('no-store', response['Cache-Control'])
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 2-5/10')
+        self.assertEqual(response['Content-Length'], '4')
+        self.assertEqual(b''.join(response.streaming_content), b'2345')
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-3')
+        self.assertEqual(b''.join(response.streaming_content), b'789')
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE='bytes=10-').status_code, 416)
+        # A stale If-Range gets the whole file.
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2-5', HTTP_IF_RANGE='Thu, 01 Jan 1970 00:00:00 GMT')
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+    def test_delegates_to_web_server(self):
+        with override_settings(PROTECTED_MEDIA_HEADER='X-Accel-Redirect'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/resumes/cv.pdf')
+        self.assertEqual(response.content, b'')
+        with override_settings(PROTECTED_MEDIA_HEADER='X-Sendfile'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Sendfile'], os.path.join(self.tmpdir, 'resumes', 'cv.pdf'))
+
+    def test_development_media_route_hides_resumes(self):
+        with open(os.path.join(self.tmpdir, 'logo.txt'), 'wb') as f:
+            f.write(b'logo')
+        request = RequestFactory().get('/media/')
+        response = views.serve_public_media(request, 'logo.txt', document_root=self.tmpdir)
+        self.assertEqual(b''.join(response.streaming_content), b'logo')
+        for path in ('resumes/cv.pdf', './resumes/cv.pdf', 'x/../resumes/cv.pdf', 'Resumes/cv.pdf'):
+            with self.assertRaises(Http404):
+                views.serve_public_media(request, path, document_root=self.tmpdir)
+
+    def test_missing_file_is_404(self):
+        os.remove(os.path.join(self.tmpdir, 'resumes', 'cv.pdf'))
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_resume_zip_streams_filtered_applications_with_index(self):
+        with open(os.path.join(self.tmpdir, 'resumes', 'old.doc'), 'wb') as f:
+            f.write(b'doc ' * 1000)
+        other = Job.objects.create(title='Ops', short_description='x', full_description='x', requirements='x', responsibilities='x')
+        JobApplication.objects.create(job=self.application.job, full_name='=Bob', email='bob@example.com', phone='2', resume='resumes/old.doc')
+        JobApplication.objects.create(job=self.application.job, full_name='Cy', email='cy@example.com', phone='3', resume='resumes/gone.pdf')
+        JobApplication.objects.create(job=other, full_name='Di', email='di@example.com', phone='4', resume='resumes/cv.pdf')
+
+        response = self.client.get('/admin-panel/job-applications/resumes.zip', {'job': self.application.job_id})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="resumes-dev.zip"')
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertIsNone(archive.testzip())
+        names = archive.namelist()
+        self.assertEqual(names[0], 'index.csv')
+        self.assertEqual(len(names), 3)
+        pdf = next(name for name in names if name.endswith('.pdf'))
+        doc = next(name for name in names if name.endswith('.doc'))
+        self.assertEqual(archive.read(pdf), b'0123456789')
+        self.assertEqual(archive.getinfo(pdf).compress_type, zipfile.ZIP_STORED)
+        self.assertEqual(archive.getinfo(doc).compress_type, zipfile.ZIP_DEFLATED)
+
+        rows = list(csv.DictReader(io.StringIO(archive.read('index.csv').decode('utf-8-sig'))))
+        self.assertEqual(len(rows), 3)
+        by_name = {row['full_name']: row for row in rows}
+        self.assertEqual(by_name["'=Bob"]['resume'], doc)
+        self.assertEqual(by_name['Cy']['resume'], '')
+        self.assertNotIn('Di', by_name)
+
+
+class CareersAutocompleteTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        autocomplete.reset()
+        self.addCleanup(autocomplete.reset)
+        self.create_job('Senior Python Developer', department='Engineering', location='Zürich', technologies='Python, Django')
+        self.create_job('Python Intern', department='Engineering', location='Remote', technologies='Python')
+        self.create_job('Retired Role', technologies='Perl', is_active=False)
+
+    def create_job(self, title, **fields):
+        return Job.objects.create(
+            title=title, short_description='x', full_description='x', requirements='x', responsibilities='x', **fields,
+        )
+
+    def suggest(self, query):
+        response = self.client.get('/careers/autocomplete/', {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return [(item['value'], item['kind'], item['count']) for item in response.json()['suggestions']]
+
+    def test_prefix_and_word_matches_ranked(self):
+        self.assertEqual(self.suggest('pyt'), [
+            ('Python', 'technology', 2), ('Python Intern', 'title', 1), ('Senior Python Developer', 'title', 1),
+        ])
+        self.assertEqual(self.suggest('dev'), [('Senior Python Developer', 'title', 1)])
+        self.assertEqual(self.suggest('ZUR'), [('Zürich', 'location', 1)])
+        self.assertEqual(self.suggest('perl'), [])
+        self.assertEqual(self.suggest(''), [])
+        suggestion = self.client.get('/careers/autocomplete/', {'q': 'eng'}).json()['suggestions'][0]
+        self.assertEqual(suggestion['url'], '/careers/?department=Engineering')
+
+    def test_served_from_memory_and_rebuilt_when_jobs_change(self):
+        self.suggest('py')
+        with self.assertNumQueries(0):
+            self.suggest('dj')
+        self.create_job('Go Engineer', technologies='Go')
+        self.assertEqual(self.suggest('go'), [('Go', 'technology', 1), ('Go Engineer', 'title', 1)])
+        # A change saved by another worker is seen through the shared generation.
+        Job.objects.bulk_create([Job(title='Rust Engineer', short_description='x', full_description='x', requirements='x', responsibilities='x')])
+        single_flight.invalidate(['job'])
+        with override_settings(AUTOCOMPLETE_GENERATION_CHECK=0):
+            self.assertEqual(self.suggest('rust'), [('Rust Engineer', 'title', 1)])
+        Job.objects.filter(title='Python Intern').get().delete()
+        self.assertEqual(self.suggest('python'), [('Python', 'technology', 1), ('Senior Python Developer', 'title', 1)])
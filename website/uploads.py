@@ -0,0 +1,266 @@
+"""
+Resumable chunked uploads (a small subset of the tus 1.0 protocol).
+
+The browser creates an upload with ``POST`` (``Upload-Length`` and a
+base64 ``filename`` in ``Upload-Metadata``), sends the bytes in short
+``PATCH`` requests carrying ``Upload-Offset``, and after a dropped
+connection asks for the current offset with ``HEAD`` and carries on from
+there. Parts are appended to one file under UPLOAD_SESSION_DIR, so no
+request holds a worker for longer than one chunk takes.
+
+The form post then sends ``<field>_upload=<id>`` instead of the file, and
+``posted_file()`` hands the assembled file to the view, which the storage
+moves into MEDIA_ROOT without copying it. Views validate the form first
+(``posted_file_info()`` gives the name and size without claiming the
+upload), so a rejected form leaves the upload in place to be posted again. Sessions untouched for
+UPLOAD_SESSION_TTL seconds are removed by ``manage.py clear_upload_sessions``.
+"""
+import base64
+import binascii
+import os
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.db.models import F
+from django.http import HttpResponse, UnreadablePostError
+from django.utils import timezone
+
+from . import metrics
+from .models import UploadSession
+
+
+TUS_VERSION = '1.0.0'
+
+PURPOSES = {
+    'resume': {'extensions': ('.pdf', '.doc', '.docx'), 'max_size': 5 * 1024 * 1024},
+    'image': {'extensions': ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg'), 'max_size': 10 * 1024 * 1024},
+}
+
+READ_BLOCK = 64 * 1024
+
+
+def upload_dir():
+    return str(getattr(settings, 'UPLOAD_SESSION_DIR', os.path.join(settings.BASE_DIR, 'upload_sessions')))
+
+
+def chunk_size():
+    return getattr(settings, 'UPLOAD_CHUNK_SIZE', 1024 * 1024)
+
+
+def part_path(upload_id):
+    return os.path.join(upload_dir(), f'{upload_id}.part')
+
+
+def expiry_cutoff():
+    return timezone.now() - timedelta(seconds=getattr(settings, 'UPLOAD_SESSION_TTL', 86400))
+
+
+def parse_metadata(header):
+    """Decode a tus ``Upload-Metadata`` header into a dict of strings"""
+    metadata = {}
+    for pair in filter(None, (item.strip() for item in header.split(','))):
+        key, _, value = pair.partition(' ')
+        try:
+            metadata[key] = base64.b64decode(value).decode() if value else ''
+        except (binascii.Error, UnicodeDecodeError):
+            raise ValueError(f'Invalid Upload-Metadata value for {key!r}')
+    return metadata
+
+
+def tus_response(status, **headers):
+    response = HttpResponse(status=status)
+    response['Tus-Resumable'] = TUS_VERSION
+    response['Cache-Control'] = 'no-store'
+    for name, value in headers.items():
+        response[name.replace('_', '-')] = str(value)
+    return response
+
+
+def error(status, message):
+    response = tus_response(status)
+    response.content = message
+    response['Content-Type'] = 'text/plain'
+    return response
+
+
+def reject(purpose, reason, status, message):
+    metrics.inc('upload_rejections_total', purpose=purpose, reason=reason)
+    return error(status, message)
+
+
+def create(request, purposes):
+    """Start an upload; responds 201 with its URL in ``Location``"""
+    try:
+        length = int(request.headers.get('Upload-Length', ''))
+        metadata = parse_metadata(request.headers.get('Upload-Metadata', ''))
+    except ValueError:
+        return reject(purposes[0], 'headers', 400, 'Upload-Length and Upload-Metadata are required.')
+
+    purpose = metadata.get('purpose') or purposes[0]
+    filename = os.path.basename(metadata.get('filename', '').replace('\\', '/'))[:255]
+    if purpose not in purposes:
+        return reject(purposes[0], 'purpose', 403, 'Uploads of this kind are not accepted here.')
+    rules = PURPOSES[purpose]
+    if not filename or os.path.splitext(filename)[1].lower() not in rules['extensions']:
+        return reject(purpose, 'extension', 415, f'File must be one of: {", ".join(rules["extensions"])}.')
+    if length <= 0 or length > rules['max_size']:
+        return reject(purpose, 'size', 413, f'File size must be less than {rules["max_size"] // (1024 * 1024)}MB.')
+
+    session = UploadSession.objects.create(purpose=purpose, filename=filename, length=length)
+    os.makedirs(upload_dir(), exist_ok=True)
+    open(part_path(session.pk), 'wb').close()
+    return tus_response(
+        201,
+        Location=f'{request.path.rstrip("/")}/{session.pk}/',
+        Upload_Offset=0,
+        Upload_Chunk_Size=chunk_size(),
+    )
+
+
+def detail(request, upload_id, purposes):
+    """HEAD/GET reports the offset, PATCH appends a chunk, DELETE abandons the upload"""
+    session = UploadSession.objects.filter(pk=upload_id, purpose__in=purposes).first()
+    if session is None or not os.path.exists(part_path(session.pk)):
+        return error(404, 'Unknown or expired upload.')
+
+    if request.method in ('HEAD', 'GET'):
+        return tus_response(200, Upload_Offset=session.offset, Upload_Length=session.length)
+    if request.method == 'DELETE':
+        discard(session)
+        return tus_response(204)
+    if request.method == 'PATCH':
+        return append(request, session)
+    response = error(405, 'Method not allowed.')
+    response['Allow'] = 'HEAD, GET, PATCH, DELETE'
+    return response
+
+
+def append(request, session):
+    if request.content_type != 'application/offset+octet-stream':
+        return error(415, 'Chunks must be sent as application/offset+octet-stream.')
+    try:
+        offset = int(request.headers.get('Upload-Offset', ''))
+        content_length = int(request.headers.get('Content-Length', ''))
+    except ValueError:
+        return error(400, 'Upload-Offset and Content-Length are required.')
+    if offset != session.offset:
+        return tus_response(409, Upload_Offset=session.offset)
+    if content_length > chunk_size() or offset + content_length > session.length:
+        return error(413, 'Chunk too large.')
+
+    written = 0
+    with open(part_path(session.pk), 'r+b') as part:
+        # Drop anything a previous, interrupted request wrote past the recorded offset.
+        part.truncate(offset)
+        part.seek(offset)
+        try:
+            while written < content_length:
+                block = request.read(min(READ_BLOCK, content_length - written))
+                if not block:
+                    break
+                part.write(block)
+                written += len(block)
+        except (OSError, UnreadablePostError):
+            # Client went away mid-chunk; keep what arrived so it can resume from there.
+            pass
+
+    # Compare-and-set: a concurrent PATCH for the same offset loses with 409.
+    updated = UploadSession.objects.filter(pk=session.pk, offset=offset).update(
+        offset=F('offset') + written, updated_at=timezone.now()
+    )
+    if not updated:
+        session.refresh_from_db()
+        return tus_response(409, Upload_Offset=session.offset)
+    return tus_response(204, Upload_Offset=offset + written)
+
+
+def discard(session):
+    try:
+        os.remove(part_path(session.pk))
+    except FileNotFoundError:
+        pass
+    session.delete()
+
+
+class AssembledUpload(UploadedFile):
+    """A completed upload, moved (not copied) into storage like a temporary upload"""
+
+    def __init__(self, path, name, size):
+        super().__init__(open(path, 'rb'), name=name, size=size)
+        self.path = path
+
+    def temporary_file_path(self):
+        return self.path
+
+    def close(self):
+        try:
+            return self.file.close()
+        except FileNotFoundError:
+            pass
+
+
+def completed_session(upload_id, purpose):
+    """The finished UploadSession ``upload_id`` for ``purpose``, or None"""
+    try:
+        upload_id = uuid.UUID(str(upload_id))
+    except ValueError:
+        return None
+    session = UploadSession.objects.filter(pk=upload_id, purpose=purpose, offset=F('length')).first()
+    if session is None or not os.path.exists(part_path(session.pk)):
+        return None
+    return session
+
+
+def claim(upload_id, purpose):
+    """Take a completed upload for use in a form; each upload can be claimed once"""
+    session = completed_session(upload_id, purpose)
+    if session is None:
+        return None
+    if not UploadSession.objects.filter(pk=session.pk, offset=F('length')).delete()[0]:
+        return None  # claimed by a concurrent request
+    return AssembledUpload(part_path(session.pk), session.filename, session.length)
+
+
+def posted_file_info(request, field_name, purpose):
+    """(name, size) of the file posted for ``field_name`` without claiming a chunked upload, or None"""
+    if field_name in request.FILES:
+        uploaded = request.FILES[field_name]
+        return uploaded.name, uploaded.size
+    upload_id = request.POST.get(f'{field_name}_upload', '').strip()
+    session = completed_session(upload_id, purpose) if upload_id else None
+    return (session.filename, session.length) if session else None
+
+
+def posted_file(request, field_name, purpose):
+    """The file posted for ``field_name``: a regular multipart file, or a completed chunked upload"""
+    if field_name in request.FILES:
+        uploaded = request.FILES[field_name]
+    else:
+        upload_id = request.POST.get(f'{field_name}_upload', '').strip()
+        uploaded = claim(upload_id, purpose) if upload_id else None
+    if uploaded is not None:
+        metrics.observe('upload_size_bytes', uploaded.size, purpose=purpose)
+    return uploaded
+
+
+def clear_expired():
+    """Delete sessions idle past UPLOAD_SESSION_TTL and part files with no session; returns (sessions, files)"""
+    cutoff = expiry_cutoff()
+    sessions = 0
+    for session in UploadSession.objects.filter(updated_at__lt=cutoff).iterator():
+        discard(session)
+        sessions += 1
+
+    files = 0
+    directory = upload_dir()
+    if os.path.isdir(directory):
+        live = {str(pk) for pk in UploadSession.objects.values_list('pk', flat=True)}
+        for entry in os.scandir(directory):
+            upload_id = entry.name.rsplit('.', 1)[0]
+            if upload_id in live or entry.stat().st_mtime >= cutoff.timestamp():
+                continue
+            os.remove(entry.path)
+            files += 1
+    return sessions, files
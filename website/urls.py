@@ -1,11 +1,19 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 urlpatterns = [
     path('', views.home, name='home'),
     path('careers/', views.careers, name='careers'),
+    path('careers/jobs/', views.careers_jobs_json, name='careers_jobs_json'),
+    path('careers/autocomplete/', views.careers_autocomplete, name='careers_autocomplete'),
     path('submit-request/', views.submit_project_request, name='submit_project_request'),
     path('apply-job/<int:job_id>/', views.submit_job_application, name='submit_job_application'),
     path('job-details/<int:job_id>/', views.get_job_details, name='get_job_details'),
+    path('csrf-token/', views.csrf_token_json, name='csrf_token'),
+    path('uploads/', views.upload_create, name='upload_create'),
+    path('uploads/<uuid:upload_id>/', views.upload_detail, name='upload_detail'),
+    path('api/v1/jobs/', api.job_list, name='api_job_list'),
+    path('api/v1/jobs/<int:job_id>/', api.job_detail, name='api_job_detail'),
+    path('metrics', views.metrics_endpoint, name='metrics'),
 ]
 
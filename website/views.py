@@ -1,83 +1,203 @@
+import hashlib
+import posixpath
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db.models import Q
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
+from django.urls import reverse
 from django.contrib import messages
 from django.views.decorators.http import require_http_methods
-from django.core.mail import EmailMessage, get_connection
-from django.http import JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import add_never_cache_headers
+from django.utils.crypto import constant_time_compare
 from django.views.defaults import page_not_found
-from .models import Service, Project, TeamMember, Testimonial, ProjectRequest, SiteSetting, Job, JobApplication
+from django.views.static import serve as static_serve
+from . import autocomplete, cursors, idempotency, metrics, notifications, single_flight, uploads
+from .edge_cache import edge_cache, flash_redirect
+from .models import Service, Project, TeamMember, Testimonial, ProjectRequest, Job, JobApplication
+
+
+HOME_KEYS = ('service', 'project', 'teammember', 'testimonial', 'job')
 
 
+def home_context():
+    return {
+        'services': list(Service.objects.filter(is_active=True).projection('home')),
+        'featured_projects': list(Project.objects.filter(featured=True).projection('home')[:6]),
+        'team_members': list(TeamMember.objects.filter(is_active=True).projection('home')[:4]),
+        'testimonials': list(Testimonial.objects.projection('home')[:6]),
+        'featured_jobs': list(Job.objects.filter(is_active=True, featured=True).projection('card')[:6]),
+    }
+
+
+@edge_cache(*HOME_KEYS, 'sitesetting')
 def home(request):
     """Homepage view with all sections"""
-    services = Service.objects.filter(is_active=True)
-    featured_projects = Project.objects.filter(featured=True)[:6]
-    all_projects = Project.objects.all()[:9]
-    team_members = TeamMember.objects.filter(is_active=True)[:4]
-    testimonials = Testimonial.objects.all()[:6]
-    featured_jobs = Job.objects.filter(is_active=True, featured=True)[:6]
-    
-    context = {
-        'services': services,
-        'featured_projects': featured_projects,
-        'all_projects': all_projects,
-        'team_members': team_members,
-        'testimonials': testimonials,
-        'featured_jobs': featured_jobs,
-    }
+    context = single_flight.get_or_compute('home', home_context, HOME_KEYS)
     return render(request, 'website/home.html', context)
 
 
-def careers(request):
-    """Careers page with all active jobs"""
-    jobs = Job.objects.filter(is_active=True).order_by('-featured', '-order', '-created_at')
-    
-    # Get unique filters for sidebar
-    departments = Job.objects.filter(is_active=True).values_list('department', flat=True).distinct().exclude(department='')
-    job_types = Job.objects.filter(is_active=True).values_list('job_type', flat=True).distinct()
-    experience_levels = Job.objects.filter(is_active=True).values_list('experience_level', flat=True).distinct()
-    locations = Job.objects.filter(is_active=True).values_list('location', flat=True).distinct()
-    
-    # Filter handling
-    department_filter = request.GET.get('department', '')
-    job_type_filter = request.GET.get('job_type', '')
-    experience_filter = request.GET.get('experience', '')
-    location_filter = request.GET.get('location', '')
-    search_query = request.GET.get('search', '')
-    
-    if department_filter:
-        jobs = jobs.filter(department=department_filter)
-    if job_type_filter:
-        jobs = jobs.filter(job_type=job_type_filter)
-    if experience_filter:
-        jobs = jobs.filter(experience_level=experience_filter)
-    if location_filter:
-        jobs = jobs.filter(location=location_filter)
-    if search_query:
-        from django.db.models import Q
+CAREERS_ORDERING = ('-featured', '-order', '-created_at', '-id')
+
+CAREERS_FILTERS = ('department', 'job_type', 'experience', 'location', 'search')
+
+
+def filter_jobs(params):
+    """Active jobs narrowed by the careers page filters in ``params``"""
+    jobs = Job.objects.filter(is_active=True)
+    if params.get('department'):
+        jobs = jobs.filter(department=params['department'])
+    if params.get('job_type'):
+        jobs = jobs.filter(job_type=params['job_type'])
+    if params.get('experience'):
+        jobs = jobs.filter(experience_level=params['experience'])
+    if params.get('location'):
+        jobs = jobs.filter(location=params['location'])
+    if params.get('search'):
+        search_query = params['search']
         jobs = jobs.filter(
             Q(title__icontains=search_query) |
             Q(short_description__icontains=search_query) |
             Q(technologies__icontains=search_query)
         )
+    return jobs
+
+
+def careers_page(request, with_count=False):
+    """(current filters, CursorPage, total matching jobs or None) for a careers request; raises InvalidCursor"""
+    current_filters = {name: request.GET.get(name, '') for name in CAREERS_FILTERS}
+    cursor = request.GET.get('cursor', '')
+    page_size = getattr(settings, 'CAREERS_PAGE_SIZE', 12)
+
+    def compute():
+        jobs = filter_jobs(current_filters)
+        page = cursors.paginate(jobs.projection('card'), CAREERS_ORDERING, page_size, cursor)
+        return page, jobs.count() if with_count else None
+
+    if cursor or not is_listed_filter(current_filters):
+        # Searches, unknown filter values and later pages are an unbounded key space
+        # anyone can grow; caching them would turn public reads into shared-cache writes.
+        page, count = compute()
+    else:
+        name = 'careers:%s' % hashlib.md5(f'{sorted(current_filters.items())}:{page_size}:{with_count}'.encode()).hexdigest()
+        page, count = single_flight.get_or_compute(name, compute, ('job',))
+    return current_filters, page, count
+
+
+# Careers filter -> careers_filter_options() list of the values it may take
+FILTER_OPTIONS = {
+    'department': 'departments',
+    'job_type': 'job_types',
+    'experience': 'experience_levels',
+    'location': 'locations',
+}
+
+
+def is_listed_filter(current_filters):
+    """True if there is no search and every filter is one of the sidebar's values"""
+    if current_filters['search']:
+        return False
+    chosen = {name: current_filters[name] for name in FILTER_OPTIONS if current_filters[name]}
+    if not chosen:
+        return True
+    options = single_flight.get_or_compute('careers:filters', careers_filter_options, ('job',))
+    return all(value in options[FILTER_OPTIONS[name]] for name, value in chosen.items())
+
+
+def careers_filter_options():
+    """Distinct values for the careers sidebar filters"""
+    active_jobs = Job.objects.filter(is_active=True)
+    return {
+        'departments': list(active_jobs.values_list('department', flat=True).distinct().exclude(department='')),
+        'job_types': list(active_jobs.values_list('job_type', flat=True).distinct()),
+        'experience_levels': list(active_jobs.values_list('experience_level', flat=True).distinct()),
+        'locations': list(active_jobs.values_list('location', flat=True).distinct()),
+    }
+
+
+def next_page_query(current_filters, page):
+    """Query string for the page after ``page``, keeping the filters"""
+    if not page.has_next:
+        return ''
+    params = {name: value for name, value in current_filters.items() if value}
+    params['cursor'] = page.next_cursor
+    return urlencode(params)
+
+
+@edge_cache('job', 'sitesetting')
+def careers(request):
+    """Careers page with the first page of active jobs; later pages load from careers_jobs_json"""
+    try:
+        current_filters, page, jobs_count = careers_page(request, with_count=True)
+    except cursors.InvalidCursor:
+        return redirect('careers')
     
     context = {
-        'jobs': jobs,
-        'departments': departments,
-        'job_types': job_types,
-        'experience_levels': experience_levels,
-        'locations': locations,
-        'current_filters': {
-            'department': department_filter,
-            'job_type': job_type_filter,
-            'experience': experience_filter,
-            'location': location_filter,
-            'search': search_query,
-        }
+        'jobs': page,
+        'jobs_count': jobs_count,
+        'next_query': next_page_query(current_filters, page),
+        'current_filters': current_filters,
     }
+    # Unique values for the sidebar filters
+    context.update(single_flight.get_or_compute('careers:filters', careers_filter_options, ('job',)))
     return render(request, 'website/careers.html', context)
 
 
+@edge_cache('job')
+def careers_autocomplete(request):
+    """Careers search suggestions (titles, departments, locations, technologies) from the in-memory job index"""
+    query = request.GET.get('q', '')[:100]
+    try:
+        limit = max(1, min(int(request.GET.get('limit', 8)), 20))
+    except ValueError:
+        limit = 8
+    careers_url = reverse('careers')
+    return JsonResponse({
+        'query': query,
+        'suggestions': [
+            {
+                'value': suggestion.value,
+                'kind': suggestion.kind,
+                'count': suggestion.count,
+                'url': f'{careers_url}?{urlencode({autocomplete.KINDS[suggestion.kind]: suggestion.value})}',
+            }
+            for suggestion in autocomplete.suggest(query, limit)
+        ],
+    })
+
+
+@edge_cache('job')
+def careers_jobs_json(request):
+    """One page of careers listings as JSON (and rendered cards) for infinite scroll"""
+    try:
+        current_filters, page, _ = careers_page(request)
+    except cursors.InvalidCursor as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    next_query = next_page_query(current_filters, page)
+    return JsonResponse({
+        'results': [
+            {
+                'id': job.id,
+                'title': job.title,
+                'department': job.department,
+                'job_type': job.get_job_type_display(),
+                'experience_level': job.get_experience_level_display(),
+                'location': job.location,
+                'featured': job.featured,
+            }
+            for job in page
+        ],
+        'html': render_to_string('website/includes/job_listing_card.html', {'jobs': page}, request=request),
+        'next': f"{reverse('careers_jobs_json')}?{next_query}" if next_query else None,
+    })
+
+
 @require_http_methods(["POST"])
+@idempotency.idempotent
 def submit_project_request(request):
     """Handle project request form submission"""
     name = request.POST.get('name', '').strip()
@@ -91,7 +211,7 @@ def submit_project_request(request):
     # Basic validation
     if not name or not email or not project_type or not description:
         messages.error(request, 'Please fill in all required fields.')
-        return redirect('home')
+        return flash_redirect('home')
     
     # Create project request
     project_request = ProjectRequest.objects.create(
@@ -104,56 +224,17 @@ def submit_project_request(request):
         description=description,
     )
     
-    # Send email notification if email settings are configured
-    try:
-        site_settings = SiteSetting.objects.first()
-        if site_settings and site_settings.notification_email and site_settings.smtp_host and site_settings.smtp_username and site_settings.smtp_password:
-            # Configure email backend dynamically
-            email_connection = get_connection(
-                host=site_settings.smtp_host,
-                port=site_settings.smtp_port,
-                username=site_settings.smtp_username,
-                password=site_settings.smtp_password,
-                use_tls=site_settings.use_tls,
-            )
-            
-            # Prepare email content
-            subject = f"New Project Request: {project_type}"
-            message = f"""
-New project request received from your website:
-
-Name: {name}
-Email: {email}
-Phone: {phone if phone else 'Not provided'}
-Company: {company_name if company_name else 'Not provided'}
-Project Type: {project_type}
-Budget: {budget if budget else 'Not specified'}
-
-Project Description:
-{description}
-
----
-This request has been saved in your admin panel.
-"""
-            
-            # Send email
-            email_message = EmailMessage(
-                subject=subject,
-                body=message,
-                from_email=site_settings.smtp_username,
-                to=[site_settings.notification_email],
-                connection=email_connection,
-            )
-            email_message.send()
-    except Exception as e:
-        # Log error but don't fail the request
-        print(f"Error sending email notification: {str(e)}")
+    # Email notification (immediate mode only; digests are sent by a scheduled command)
+    notifications.submission_received(project_request)
     
-    messages.success(request, 'Thank you! We have received your project request. We will contact you soon.')
-    return redirect('home')
+    success_message = 'Thank you! We have received your project request. We will contact you soon.'
+    messages.success(request, success_message)
+    idempotency.complete(request, success_message)
+    return flash_redirect('home')
 
 
 @require_http_methods(["POST"])
+@idempotency.idempotent
 def submit_job_application(request, job_id):
     """Handle job application form submission"""
     job = get_object_or_404(Job, id=job_id, is_active=True)
@@ -172,117 +253,86 @@ def submit_job_application(request, job_id):
     availability = request.POST.get('availability', '').strip()
     expected_salary = request.POST.get('expected_salary', '').strip()
     notice_period = request.POST.get('notice_period', '').strip()
-    resume = request.FILES.get('resume')
+    
+    # Validate before taking the resume, so a chunked upload survives a rejected form
+    resume_info = uploads.posted_file_info(request, 'resume', 'resume')
     
     # Basic validation
-    if not full_name or not email or not phone or not resume:
+    if not full_name or not email or not phone or not resume_info:
         messages.error(request, 'Please fill in all required fields including resume.')
-        return redirect('home')
+        return flash_redirect('home')
+    resume_name, resume_size = resume_info
     
     # Validate file type
     allowed_extensions = ['.pdf', '.doc', '.docx']
-    file_extension = resume.name.lower().split('.')[-1] if '.' in resume.name else ''
+    file_extension = resume_name.lower().split('.')[-1] if '.' in resume_name else ''
     if f'.{file_extension}' not in allowed_extensions:
+        metrics.inc('upload_rejections_total', purpose='resume', reason='extension')
         messages.error(request, 'Resume must be a PDF, DOC, or DOCX file.')
-        return redirect('home')
+        return flash_redirect('home')
     
     # Validate file size (max 5MB)
-    if resume.size > 5 * 1024 * 1024:
+    if resume_size > 5 * 1024 * 1024:
+        metrics.inc('upload_rejections_total', purpose='resume', reason='size')
         messages.error(request, 'Resume file size must be less than 5MB.')
-        return redirect('home')
+        return flash_redirect('home')
     
     try:
         years_exp = int(years_of_experience) if years_of_experience else 0
     except ValueError:
         years_exp = 0
     
-    # Create job application
-    job_application = JobApplication.objects.create(
-        job=job,
-        full_name=full_name,
-        email=email,
-        phone=phone,
-        current_location=current_location,
-        current_position=current_position,
-        current_company=current_company,
-        years_of_experience=years_exp,
-        linkedin_url=linkedin_url,
-        portfolio_url=portfolio_url,
-        resume=resume,
-        cover_letter=cover_letter,
-        availability=availability,
-        expected_salary=expected_salary,
-        notice_period=notice_period,
-    )
+    resume = uploads.posted_file(request, 'resume', 'resume')
+    if resume is None:
+        # The chunked upload was claimed by a concurrent submission
+        messages.error(request, 'Please fill in all required fields including resume.')
+        return flash_redirect('home')
     
-    # Send email notification if email settings are configured
+    # Create job application
     try:
-        site_settings = SiteSetting.objects.first()
-        if site_settings and site_settings.notification_email and site_settings.smtp_host and site_settings.smtp_username and site_settings.smtp_password:
-            # Configure email backend dynamically
-            email_connection = get_connection(
-                host=site_settings.smtp_host,
-                port=site_settings.smtp_port,
-                username=site_settings.smtp_username,
-                password=site_settings.smtp_password,
-                use_tls=site_settings.use_tls,
-            )
-            
-            # Prepare email content
-            subject = f"New Job Application: {job.title} - {full_name}"
-            message = f"""
-New job application received for: {job.title}
-
-Applicant Information:
-Name: {full_name}
-Email: {email}
-Phone: {phone}
-Location: {current_location if current_location else 'Not provided'}
-
-Current Position: {current_position if current_position else 'Not provided'}
-Current Company: {current_company if current_company else 'Not provided'}
-Years of Experience: {years_exp}
-LinkedIn: {linkedin_url if linkedin_url else 'Not provided'}
-Portfolio: {portfolio_url if portfolio_url else 'Not provided'}
-
-Additional Information:
-Availability: {availability if availability else 'Not specified'}
-Expected Salary: {expected_salary if expected_salary else 'Not specified'}
-Notice Period: {notice_period if notice_period else 'Not specified'}
-
-Cover Letter:
-{cover_letter if cover_letter else 'No cover letter provided'}
-
----
-Resume has been uploaded and saved in admin panel.
-Application ID: {job_application.id}
-"""
-            
-            # Send email with resume attachment
-            email_message = EmailMessage(
-                subject=subject,
-                body=message,
-                from_email=site_settings.smtp_username,
-                to=[site_settings.notification_email],
-                connection=email_connection,
-            )
-            # Attach resume
-            if job_application.resume:
-                email_message.attach(job_application.resume.name, job_application.resume.read(), 'application/pdf')
-            email_message.send()
-    except Exception as e:
-        # Log error but don't fail the request
-        print(f"Error sending email notification: {str(e)}")
+        job_application = JobApplication.objects.create(
+            job=job,
+            full_name=full_name,
+            email=email,
+            phone=phone,
+            current_location=current_location,
+            current_position=current_position,
+            current_company=current_company,
+            years_of_experience=years_exp,
+            linkedin_url=linkedin_url,
+            portfolio_url=portfolio_url,
+            resume=resume,
+            cover_letter=cover_letter,
+            availability=availability,
+            expected_salary=expected_salary,
+            notice_period=notice_period,
+        )
+    finally:
+        resume.close()
     
-    messages.success(request, f'Thank you {full_name}! Your application for {job.title} has been submitted successfully. We will review it and get back to you soon.')
-    return redirect('home')
+    # Email notification (immediate mode only; digests are sent by a scheduled command)
+    notifications.submission_received(job_application)
+    
+    success_message = f'Thank you {full_name}! Your application for {job.title} has been submitted successfully. We will review it and get back to you soon.'
+    messages.success(request, success_message)
+    idempotency.complete(request, success_message)
+    return flash_redirect('home')
 
 
+@edge_cache('job-{job_id}')
 def get_job_details(request, job_id):
     """Get job details as JSON for modal"""
-    job = get_object_or_404(Job, id=job_id, is_active=True)
-    
-    job_data = {
+    job_data = single_flight.get_or_compute(f'job-details:{job_id}', lambda: job_details(job_id), (f'job-{job_id}',))
+    if job_data is None:
+        raise Http404('No active job matches the given query.')
+    return JsonResponse(job_data)
+
+
+def job_details(job_id):
+    job = Job.objects.filter(id=job_id, is_active=True).first()
+    if job is None:
+        return None
+    return {
         'id': job.id,
         'title': job.title,
         'department': job.department,
@@ -299,8 +349,48 @@ def get_job_details(request, job_id):
         'benefits': job.benefits,
         'application_deadline': job.application_deadline.strftime('%B %d, %Y') if job.application_deadline else None,
     }
-    
-    return JsonResponse(job_data)
+
+
+def csrf_token_json(request):
+    """CSRF token for forms on edge-cached pages, fetched by JS right before submit"""
+    response = JsonResponse({'csrfToken': get_token(request)})
+    add_never_cache_headers(response)
+    return response
+
+
+@require_http_methods(["POST"])
+def upload_create(request):
+    """Start a resumable resume upload"""
+    return uploads.create(request, purposes=('resume',))
+
+
+@require_http_methods(["HEAD", "GET", "PATCH", "DELETE"])
+def upload_detail(request, upload_id):
+    """Offset, chunk and cancel requests for a resumable resume upload"""
+    return uploads.detail(request, upload_id, purposes=('resume',))
+
+
+def metrics_endpoint(request):
+    """Prometheus scrape endpoint; needs METRICS_TOKEN as a bearer token (open without one only in DEBUG)"""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token and not settings.DEBUG:
+        return HttpResponse(status=403)
+    if token and not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=403)
+    response = HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+    add_never_cache_headers(response)
+    return response
+
+
+# Media only staff may download, through the admin panel (admin_job_application_resume)
+PRIVATE_MEDIA_PREFIXES = ('resumes/',)
+
+
+def serve_public_media(request, path, document_root=None):
+    """Development MEDIA_URL view: like django.views.static.serve, but never serves private media"""
+    if posixpath.normpath(path.replace('\\', '/')).lstrip('/').lower().startswith(PRIVATE_MEDIA_PREFIXES):
+        raise Http404('Not found')
+    return static_serve(request, path, document_root=document_root)
 
 
 def custom_404(request, exception):